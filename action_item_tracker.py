@@ -0,0 +1,370 @@
+"""
+跨會議工作事項追蹤
+以「正規化描述 + 負責人」的指紋辨識不同會議中的同一個工作事項，
+每次儲存會議記錄時只更新該會議涉及的工作事項，並以 SQLite 索引負責人、狀態與延遲次數；
+截止日期以 ISO 格式建立索引，逾期與某一週到期的工作事項都是範圍查詢，不需逐筆比對
+"""
+
+import os
+import re
+import hashlib
+import sqlite3
+import unicodedata
+from datetime import date, timedelta
+from contextlib import contextmanager
+
+from meeting_data_structure import normalize_date, normalize_due_date
+
+
+TRACKER_FILENAME = "action_items.sqlite3"  # 追蹤索引檔名，與會議記錄放在同一個目錄
+TRACKER_VERSION = 2  # 索引結構版本，記錄於 PRAGMA user_version
+
+# 正規化時移除的內容：負責人欄位、日期、狀態用語與標點空白
+_ASSIGNEE_CLAUSE_RE = re.compile(r"負責人[：:].*", re.DOTALL)
+_DATE_NOISE_RE = re.compile(r"\d{4}[-/年]\d{1,2}[-/月]\d{1,2}日?前?|\d{1,2}[-/月]\d{1,2}日?前?")
+_STATUS_WORDS_RE = re.compile(r"已完成|完成|已處理|進行中|處理中|延遲|延期|待處理")
+_SEPARATOR_RE = re.compile(r"[\W_]+")
+
+_SCHEMA = (
+    # 每個工作事項在每次會議中的出現紀錄
+    """
+    CREATE TABLE IF NOT EXISTS action_item_occurrences (
+        fingerprint TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        sort_date TEXT NOT NULL,
+        meeting_date TEXT NOT NULL,
+        item_id TEXT NOT NULL,
+        description TEXT NOT NULL,
+        assignee TEXT NOT NULL,
+        status TEXT NOT NULL,
+        due_date TEXT NOT NULL,
+        completion_date TEXT NOT NULL,
+        PRIMARY KEY (fingerprint, filename)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS occurrences_by_meeting ON action_item_occurrences (filename)",
+    # 每個工作事項的彙整結果，由其出現紀錄計算
+    """
+    CREATE TABLE IF NOT EXISTS action_items (
+        fingerprint TEXT PRIMARY KEY,
+        assignee_key TEXT NOT NULL,
+        description TEXT NOT NULL,
+        assignee TEXT NOT NULL,
+        status TEXT NOT NULL,
+        due_date TEXT NOT NULL,
+        due_on TEXT NOT NULL,
+        completed_on TEXT NOT NULL,
+        first_seen TEXT NOT NULL,
+        first_filename TEXT NOT NULL,
+        last_seen TEXT NOT NULL,
+        last_filename TEXT NOT NULL,
+        last_sort_date TEXT NOT NULL,
+        occurrences INTEGER NOT NULL,
+        delayed_count INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS action_items_by_assignee ON action_items (assignee_key, status)",
+    "CREATE INDEX IF NOT EXISTS action_items_by_status ON action_items (status, last_sort_date)",
+    "CREATE INDEX IF NOT EXISTS action_items_by_delays ON action_items (delayed_count)",
+    # 截止日期索引：due_on 為 ISO 日期，沒有可辨識的截止日期時為空字串
+    "CREATE INDEX IF NOT EXISTS action_items_by_due ON action_items (due_on, status)",
+    "CREATE INDEX IF NOT EXISTS action_items_by_assignee_due ON action_items (assignee_key, due_on)",
+)
+_TABLES = ("action_item_occurrences", "action_items")
+_ITEM_COLUMNS = (
+    "fingerprint", "description", "assignee", "status", "due_date", "due_on", "completed_on", "first_seen",
+    "first_filename", "last_seen", "last_filename", "occurrences", "delayed_count",
+)
+_OCCURRENCE_COLUMNS = (
+    "filename", "meeting_date", "item_id", "description", "assignee", "status", "due_date", "completion_date",
+)
+
+
+def normalize_description(description):
+    """正規化工作事項描述：移除負責人欄位、日期、狀態用語、標點與空白，並統一大小寫"""
+    text = unicodedata.normalize("NFKC", description or "").casefold()
+    text = _ASSIGNEE_CLAUSE_RE.sub("", text)
+    text = _DATE_NOISE_RE.sub("", text)
+    text = _STATUS_WORDS_RE.sub("", text)
+    return _SEPARATOR_RE.sub("", text)
+
+
+def normalize_assignee(assignee):
+    """正規化負責人：解析結果常帶有日期或狀態，只保留名稱本身"""
+    return normalize_description(assignee)
+
+
+def action_item_fingerprint(description, assignee):
+    """回傳工作事項的穩定指紋，描述中的日期與狀態改變時指紋不變"""
+    key = f"{normalize_description(description)}\n{normalize_assignee(assignee)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def effective_status(status, due_on, as_of):
+    """依截止日期計算的狀態：尚未完成且截止日期早於 as_of（ISO 日期字串）時為 delayed，否則與 status 相同"""
+    if status != "completed" and due_on and due_on < as_of:
+        return "delayed"
+    return status
+
+
+# effective_status 的 SQL 版本，參數為 as_of（ISO 日期字串），讓查詢條件與回傳的 effective_status 一致
+_EFFECTIVE_STATUS_SQL = "CASE WHEN status != 'completed' AND due_on > '' AND due_on < ? THEN 'delayed' ELSE status END"
+
+
+def _items(rows, as_of=None):
+    """將 _ITEM_COLUMNS 的查詢結果轉換為字典，加上以 as_of（預設為今天）計算的 effective_status"""
+    today = (as_of or date.today()).isoformat()
+    items = []
+    for row in rows:
+        item = dict(zip(_ITEM_COLUMNS, row))
+        item["effective_status"] = effective_status(item["status"], item["due_on"], today)
+        items.append(item)
+    return items
+
+
+class ActionItemTracker:
+    """跨會議的工作事項追蹤索引
+    
+    每個工作事項以最近一次出現的會議為準，
+    若最近一次只是再次提及而沒有狀態用語（pending），沿用之前最後一個明確的狀態。
+    查詢結果另有 effective_status：尚未完成且已過截止日期（due_on）的工作事項即使會議中沒有標示延遲也視為 delayed。
+    第一次開啟時會由 MeetingStore 中既有的會議記錄一次建立索引。
+    """
+    
+    def __init__(self, meeting_store):
+        self.meeting_store = meeting_store
+        self.index_path = os.path.join(meeting_store.data_folder, TRACKER_FILENAME)
+        self._init_index()
+    
+    @contextmanager
+    def _connect(self):
+        """開啟索引連線，區塊結束時提交並關閉"""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _init_index(self):
+        """建立索引結構，新建立或舊版本的索引會匯入既有的會議記錄"""
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < TRACKER_VERSION:
+                for table in _TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+        
+        if version < TRACKER_VERSION:
+            self.rebuild()
+            with self._connect() as conn:
+                conn.execute(f"PRAGMA user_version = {TRACKER_VERSION}")
+    
+    def rebuild(self):
+        """由所有會議記錄重新建立索引"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM action_item_occurrences")
+            conn.execute("DELETE FROM action_items")
+        
+        for summary in self.meeting_store.iter_meetings():
+            meeting = self.meeting_store.load(summary.filename)
+            if meeting is not None:
+                self.record_meeting(summary.filename, meeting)
+    
+    def record_meeting(self, filename, meeting):
+        """記錄一次會議的工作事項，只重新彙整這次會議涉及的工作事項"""
+        self.record_meetings([(filename, meeting)])
+    
+    def record_meetings(self, records):
+        """在同一個交易中記錄多次會議的工作事項，records 為 (檔案名稱, 會議記錄) 列表"""
+        touched = set()
+        with self._connect() as conn:
+            for filename, meeting in records:
+                touched.update(self._record(conn, filename, meeting))
+            for fingerprint in touched:
+                self._refresh(conn, fingerprint)
+    
+    @staticmethod
+    def _record(conn, filename, meeting):
+        """寫入一次會議的出現紀錄，回傳需要重新彙整的指紋"""
+        sort_date = normalize_date(meeting.date) or meeting.date or ""
+        rows = {}
+        for item in meeting.action_items:
+            fingerprint = action_item_fingerprint(item.description, item.assignee)
+            # 同一次會議中重複的工作事項只記錄第一個
+            rows.setdefault(fingerprint, (
+                fingerprint, filename, sort_date, meeting.date or "", item.id or "",
+                item.description or "", item.assignee or "", item.status or "", item.due_date or "",
+                item.completion_date or "",
+            ))
+        
+        # 同名檔案被改寫時，先移除舊的出現紀錄
+        previous = {row[0] for row in conn.execute(
+            "SELECT fingerprint FROM action_item_occurrences WHERE filename = ?", (filename,)
+        )}
+        conn.execute("DELETE FROM action_item_occurrences WHERE filename = ?", (filename,))
+        conn.executemany(
+            "INSERT INTO action_item_occurrences "
+            "(fingerprint, filename, sort_date, meeting_date, item_id, description, assignee, status, due_date, "
+            "completion_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows.values(),
+        )
+        return previous | rows.keys()
+    
+    @staticmethod
+    def _refresh(conn, fingerprint):
+        """由出現紀錄重新彙整一個工作事項
+        
+        截止日期取最近一次有截止日期的會議，舊版本儲存的「3/20」等原始文字以該次會議的日期推算年份；
+        完成時的完成日期取最後一段連續標示為已完成的第一次會議。
+        """
+        occurrences = conn.execute(
+            "SELECT sort_date, meeting_date, filename, description, assignee, status, due_date, completion_date "
+            "FROM action_item_occurrences WHERE fingerprint = ? ORDER BY sort_date, filename",
+            (fingerprint,),
+        ).fetchall()
+        if not occurrences:
+            conn.execute("DELETE FROM action_items WHERE fingerprint = ?", (fingerprint,))
+            return
+        
+        first, last = occurrences[0], occurrences[-1]
+        status = "pending"
+        completed = None
+        for occurrence in reversed(occurrences):
+            if not occurrence[5] or occurrence[5] == "pending":
+                continue
+            if status == "pending":
+                status = occurrence[5]
+            if occurrence[5] != "completed":
+                break
+            completed = occurrence
+        delayed_count = sum(1 for occurrence in occurrences if occurrence[5] == "delayed")
+        
+        due = next((occurrence for occurrence in reversed(occurrences) if occurrence[6]), last)
+        due_on = normalize_due_date(due[6], due[1])
+        completed_on = ""
+        if status == "completed" and completed is not None:
+            completed_on = normalize_due_date(completed[7], completed[1]) or normalize_date(completed[1])
+        
+        conn.execute(
+            "INSERT OR REPLACE INTO action_items "
+            "(fingerprint, assignee_key, description, assignee, status, due_date, due_on, completed_on, first_seen, "
+            "first_filename, last_seen, last_filename, last_sort_date, occurrences, delayed_count) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                fingerprint, normalize_assignee(last[4]), last[3], last[4], status, due[6], due_on, completed_on,
+                first[1], first[2], last[1], last[2], last[0], len(occurrences), delayed_count,
+            ),
+        )
+    
+    def query(self, assignee=None, statuses=None, open_only=False, min_delayed=None, limit=100, offset=0, as_of=None):
+        """查詢工作事項，依最近出現的會議由新到舊排序
+        
+        assignee 會以相同方式正規化後比對；statuses 為狀態列表，與 effective_status 比對
+        （尚未完成且已過截止日期的工作事項符合 delayed）；
+        open_only 只返回尚未完成的工作事項；min_delayed 為最少的延遲次數；
+        as_of 為計算 effective_status 的日期，預設為今天。
+        """
+        as_of = as_of or date.today()
+        conditions = []
+        params = []
+        if assignee:
+            conditions.append("assignee_key = ?")
+            params.append(normalize_assignee(assignee))
+        if statuses:
+            conditions.append(f"{_EFFECTIVE_STATUS_SQL} IN ({', '.join('?' for _ in statuses)})")
+            params.append(as_of.isoformat())
+            params.extend(statuses)
+        if open_only:
+            conditions.append("status != 'completed'")
+        if min_delayed is not None:
+            conditions.append("delayed_count >= ?")
+            params.append(min_delayed)
+        
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        query = (
+            f"SELECT {', '.join(_ITEM_COLUMNS)} FROM action_items{where} "
+            "ORDER BY last_sort_date DESC, fingerprint LIMIT ? OFFSET ?"
+        )
+        params.extend((limit, offset))
+        
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return _items(rows, as_of)
+    
+    def overdue(self, as_of=None, assignee=None, limit=100, offset=0):
+        """尚未完成且截止日期早於 as_of（預設為今天）的工作事項，依截止日期由早到晚排序
+        
+        以截止日期索引進行範圍查詢；沒有可辨識截止日期的工作事項不會列出。
+        """
+        as_of = as_of or date.today()
+        conditions = ["due_on > ''", "due_on < ?", "status != 'completed'"]
+        params = [as_of.isoformat()]
+        if assignee:
+            conditions.append("assignee_key = ?")
+            params.append(normalize_assignee(assignee))
+        query = (
+            f"SELECT {', '.join(_ITEM_COLUMNS)} FROM action_items WHERE {' AND '.join(conditions)} "
+            "ORDER BY due_on, fingerprint LIMIT ? OFFSET ?"
+        )
+        params.extend((limit, offset))
+        
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return _items(rows, as_of)
+    
+    def due_between(self, start, end, assignee=None, open_only=True, as_of=None):
+        """截止日期在 start 到 end（含）之間的工作事項，依負責人分組
+        
+        回傳 [{"assignee": 正規化的負責人, "items": [工作事項, ...]}, ...]（解析出的負責人常帶有日期或狀態，
+        以 normalize_assignee 的結果分組），負責人依名稱排序，各負責人的工作事項依截止日期排序；
+        open_only 只返回尚未完成的工作事項。
+        """
+        conditions = ["due_on BETWEEN ? AND ?"]
+        params = [start.isoformat(), end.isoformat()]
+        if assignee:
+            conditions.append("assignee_key = ?")
+            params.append(normalize_assignee(assignee))
+        if open_only:
+            conditions.append("status != 'completed'")
+        query = (
+            f"SELECT assignee_key, {', '.join(_ITEM_COLUMNS)} FROM action_items WHERE {' AND '.join(conditions)} "
+            "ORDER BY assignee_key, due_on, fingerprint"
+        )
+        
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        groups = []
+        for row in rows:
+            if not groups or groups[-1][0] != row[0]:
+                groups.append((row[0], []))
+            groups[-1][1].append(row[1:])
+        return [{"assignee": assignee_key, "items": _items(items, as_of)} for assignee_key, items in groups]
+    
+    def due_this_week(self, as_of=None, assignee=None, open_only=True):
+        """as_of（預設為今天）所在週（週一至週日）到期的工作事項，依負責人分組，回傳 (週一, 週日, 分組)"""
+        as_of = as_of or date.today()
+        start = as_of - timedelta(days=as_of.weekday())
+        end = start + timedelta(days=6)
+        return start, end, self.due_between(start, end, assignee=assignee, open_only=open_only, as_of=as_of)
+    
+    def get(self, fingerprint, as_of=None):
+        """回傳單一工作事項及其在各次會議中的出現紀錄，不存在時回傳 None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_ITEM_COLUMNS)} FROM action_items WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+            if row is None:
+                return None
+            occurrences = conn.execute(
+                f"SELECT {', '.join(_OCCURRENCE_COLUMNS)} FROM action_item_occurrences "
+                "WHERE fingerprint = ? ORDER BY sort_date, filename",
+                (fingerprint,),
+            ).fetchall()
+        
+        item = _items([row], as_of)[0]
+        item["history"] = [dict(zip(_OCCURRENCE_COLUMNS, occurrence)) for occurrence in occurrences]
+        return item
+
@@ -0,0 +1,368 @@
+"""
+批次匯入會議記錄
+以 ProcessPoolExecutor 平行解析多個逐字稿，依會議日期排序後計算效率指標，再一次寫入儲存與索引。
+內容與已匯入的逐字稿相同（見 transcript_cache）的檔案不再解析，直接回報既有的會議記錄。
+可由 /api/upload/batch 上傳 zip 或多個檔案，也可直接對目錄執行：
+    python batch_ingest.py <逐字稿目錄> [--data-folder 目錄] [--workers 數量] [--recursive] [--format 格式]
+"""
+
+import io
+import os
+import sys
+import argparse
+import time
+import zipfile
+import functools
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from meeting_data_structure import MeetingRecord, EfficiencyAnalyzer, date_sort_key, time_sort_key
+from meeting_store import MeetingStore
+from meeting_codecs import CODECS, DEFAULT_FORMAT
+from action_item_tracker import ActionItemTracker
+from meeting_analytics import TrendAnalytics, SeriesLatest, detect_series
+from meeting_search import SearchIndex
+from topic_index import TopicIndex
+from meeting_rollup import MeetingRollup
+from transcript_formats import TRANSCRIPT_EXTENSIONS, parse_transcript_stream
+from transcript_cache import TranscriptCache, transcript_key
+
+
+MAX_TRANSCRIPT_BYTES = 16 * 1024 * 1024  # 單一逐字稿的大小上限，與 /upload 的上限相同
+
+BatchFileResult = namedtuple("BatchFileResult", [
+    "name",           # 上傳的檔名或相對於目錄的路徑
+    "ok",             # 是否成功匯入
+    "filename",       # 儲存後的會議記錄檔名，失敗時為 None
+    "error",          # 失敗原因，成功時為 None
+    "size",           # 逐字稿位元組數
+    "parse_seconds",  # 解析所花的秒數
+    "warnings",       # 解析警告，例如超過時間上限只取得部分結果
+    "duplicate",      # 內容與已匯入或同一批次中較前面的逐字稿相同，未重新解析
+])
+
+
+def is_transcript(name):
+    """檢查檔名是否為可匯入的逐字稿"""
+    return name.lower().endswith(TRANSCRIPT_EXTENSIONS)
+
+
+def parse_transcript(source, name="", time_budget=None):
+    """解析一個逐字稿，於子行程中執行
+    
+    source 為檔案路徑或檔案內容 (bytes)，name 為檔名，用於判斷格式（會議紀錄、字幕或 Teams 逐字稿），
+    time_budget 為解析時間上限（秒），超過時回傳部分結果，會議記錄的 warnings 會說明。
+    回傳 (會議記錄, 錯誤訊息, 位元組數, 解析秒數)，失敗時會議記錄為 None。
+    """
+    started = time.perf_counter()
+    size = 0
+    try:
+        if isinstance(source, bytes):
+            size = len(source)
+            meeting = parse_transcript_stream(io.BytesIO(source), name, time_budget)
+        else:
+            size = os.path.getsize(source)
+            if size > MAX_TRANSCRIPT_BYTES:
+                raise ValueError(f"file larger than {MAX_TRANSCRIPT_BYTES} bytes")
+            with open(source, 'rb') as f:
+                meeting = parse_transcript_stream(f, name or source, time_budget)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", size, time.perf_counter() - started
+    return meeting, None, size, time.perf_counter() - started
+
+
+def source_key(source, name=""):
+    """回傳檔案路徑或檔案內容 (bytes) 的 transcript_key，無法讀取或超過大小上限時回傳 None"""
+    try:
+        if isinstance(source, bytes):
+            return transcript_key(io.BytesIO(source), name)
+        if os.path.getsize(source) > MAX_TRANSCRIPT_BYTES:
+            return None
+        with open(source, 'rb') as f:
+            return transcript_key(f, name or source)
+    except OSError:
+        return None
+
+
+def source_size(source):
+    """回傳檔案路徑或檔案內容 (bytes) 的位元組數"""
+    if isinstance(source, bytes):
+        return len(source)
+    try:
+        return os.path.getsize(source)
+    except OSError:
+        return 0
+
+
+def collect_directory(directory, recursive=False):
+    """列出目錄中的逐字稿，回傳依名稱排序的 (相對路徑, 檔案路徑) 列表"""
+    sources = []
+    for root, dirs, files in os.walk(directory):
+        if not recursive:
+            dirs.clear()
+        for name in files:
+            if is_transcript(name):
+                path = os.path.join(root, name)
+                sources.append((os.path.relpath(path, directory), path))
+    return sorted(sources)
+
+
+def collect_uploads(files):
+    """整理上傳的檔案，zip 壓縮檔會展開其中的逐字稿
+    
+    files 為具有 filename 與 stream 屬性的上傳檔案。
+    回傳 (可解析的 (名稱, 內容) 列表, 無法處理的 (名稱, 原因) 列表)。
+    """
+    sources = []
+    rejected = []
+    for file in files:
+        name = file.filename
+        if name.lower().endswith('.zip'):
+            try:
+                with zipfile.ZipFile(file.stream) as archive:
+                    for member in archive.infolist():
+                        member_name = f"{name}/{member.filename}"
+                        if member.is_dir() or member.filename.startswith('__MACOSX/') or not is_transcript(member.filename):
+                            continue
+                        # 以解壓縮後的大小檢查，避免把過大的內容讀入記憶體
+                        if member.file_size > MAX_TRANSCRIPT_BYTES:
+                            rejected.append((member_name, f"file larger than {MAX_TRANSCRIPT_BYTES} bytes"))
+                            continue
+                        sources.append((member_name, archive.read(member)))
+            except (zipfile.BadZipFile, OSError) as e:
+                rejected.append((name, f"{type(e).__name__}: {e}"))
+        elif is_transcript(name):
+            sources.append((name, file.stream.read()))
+        else:
+            rejected.append((name, "unsupported file type"))
+    return sources, rejected
+
+
+def meeting_sort_key(meeting):
+    """會議的排序鍵 (日期, 時間, 檔名)，與 TrendAnalytics.series_meetings 的順序相同
+    
+    尚未儲存的會議以 MeetingStore.make_filename 的檔名代替，同名時依儲存順序加上 _2、_3 …，順序不變。
+    """
+    return date_sort_key(meeting.date), time_sort_key(meeting.time), MeetingStore.make_filename(meeting, "")
+
+
+class BatchIngestor:
+    """批次解析並匯入會議記錄
+    
+    效率指標依會議日期與時間順序計算：每次會議與同一系列（見 meeting_analytics.detect_series）中
+    在它之前的最近一次會議比較，該次會議可能在同一批次中，也可能是匯入前已儲存的會議。
+    補登較舊的會議時，排在它之後的已儲存會議也改與它比較（見 refresh_successors）。
+    """
+    
+    def __init__(self, meeting_store, action_item_tracker, trend_analytics, max_workers=None, time_budget=None,
+                 search_index=None, topic_index=None, transcript_cache=None, meeting_rollup=None):
+        self.meeting_store = meeting_store
+        self.action_item_tracker = action_item_tracker
+        self.trend_analytics = trend_analytics
+        self.search_index = search_index  # 全文檢索索引，None 表示不更新
+        self.topic_index = topic_index  # 相近議題索引，None 表示不更新
+        self.transcript_cache = transcript_cache  # 已匯入逐字稿的雜湊值，None 表示不檢查重複
+        self.meeting_rollup = meeting_rollup  # 會議摘要的欄式彙總，None 表示不更新
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.time_budget = time_budget  # 每個逐字稿的解析時間上限（秒）
+    
+    def parse_all(self, sources):
+        """平行解析 (名稱, 檔案路徑或內容) 列表，依輸入順序回傳 parse_transcript 的結果"""
+        payloads = [source for _, source in sources]
+        names = [name for name, _ in sources]
+        workers = min(self.max_workers, len(payloads))
+        # 只有一個檔案或只允許一個行程時，不需建立行程池
+        parse = functools.partial(parse_transcript, time_budget=self.time_budget)
+        if workers <= 1:
+            return [parse(payload, name) for payload, name in zip(payloads, names)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(payloads) // (workers * 4))
+            return list(executor.map(parse, payloads, names, chunksize=chunksize))
+    
+    def find_duplicates(self, sources):
+        """計算每個來源的 transcript_key，找出不需解析的重複檔案
+        
+        回傳 (各來源的雜湊值列表, {來源索引: 既有的會議記錄檔名，或同一批次中第一個相同來源的索引})；
+        未設定 transcript_cache 時不檢查，雜湊值皆為 None。
+        """
+        if self.transcript_cache is None:
+            return [None] * len(sources), {}
+        keys = [source_key(source, name) for name, source in sources]
+        duplicates = {}
+        first_seen = {}
+        for i, key in enumerate(keys):
+            if key is None:
+                continue
+            if key in first_seen:
+                duplicates[i] = first_seen[key]
+                continue
+            existing = self.transcript_cache.lookup(key)
+            if existing is not None:
+                duplicates[i] = existing
+            else:
+                first_seen[key] = i
+        return keys, duplicates
+    
+    def refresh_successors(self, filenames):
+        """補登較舊的會議後，重新計算已儲存的下一次會議的效率指標，有變更時改寫，回傳改寫的檔名列表
+        
+        filenames 為剛寫入趨勢彙總的會議；其下一次會議原本與更早的會議比較，改為與補登的會議比較，
+        與 reprocess 依 series_meetings 的順序計算的結果相同。
+        """
+        meetings = []
+        previous_hashes = []
+        for filename, previous in sorted(self.trend_analytics.successors(filenames).items()):
+            meeting = self.meeting_store.load(filename)
+            previous_stats = self.trend_analytics.stats(previous)
+            if meeting is None or previous_stats is None:
+                continue
+            metrics = EfficiencyAnalyzer.compare(EfficiencyAnalyzer.summarize(meeting), previous_stats)
+            if metrics == meeting.efficiency_metrics:
+                continue
+            previous_hashes.append(self.meeting_store.content_hash(filename))
+            meeting = MeetingRecord.from_dict(meeting.to_dict())
+            meeting.filename = filename
+            meeting.efficiency_metrics = metrics
+            meetings.append(meeting)
+        if not meetings:
+            return []
+        
+        # 效率指標不在工作事項追蹤、趨勢彙總與摘要彙總中，只需改寫會議記錄並更新逐字稿對應的雜湊值
+        saved = self.meeting_store.save_many(meetings)
+        if self.transcript_cache is not None:
+            self.transcript_cache.rehash(list(zip(saved, previous_hashes)))
+        return saved
+    
+    def ingest(self, sources, rejected=()):
+        """解析、分析並儲存一批逐字稿，回傳每個檔案的結果與整體吞吐量
+        
+        sources 為 (名稱, 檔案路徑或內容) 列表，rejected 為已無法處理的 (名稱, 原因) 列表。
+        """
+        started = time.perf_counter()
+        keys, duplicates = self.find_duplicates(sources)
+        pending = [i for i in range(len(sources)) if i not in duplicates]
+        parsed = self.parse_all([sources[i] for i in pending])
+        
+        results = [None] * len(sources)
+        meetings = []
+        for i, (meeting, error, size, seconds) in zip(pending, parsed):
+            if meeting is not None:
+                meetings.append((i, meeting))
+            results[i] = BatchFileResult(
+                sources[i][0], meeting is not None, None, error, size, seconds,
+                meeting.warnings if meeting is not None else [], False,
+            )
+        meetings.sort(key=lambda pair: meeting_sort_key(pair[1]))
+        
+        # 依日期與時間順序計算效率指標，系列判斷與寫入趨勢彙總時相同：批次中較早的會議也是候選系列
+        candidates = self.trend_analytics.series_candidates()
+        batch_previous = {}  # 系列名稱 -> ((排序日期, 排序時間), MeetingStats)，批次中該系列最近的一次會議
+        all_stats = []
+        for _, meeting in meetings:
+            series = detect_series(meeting.title, meeting.participants, candidates)
+            position = (date_sort_key(meeting.date), time_sort_key(meeting.time))
+            stats = EfficiencyAnalyzer.summarize(meeting)
+            
+            # 已儲存的前一次會議比批次中的更接近時，以已儲存的為準
+            previous_position, previous_stats = batch_previous.get(series, (("", ""), None))
+            stored = self.trend_analytics.predecessor(meeting, series)
+            if stored is not None and (previous_stats is None or stored[1:] > previous_position):
+                previous_stats = self.trend_analytics.stats(stored[0])
+            if previous_stats:
+                meeting.efficiency_metrics = EfficiencyAnalyzer.compare(stats, previous_stats)
+            
+            all_stats.append(stats)
+            batch_previous[series] = (position, stats)
+            latest = candidates.get(series)
+            if latest is None or (latest.sort_date, latest.sort_time) <= position:
+                candidates[series] = SeriesLatest("", *position, meeting.participants or [])
+        
+        # 一次寫入會議記錄、索引、工作事項追蹤、趨勢彙總、全文檢索、相近議題索引與摘要彙總
+        records = [meeting for _, meeting in meetings]
+        filenames = self.meeting_store.save_many(records)
+        self.action_item_tracker.record_meetings(list(zip(filenames, records)))
+        self.trend_analytics.record_meetings(list(zip(filenames, records, all_stats)))
+        if self.search_index is not None:
+            self.search_index.record_meetings(list(zip(filenames, records)))
+        if self.topic_index is not None:
+            self.topic_index.record_meetings(list(zip(filenames, records)))
+        if self.meeting_rollup is not None:
+            self.meeting_rollup.record_meetings(list(zip(filenames, records, all_stats)))
+        self.refresh_successors(filenames)
+        for (index, _), filename in zip(meetings, filenames):
+            results[index] = results[index]._replace(filename=filename)
+        
+        # 記錄完整解析的逐字稿；超過時間上限只取得部分結果的不記錄，重新匯入時會再解析
+        if self.transcript_cache is not None:
+            self.transcript_cache.remember_many([
+                (keys[index], filename) for (index, meeting), filename in zip(meetings, filenames)
+                if keys[index] is not None and not meeting.warnings
+            ])
+        
+        # 重複的檔案沿用既有的會議記錄，或同一批次中第一個相同檔案的結果
+        for index, existing in duplicates.items():
+            name, source = sources[index]
+            if isinstance(existing, str):
+                results[index] = BatchFileResult(name, True, existing, None, source_size(source), 0.0, [], True)
+            else:
+                results[index] = results[existing]._replace(
+                    name=name, size=source_size(source), parse_seconds=0.0, duplicate=True,
+                )
+        
+        files = results + [BatchFileResult(name, False, None, error, 0, 0.0, [], False) for name, error in rejected]
+        elapsed = time.perf_counter() - started
+        total_bytes = sum(result.size for result in files)
+        succeeded = sum(1 for result in files if result.ok)
+        return {
+            "files": [result._asdict() for result in files],
+            "total": len(files),
+            "succeeded": succeeded,
+            "failed": len(files) - succeeded,
+            "duplicates": len(duplicates),
+            "bytes": total_bytes,
+            "seconds": elapsed,
+            "files_per_second": len(files) / elapsed if elapsed > 0 else 0,
+            "mb_per_second": total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0,
+        }
+
+
+def main(argv=None):
+    """命令列入口：匯入目錄中的所有逐字稿並輸出每個檔案的結果"""
+    parser = argparse.ArgumentParser(description="Batch import meeting transcripts from a directory")
+    parser.add_argument("directory", help="directory containing .txt, .vtt, .srt or .docx transcripts")
+    parser.add_argument("--data-folder", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'data'),
+                        help="meeting record folder (default: src/data)")
+    parser.add_argument("--workers", type=int, default=None, help="number of parser processes (default: CPU count)")
+    parser.add_argument("--recursive", action="store_true", help="also import transcripts in subdirectories")
+    parser.add_argument("--time-budget", type=float, default=None, help="parse time limit per file in seconds")
+    parser.add_argument("--format", choices=sorted(CODECS), default=DEFAULT_FORMAT, help="meeting record file format")
+    args = parser.parse_args(argv)
+    
+    os.makedirs(args.data_folder, exist_ok=True)
+    store = MeetingStore(args.data_folder, codec=args.format)
+    trend_analytics = TrendAnalytics(store)
+    ingestor = BatchIngestor(
+        store, ActionItemTracker(store), trend_analytics, max_workers=args.workers, time_budget=args.time_budget,
+        search_index=SearchIndex(store), topic_index=TopicIndex(store, trend_analytics),
+        transcript_cache=TranscriptCache(store), meeting_rollup=MeetingRollup(store, trend_analytics),
+    )
+    report = ingestor.ingest(collect_directory(args.directory, recursive=args.recursive))
+    
+    for result in report["files"]:
+        if result["duplicate"] and result["ok"]:
+            print(f"SKIPPED {result['name']} -> {result['filename']} (already imported)")
+        elif result["ok"]:
+            print(f"OK      {result['name']} -> {result['filename']} ({result['parse_seconds']:.3f}s)")
+            for warning in result["warnings"]:
+                print(f"        warning: {warning}")
+        else:
+            print(f"FAILED  {result['name']}: {result['error']}")
+    print(
+        f"{report['succeeded']}/{report['total']} files imported in {report['seconds']:.2f}s "
+        f"({report['files_per_second']:.1f} files/s, {report['mb_per_second']:.2f} MB/s)"
+    )
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
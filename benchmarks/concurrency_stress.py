@@ -0,0 +1,174 @@
+"""
+會議記錄同時寫入的壓力測試
+多個行程（模擬 gunicorn 的 worker）各以多個執行緒同時儲存日期與標題都相同的會議記錄，
+同時有讀取端不斷經由索引與直接列出目錄讀取會議記錄。結束後檢查：
+每筆會議記錄都有自己的檔案與索引、沒有讀到寫了一半的檔案、沒有遺留暫存檔。
+任何檢查失敗時以結束碼 1 結束：
+    python benchmarks/concurrency_stress.py
+    python benchmarks/concurrency_stress.py --processes 8 --threads 8 --meetings 50
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingRecord, Topic
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingRecord, Topic
+
+from meeting_store import MeetingStore
+from meeting_codecs import MEETING_EXTENSIONS, decode_meeting
+
+
+def make_meeting(marker):
+    """日期與標題固定、以 marker 區分的會議記錄"""
+    meeting = MeetingRecord()
+    meeting.title = "工程週會"
+    meeting.date = "2024年3月5日"
+    meeting.participants = ["王小明", marker]
+    topic = Topic()
+    topic.id = "1"
+    topic.title = f"議題 {marker}"
+    topic.discussion_points = [f"{marker} 的討論內容 {i}" for i in range(20)]
+    meeting.topics.append(topic)
+    return meeting
+
+
+def write_meetings(folder, codec, process, threads, meetings):
+    """一個寫入行程：以多個執行緒各儲存 meetings 筆會議記錄"""
+    store = MeetingStore(folder, codec=codec)
+    
+    def writer(thread):
+        for number in range(meetings):
+            store.save(make_meeting(f"writer-{process}-{thread}-{number}"))
+    
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(writer, range(threads)))
+
+
+def read_until(folder, stop, errors, counts):
+    """讀取端：經由索引讀取每筆會議記錄，並直接讀取目錄中的每個會議記錄檔案"""
+    store = MeetingStore(folder)
+    while not stop.is_set():
+        for summary in store.iter_meetings():
+            try:
+                meeting = store.load(summary.filename)
+                if meeting is None:
+                    errors.append(f"indexed but missing: {summary.filename}")
+            except Exception as e:
+                errors.append(f"index read {summary.filename}: {type(e).__name__}: {e}")
+            counts[0] += 1
+        for filename in os.listdir(folder):
+            if not filename.endswith(MEETING_EXTENSIONS):
+                continue
+            try:
+                with open(os.path.join(folder, filename), 'rb') as f:
+                    decode_meeting(f.read())
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                errors.append(f"directory read {filename}: {type(e).__name__}: {e}")
+            counts[1] += 1
+
+
+def verify(folder, expected_markers):
+    """檢查每個 marker 恰好對應一個檔案與一筆索引，回傳錯誤列表"""
+    errors = []
+    store = MeetingStore(folder)
+    summaries = list(store.iter_meetings())
+    files = [name for name in os.listdir(folder) if name.endswith(MEETING_EXTENSIONS)]
+    leftovers = [name for name in os.listdir(folder) if name.endswith(".tmp")]
+    if len(summaries) != len(expected_markers):
+        errors.append(f"{len(summaries)} indexed meetings, expected {len(expected_markers)}")
+    if len(files) != len(expected_markers):
+        errors.append(f"{len(files)} meeting files, expected {len(expected_markers)}")
+    if leftovers:
+        errors.append(f"{len(leftovers)} temporary files left behind")
+    
+    seen = {}
+    for summary in summaries:
+        marker = summary.participants[-1]
+        if marker in seen:
+            errors.append(f"{marker} saved as both {seen[marker]} and {summary.filename}")
+        seen[marker] = summary.filename
+        meeting = store.load(summary.filename)
+        if meeting is None or meeting.participants[-1] != marker:
+            errors.append(f"{summary.filename} does not contain {marker}")
+    missing = set(expected_markers) - set(seen)
+    if missing:
+        errors.append(f"{len(missing)} meetings lost, e.g. {sorted(missing)[0]}")
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress test concurrent meeting record writers and readers")
+    parser.add_argument("--processes", type=int, default=4, help="writer processes")
+    parser.add_argument("--threads", type=int, default=4, help="writer threads per process")
+    parser.add_argument("--meetings", type=int, default=25, help="meetings saved by each thread")
+    parser.add_argument("--readers", type=int, default=2, help="reader threads")
+    parser.add_argument("--format", default="json", help="meeting record file format")
+    args = parser.parse_args(argv)
+    
+    folder = tempfile.mkdtemp(prefix="meeting-stress-")
+    try:
+        MeetingStore(folder, codec=args.format)  # 先建立索引，避免各行程同時建立
+        stop = threading.Event()
+        read_errors = []
+        counts = [0, 0]  # 經由索引與直接讀取的次數
+        readers = [
+            threading.Thread(target=read_until, args=(folder, stop, read_errors, counts), daemon=True)
+            for _ in range(args.readers)
+        ]
+        for reader in readers:
+            reader.start()
+        
+        # 讀取執行緒已在執行，以 spawn 建立寫入行程，避免 fork 時複製到其他執行緒持有中的鎖
+        context = multiprocessing.get_context("spawn")
+        started = time.perf_counter()
+        writers = [
+            context.Process(target=write_meetings, args=(folder, args.format, process, args.threads, args.meetings))
+            for process in range(args.processes)
+        ]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for reader in readers:
+            reader.join()
+        
+        total = args.processes * args.threads * args.meetings
+        expected = [
+            f"writer-{process}-{thread}-{number}"
+            for process in range(args.processes) for thread in range(args.threads) for number in range(args.meetings)
+        ]
+        print(f"{total} meetings with the same date and title saved by "
+              f"{args.processes} processes x {args.threads} threads in {elapsed:.2f}s ({total / elapsed:.0f}/s)")
+        print(f"{counts[0]} reads through the index, {counts[1]} direct file reads while writing")
+        
+        errors = [f"writer process exited with {writer.exitcode}" for writer in writers if writer.exitcode]
+        errors += read_errors + verify(folder, expected)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    for error in errors[:20]:
+        print(f"FAIL {error}")
+    if errors:
+        print(f"{len(errors)} problems found")
+        return 1
+    print("OK: no lost, overwritten or torn meeting records")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
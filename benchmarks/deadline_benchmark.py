@@ -0,0 +1,138 @@
+"""
+截止日期索引效能測試
+以 transcript_generator 產生的會議記錄（隨機改變工作事項的狀態，讓部分工作事項尚未完成）建立工作事項追蹤，
+比較以截止日期索引查詢逾期與本週到期的工作事項，與逐一讀取所有會議記錄推算截止日期的耗時。
+結果與逐一讀取不同，或逾期查詢的 p95 超過上限（預設 20 ms）時以結束碼 1 結束：
+    python benchmarks/deadline_benchmark.py
+    python benchmarks/deadline_benchmark.py --meetings 10000 --max-ms 50
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingParser, normalize_due_date, date_sort_key
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingParser, normalize_due_date, date_sort_key
+
+from meeting_store import MeetingStore
+from action_item_tracker import ActionItemTracker, action_item_fingerprint
+from transcript_generator import generate_transcript
+
+
+DEFAULT_MEETINGS = 2000
+DEFAULT_MAX_MS = 20.0  # 逾期查詢延遲 p95 的上限（毫秒）
+BATCH_SIZE = 500  # 建立時每次寫入的會議數
+STATUSES = ("pending", "in_progress", "delayed", "completed")
+
+
+def build(folder, meetings, seed=0):
+    """產生並儲存會議記錄與工作事項追蹤，回傳 (store, tracker, 秒數)"""
+    rng = random.Random(seed)
+    store = MeetingStore(folder)
+    tracker = ActionItemTracker(store)
+    started = time.perf_counter()
+    for start in range(0, meetings, BATCH_SIZE):
+        batch = []
+        for number in range(start, min(meetings, start + BATCH_SIZE)):
+            meeting = MeetingParser.parse_text_file(generate_transcript(seed=number))
+            for item in meeting.action_items:
+                # 產生器的工作事項描述重複很多，加上專案代號讓每個工作事項只在連續幾次會議中出現
+                item.description = f"專案P{number // 4} {item.description}"
+                item.status = rng.choice(STATUSES)
+            batch.append(meeting)
+        filenames = store.save_many(batch)
+        tracker.record_meetings(list(zip(filenames, batch)))
+    return store, tracker, time.perf_counter() - started
+
+
+def scan_overdue(store, as_of):
+    """不使用索引：逐一讀取所有會議記錄，以最近一次出現為準推算尚未完成且已逾期的工作事項指紋
+    
+    與工作事項追蹤相同：會議依日期與檔名由舊到新，同一次會議中重複的工作事項只取第一個。
+    """
+    latest = {}
+    summaries = sorted(store.iter_meetings(), key=lambda summary: (date_sort_key(summary.date), summary.filename))
+    for summary in summaries:
+        meeting = store.load(summary.filename)
+        seen = set()
+        for item in meeting.action_items:
+            fingerprint = action_item_fingerprint(item.description, item.assignee)
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            state = latest.setdefault(fingerprint, ["pending", ""])
+            if item.status and item.status != "pending":
+                state[0] = item.status
+            if item.due_date:
+                state[1] = normalize_due_date(item.due_date, meeting.date)
+    return {
+        fingerprint for fingerprint, (status, due_on) in latest.items()
+        if status != "completed" and due_on and due_on < as_of.isoformat()
+    }
+
+
+def measure(function, repeat):
+    """回傳 (最後一次的結果, 排序後的各次延遲毫秒)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, sorted(timings)
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark overdue and due-this-week queries on the deadline index")
+    parser.add_argument("--meetings", type=int, default=DEFAULT_MEETINGS)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per measurement")
+    parser.add_argument("--max-ms", type=float, default=DEFAULT_MAX_MS, help="allowed p95 latency of the overdue query")
+    args = parser.parse_args(argv)
+    
+    folder = tempfile.mkdtemp(prefix="meeting-deadline-bench-")
+    try:
+        store, tracker, seconds = build(folder, args.meetings)
+        # 以所有截止日期的中位數作為「今天」，約一半尚未完成的工作事項已逾期
+        due_dates = sorted(item["due_on"] for item in tracker.query(limit=10 ** 9) if item["due_on"])
+        as_of = date.fromisoformat(due_dates[len(due_dates) // 2])
+        print(f"Saved {args.meetings} meetings in {seconds:.1f}s, {len(due_dates)} tracked items with due dates, "
+              f"as of {as_of}")
+        
+        overdue, indexed = measure(lambda: tracker.overdue(as_of=as_of, limit=10 ** 9), args.repeat)
+        _, page = measure(lambda: tracker.overdue(as_of=as_of), args.repeat)
+        (_, _, week), weekly = measure(lambda: tracker.due_this_week(as_of=as_of), args.repeat)
+        expected, scan = measure(lambda: scan_overdue(store, as_of), 1)
+        found = {item["fingerprint"] for item in overdue}
+        print(f"overdue, all {len(overdue):6d}   p50 {percentile(indexed, 0.5):8.2f} ms  p95 {percentile(indexed, 0.95):8.2f} ms")
+        print(f"overdue, first page      p50 {percentile(page, 0.5):8.2f} ms  p95 {percentile(page, 0.95):8.2f} ms")
+        print(f"due this week ({sum(len(group['items']) for group in week):4d})     "
+              f"p50 {percentile(weekly, 0.5):8.2f} ms  p95 {percentile(weekly, 0.95):8.2f} ms  "
+              f"{len(week)} assignees ({as_of - timedelta(days=as_of.weekday())} week)")
+        print(f"reading every record         {scan[0]:8.1f} ms  {'same items' if found == expected else 'MISMATCH'}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    if found != expected:
+        print(f"Index returned {len(found)} overdue items, reading the records found {len(expected)}")
+        return 1
+    if percentile(page, 0.95) > args.max_ms:
+        print(f"Overdue query slower than {args.max_ms:g} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+會議記錄物件的記憶體用量測試
+以 transcript_generator 建立指定數量（預設 5000）的會議記錄存檔，
+分別以沒有 __slots__ 的物件（改版前）、__slots__ 物件與延遲載入檢視保存全部會議記錄，
+以 tracemalloc 量測常駐的位元組數並換算為每筆會議記錄的用量：
+    python benchmarks/memory_benchmark.py
+    python benchmarks/memory_benchmark.py --meetings 1000
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingRecord, Topic, ActionItem, MeetingParser
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingRecord, Topic, ActionItem, MeetingParser
+
+from meeting_store import MeetingStore, LazyMeeting
+from transcript_generator import generate_transcript
+
+
+DEFAULT_MEETINGS = 5000
+BATCH_SIZE = 500  # 建立存檔時每次 save_many 的會議數
+
+
+def _without_slots(cls):
+    """建立與 cls 相同但沒有 __slots__ 的類別，屬性存放在每個物件的 __dict__ 中，即改版前的結構"""
+    namespace = {
+        name: value for name, value in vars(cls).items()
+        if name not in cls.__slots__ and name != "__slots__"
+    }
+    return type(cls.__name__, (), namespace)
+
+
+_DICT_BACKED = {cls: _without_slots(cls) for cls in (MeetingRecord, Topic, ActionItem)}
+
+
+def _to_dict_backed(obj):
+    """將 __slots__ 物件轉換為改版前的物件，先執行 __init__ 再設定屬性，與 from_dict 的順序相同"""
+    converted = _DICT_BACKED[type(obj)]()
+    for name in type(obj).__slots__:
+        value = getattr(obj, name)
+        if name in ("topics", "action_items"):
+            value = [_to_dict_backed(child) for child in value]
+        setattr(converted, name, value)
+    return converted
+
+
+def build_archive(folder, meetings):
+    """產生會議記錄並存入 folder，回傳 MeetingStore"""
+    store = MeetingStore(folder)
+    batch = []
+    for number in range(meetings):
+        content = generate_transcript(seed=number, topics=4, bullets=4, language="mixed" if number % 3 else "zh")
+        meeting = MeetingParser.parse_text_file(content)
+        meeting.title = f"{meeting.title} #{number}"  # 檔名取自標題，避免互相覆蓋
+        batch.append(meeting)
+        if len(batch) >= BATCH_SIZE:
+            store.save_many(batch)
+            batch = []
+    if batch:
+        store.save_many(batch)
+    return store
+
+
+def measure(build):
+    """回傳 (build 結果常駐的位元組數, 秒數)"""
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        result = build()
+        seconds = time.perf_counter() - started
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size, seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure per-meeting memory of the meeting record classes")
+    parser.add_argument("--meetings", type=int, default=DEFAULT_MEETINGS)
+    args = parser.parse_args(argv)
+    
+    folder = tempfile.mkdtemp(prefix="meeting-memory-bench-")
+    try:
+        store = build_archive(folder, args.meetings)
+        summaries = store.list_meetings()
+        documents = []
+        for summary in summaries:
+            with open(os.path.join(folder, summary.filename), "r", encoding="utf-8") as f:
+                documents.append(f.read())
+        print(f"{len(summaries)} meetings, {sum(len(text.encode('utf-8')) for text in documents) / (1024 * 1024):.1f} MiB JSON")
+        
+        variants = [
+            ("dict-backed objects", lambda: [_to_dict_backed(MeetingRecord.from_dict(json.loads(text))) for text in documents]),
+            ("__slots__ objects", lambda: [MeetingRecord.from_dict(json.loads(text)) for text in documents]),
+            ("lazy views", lambda: [LazyMeeting(store, summary) for summary in store.list_meetings()]),
+        ]
+        baseline = None
+        for name, build in variants:
+            size, seconds = measure(build)
+            per_meeting = size / len(summaries)
+            baseline = baseline or per_meeting
+            print(f"{name:<22}{size / (1024 * 1024):>9.1f} MiB{per_meeting:>10.0f} B/meeting"
+                  f"{per_meeting / baseline:>8.1%}{seconds:>9.2f}s", flush=True)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
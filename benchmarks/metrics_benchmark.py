@@ -0,0 +1,70 @@
+"""
+效能量測的額外負擔測試
+以 transcript_generator 產生的逐字稿比較停用與啟用 perf_metrics 時逐行解析的耗時。
+停用時解析器不呼叫計時器；啟用時每 16 行量測一行各階段的耗時，
+額外耗時超過上限（預設 10%）時以結束碼 1 結束：
+    python benchmarks/metrics_benchmark.py
+    python benchmarks/metrics_benchmark.py --meetings 500 --bullets 40
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingParser
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingParser
+
+from perf_metrics import metrics
+from transcript_generator import generate_transcript
+
+
+DEFAULT_MEETINGS = 200
+DEFAULT_MAX_OVERHEAD = 0.10  # 啟用時相對於停用時的額外耗時上限
+
+
+def parse_all(contents):
+    """逐行解析所有逐字稿，回傳秒數；與上傳時相同，整份內容以一個片段傳入"""
+    started = time.perf_counter()
+    for content in contents:
+        MeetingParser.parse_stream((content,))
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cost of stage timing in the parser")
+    parser.add_argument("--meetings", type=int, default=DEFAULT_MEETINGS)
+    parser.add_argument("--bullets", type=int, default=20, help="discussion points per topic")
+    parser.add_argument("--repeat", type=int, default=7, help="runs per mode, the fastest is reported")
+    parser.add_argument("--max-overhead", type=float, default=DEFAULT_MAX_OVERHEAD, help="allowed slowdown when enabled")
+    args = parser.parse_args(argv)
+    
+    contents = [generate_transcript(seed=number, topics=6, bullets=args.bullets) for number in range(args.meetings)]
+    size = sum(len(content.encode("utf-8")) for content in contents)
+    print(f"{args.meetings} transcripts, {size / (1024 * 1024):.1f} MiB")
+    
+    # 先解析一次暖機，之後交替量測兩種模式，各取最快的一次
+    parse_all(contents)
+    timings = {False: [], True: []}
+    for _ in range(args.repeat):
+        for enabled in (False, True):
+            metrics.enabled = enabled
+            timings[enabled].append(parse_all(contents))
+    metrics.enabled = False
+    disabled, enabled = min(timings[False]), min(timings[True])
+    overhead = enabled / disabled - 1
+    
+    print(f"disabled  {disabled * 1000:8.1f} ms")
+    print(f"enabled   {enabled * 1000:8.1f} ms  ({overhead:+.1%})")
+    if overhead > args.max_overhead:
+        print(f"Stage timing costs more than {args.max_overhead:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
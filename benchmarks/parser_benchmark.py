@@ -0,0 +1,241 @@
+"""
+會議記錄解析效能測試
+以 transcript_generator 產生不同大小、語言與工作事項密度的逐字稿，
+分別量測 tokenize 與各個 _extract_* 階段、完整的 parse_text_file / parse_stream，
+以及經由 Flask 測試用戶端的 /upload 完整流程，輸出吞吐量 (MB/s) 與尖峰記憶體用量。
+結果與儲存的基準比較：
+    python benchmarks/parser_benchmark.py                    # 與 benchmarks/baseline.json 比較
+    python benchmarks/parser_benchmark.py --update-baseline  # 以這次的結果更新基準
+    python benchmarks/parser_benchmark.py --strict           # 時間退步也以結束碼 1 結束
+基準中的時間是單一台機器的絕對時間，在其他機器上、甚至同一台機器的不同次執行之間都可能相差數成，
+因此時間只作為參考，預設只有尖峰記憶體相對於輸入大小的比例（與機器無關）退步時以結束碼 1 結束。
+要以時間把關時，先在同一台機器上以 --update-baseline 重新產生基準，再以 --strict 執行，
+基準記錄了產生它的機器，與目前的機器不同時會提醒。
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import platform
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingParser
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingParser
+
+from transcript_generator import generate_transcript
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.3  # 容許的退步比例
+MIN_CHECK_SECONDS = 0.001  # 基準時間低於此值的階段誤差太大，不做比較
+MACHINE_KEY = "_machine"  # 基準中記錄產生機器的鍵，其他鍵為案例名稱
+
+# 測試案例：名稱 -> transcript_generator 參數
+CASES = {
+    "zh-small": dict(seed=1, size=16 * 1024, language="zh"),
+    "zh-1mb": dict(seed=2, size=1024 * 1024, language="zh"),
+    "en-1mb": dict(seed=3, size=1024 * 1024, language="en", action_density=0.3),
+    "mixed-1mb-fallback": dict(seed=4, size=1024 * 1024, language="mixed", action_density=0.0),
+    "mixed-1mb-dense": dict(seed=5, size=1024 * 1024, language="mixed", bullets=12, action_density=1.0),
+    "zh-8mb": dict(seed=6, size=8 * 1024 * 1024, language="zh"),
+}
+
+
+def _stages(content):
+    """依 parse_text_file 的順序回傳 (階段名稱, 呼叫函式)，各階段共用同一份事件索引"""
+    stream = MeetingParser.tokenize(content)
+    return [
+        ("tokenize", lambda: MeetingParser.tokenize(content)),
+        ("_extract_title", lambda: MeetingParser._extract_title(content, stream)),
+        ("_extract_datetime", lambda: MeetingParser._extract_datetime(content, stream)),
+        ("_extract_participants", lambda: MeetingParser._extract_participants(content, stream)),
+        ("_extract_topics", lambda: MeetingParser._extract_topics(content, stream)),
+        ("_extract_action_items", lambda: MeetingParser._extract_action_items(content, stream)),
+        ("parse_text_file", lambda: MeetingParser.parse_text_file(content)),
+        ("parse_stream", lambda: MeetingParser.parse_stream(io.StringIO(content))),
+    ]
+
+
+def _best_time(func, repeat):
+    """執行 repeat 次，回傳最短的秒數"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _peak_memory(func):
+    """回傳執行期間 Python 配置記憶體的尖峰位元組數"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class UploadBench:
+    """以暫存目錄啟動應用程式，量測 /upload 的完整流程（解析、分析、儲存）
+    
+    同一份內容會重複上傳多次：每次上傳在結尾多加一個空行，不影響解析結果但 transcript_key 不同，
+    不會被當成重複上傳直接回傳既有的會議記錄；也關閉 SectionCache，每次都完整解析。
+    """
+    
+    def __init__(self):
+        self.folder = tempfile.mkdtemp(prefix="meeting-bench-")
+        os.environ["DATA_FOLDER"] = os.path.join(self.folder, "data")
+        os.environ["UPLOAD_FOLDER"] = os.path.join(self.folder, "uploads")
+        os.environ["UPLOAD_WORKERS"] = "0"  # 在請求中直接處理，時間才包含解析與儲存
+        os.environ["SECTION_CACHE_MAX_ENTRIES"] = "0"
+        sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+        import main
+        self.app = main
+        self.client = main.app.test_client()
+        self.uploads = 0
+    
+    def upload(self, data):
+        self.uploads += 1
+        data += b"\n" * self.uploads
+        hits = self.app.transcript_cache.hits
+        response = self.client.post("/upload", data={"file": (io.BytesIO(data), "bench.txt")})
+        if response.status_code != 302:
+            raise RuntimeError(f"/upload returned {response.status_code}")
+        if self.app.transcript_cache.hits != hits:
+            raise RuntimeError("/upload reused an existing record instead of parsing")
+    
+    def close(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+def run(cases, repeat=5, upload=True):
+    """執行效能測試，回傳 {案例: {大小、各階段秒數與吞吐量、尖峰記憶體}}"""
+    results = {}
+    bench = UploadBench() if upload else None
+    try:
+        for name in cases:
+            content = generate_transcript(**CASES[name])
+            data = content.encode("utf-8")
+            megabytes = len(data) / (1024 * 1024)
+            
+            stages = {}
+            for stage, func in _stages(content):
+                seconds = _best_time(func, repeat)
+                stages[stage] = {"seconds": seconds, "mb_per_second": megabytes / seconds if seconds else 0}
+            if bench is not None:
+                seconds = _best_time(lambda: bench.upload(data), repeat)
+                stages["/upload"] = {"seconds": seconds, "mb_per_second": megabytes / seconds if seconds else 0}
+            
+            peak = _peak_memory(lambda: MeetingParser.parse_text_file(content))
+            results[name] = {
+                "bytes": len(data),
+                "stages": stages,
+                "peak_memory_bytes": peak,
+                "peak_memory_ratio": peak / len(data),  # 尖峰記憶體相對於輸入大小，與機器無關
+            }
+    finally:
+        if bench is not None:
+            bench.close()
+    return results
+
+
+def machine():
+    """目前機器的描述，記錄在基準中，用來判斷基準的時間是否可以比較"""
+    return f"{platform.node()} {platform.machine()} {os.cpu_count()} CPU Python {platform.python_version()}"
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """與基準比較，回傳 (時間退步的說明列表, 記憶體退步的說明列表)"""
+    slower = []
+    memory = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        for stage, measured in result["stages"].items():
+            reference = expected["stages"].get(stage)
+            if reference is None or reference["seconds"] < MIN_CHECK_SECONDS:
+                continue
+            if measured["seconds"] > reference["seconds"] * (1 + tolerance):
+                slower.append(
+                    f"{name} {stage}: {measured['mb_per_second']:.2f} MB/s "
+                    f"(baseline {reference['mb_per_second']:.2f} MB/s)"
+                )
+        if result["peak_memory_ratio"] > expected["peak_memory_ratio"] * (1 + tolerance):
+            memory.append(
+                f"{name} peak memory: {result['peak_memory_ratio']:.1f}x input "
+                f"(baseline {expected['peak_memory_ratio']:.1f}x)"
+            )
+    return slower, memory
+
+
+def report(results):
+    """輸出各案例各階段的時間與吞吐量"""
+    for name, result in results.items():
+        print(f"{name}  {result['bytes'] / 1024:.0f} KiB  peak memory {result['peak_memory_bytes'] / (1024 * 1024):.1f} MiB "
+              f"({result['peak_memory_ratio']:.1f}x input)")
+        for stage, measured in result["stages"].items():
+            print(f"    {stage:<24}{measured['seconds'] * 1000:>10.2f} ms{measured['mb_per_second']:>14.2f} MB/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MeetingParser and the /upload path")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement, the best is kept")
+    parser.add_argument("--no-upload", action="store_true", help="skip the /upload measurement")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown ratio")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--strict", action="store_true",
+                        help="also fail on timing regressions (use with a baseline recorded on this machine)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+    
+    results = run(args.case or list(CASES), repeat=args.repeat, upload=not args.no_upload)
+    report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        baseline[MACHINE_KEY] = machine()
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --update-baseline first")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    recorded = baseline.get(MACHINE_KEY)
+    if recorded != machine():
+        print(f"Baseline recorded on {recorded or 'an unknown machine'}, timings are not comparable here")
+    slower, memory = compare(results, baseline, args.tolerance)
+    for regression in slower:
+        print(f"{'REGRESSION' if args.strict else 'SLOWER    '}  {regression}")
+    for regression in memory:
+        print(f"REGRESSION  {regression}")
+    if slower and not args.strict:
+        print("Timing differences are advisory; run with --strict against a baseline from this machine to enforce them")
+    return 1 if memory or (slower and args.strict) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
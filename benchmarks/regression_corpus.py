@@ -0,0 +1,118 @@
+"""
+解析結果回歸測試
+benchmarks/corpus 中每份會議紀錄（*.txt）都有一份基準結果（同名的 *.json，為 MeetingRecord.to_dict() 的內容），
+以 parse_text_file、parse_stream（逐行與任意切割的片段）以及上傳時使用的 parse_transcript_stream
+解析後與基準逐欄比較，確保解析器的改寫不會改變輸出，也確保 .txt 的格式判斷不會把會議紀錄當成逐字稿
+（例如標題以時間結尾的會議紀錄）。另外確認 transcript_key 相同的會議紀錄（重複上傳時直接使用既有的會議記錄）
+解析結果也相同。任何一份結果與基準不同時列出不同的欄位並以結束碼 1 結束：
+    python benchmarks/regression_corpus.py            # 與基準比較
+    python benchmarks/regression_corpus.py --update   # 以目前的解析結果重新產生基準
+只有在刻意改變解析結果時才更新基準，並在提交時說明改變的原因。
+"""
+
+import os
+import io
+import sys
+import json
+import glob
+import argparse
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingParser
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingParser
+
+from transcript_formats import parse_transcript_stream
+from transcript_cache import transcript_key
+
+
+CORPUS_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+CHUNK_SIZE = 7  # 切割片段的字元數，刻意讓片段邊界落在行、標記與多位元組文字的中間
+
+
+def read_transcript(path):
+    """讀取會議紀錄，保留原始的換行字元"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def parsers(name, content, expected):
+    """回傳 (名稱, 應有的結果, 解析結果的 to_dict()) 的列表"""
+    chunks = (content[i:i + CHUNK_SIZE] for i in range(0, len(content), CHUNK_SIZE))
+    upload_expected = expected
+    if "\r" in content:
+        # 上傳時以通用換行解碼，結果與 \r\n 轉成 \n 之後的內容相同
+        upload_expected = MeetingParser.parse_text_file(content.replace("\r\n", "\n").replace("\r", "\n")).to_dict()
+    upload = parse_transcript_stream(io.BytesIO(content.encode("utf-8")), name)
+    return [
+        ("parse_text_file", expected, MeetingParser.parse_text_file(content).to_dict()),
+        ("parse_stream", expected, MeetingParser.parse_stream(io.StringIO(content)).to_dict()),
+        ("parse_stream chunks", expected, MeetingParser.parse_stream(chunks).to_dict()),
+        ("parse_transcript_stream", upload_expected, upload.to_dict()),
+    ]
+
+
+def differences(expected, actual, path=""):
+    """逐欄比較兩份結果，回傳不同欄位的 (路徑, 基準值, 實際值)"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        found = []
+        for key in list(expected) + [key for key in actual if key not in expected]:
+            found.extend(differences(expected.get(key), actual.get(key), f"{path}.{key}" if path else key))
+        return found
+    if isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        found = []
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            found.extend(differences(left, right, f"{path}[{index}]"))
+        return found
+    return [] if expected == actual else [(path, expected, actual)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare parser output on the regression corpus with the stored results")
+    parser.add_argument("--update", action="store_true", help="rewrite the stored results from the current parser")
+    parser.add_argument("--max-differences", type=int, default=10, help="differences printed per transcript")
+    args = parser.parse_args(argv)
+    
+    paths = sorted(glob.glob(os.path.join(CORPUS_FOLDER, "*.txt")))
+    failures = 0
+    uploads = {}  # transcript_key -> (檔名, 上傳時的解析結果)
+    for path in paths:
+        name = os.path.basename(path)
+        content = read_transcript(path)
+        baseline_path = os.path.splitext(path)[0] + ".json"
+        if args.update:
+            with open(baseline_path, "w", encoding="utf-8") as f:
+                json.dump(MeetingParser.parse_text_file(content).to_dict(), f, ensure_ascii=False, indent=2)
+                f.write("\n")
+        if not os.path.exists(baseline_path):
+            print(f"{name:<36} no stored result")
+            failures += 1
+            continue
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            expected = json.load(f)
+        
+        mismatched = []
+        for method, wanted_result, actual in parsers(name, content, expected):
+            found = differences(wanted_result, actual)
+            if found:
+                mismatched.append(method)
+                for field, wanted, got in found[:args.max_differences]:
+                    print(f"  {name} {method} {field}: expected {wanted!r}, got {got!r}")
+        
+        # 重複上傳時以 transcript_key 取得既有的會議記錄，相同的 key 必須代表相同的解析結果
+        key = transcript_key(io.BytesIO(content.encode("utf-8")), name)
+        same_key = uploads.setdefault(key, (name, actual))
+        if same_key[0] != name and differences(same_key[1], actual):
+            mismatched.append(f"transcript_key same as {same_key[0]}")
+        print(f"{name:<36} {len(expected['topics']):3d} topics {len(expected['action_items']):3d} action items  "
+              f"{'DIFFERS: ' + ', '.join(mismatched) if mismatched else 'same'}")
+        failures += bool(mismatched)
+    
+    print(f"{len(paths)} transcripts, {failures} differ from the stored results")
+    return 1 if failures or not paths else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
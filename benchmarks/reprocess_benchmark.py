@@ -0,0 +1,130 @@
+"""
+重新分析已儲存會議記錄的效能測試
+以 transcript_generator 產生的會議記錄模擬以舊規則儲存的封存：部分會議的工作事項狀態被改回 pending，
+比較以 pandas 一次分類所有工作事項描述與逐一以 MeetingParser._build_action_item 分類的耗時，
+再量測單一行程與多行程的 dry-run，以及實際改寫的耗時。
+匯入後（修改狀態前）的 dry-run 有任何差異（批次匯入與重新分析的前一次會議不同），
+改寫的會議數與被修改的會議數不同，或改寫後仍有差異時以結束碼 1 結束：
+    python benchmarks/reprocess_benchmark.py
+    python benchmarks/reprocess_benchmark.py --meetings 10000 --stale 0.1 --workers 8
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingParser, MeetingRecord
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingParser, MeetingRecord
+
+from meeting_store import MeetingStore
+from action_item_tracker import ActionItemTracker
+from meeting_analytics import TrendAnalytics
+from meeting_rollup import MeetingRollup
+from batch_ingest import BatchIngestor
+from reprocess import Reprocessor, classify_descriptions
+from transcript_generator import generate_transcript
+
+
+BATCH_SIZE = 500  # 建立時每次匯入的會議數
+
+
+def build(folder, meetings, workers):
+    """以批次匯入產生會議記錄與索引（含效率指標），回傳 (store, tracker, analytics, rollup)"""
+    store = MeetingStore(folder)
+    tracker = ActionItemTracker(store)
+    analytics = TrendAnalytics(store)
+    rollup = MeetingRollup(store, analytics)
+    ingestor = BatchIngestor(store, tracker, analytics, max_workers=workers, meeting_rollup=rollup)
+    for start in range(0, meetings, BATCH_SIZE):
+        ingestor.ingest([
+            (f"{number}.txt", generate_transcript(seed=number).encode("utf-8"))
+            for number in range(start, min(meetings, start + BATCH_SIZE))
+        ])
+    return store, tracker, analytics, rollup
+
+
+def make_stale(store, fraction, seed=0):
+    """把部分會議的所有工作事項狀態改回 pending，模擬以舊規則儲存的會議記錄，回傳修改的會議數"""
+    rng = random.Random(seed)
+    stale = []
+    for summary in store.iter_meetings():
+        if rng.random() >= fraction:
+            continue
+        meeting = MeetingRecord.from_dict(store.load(summary.filename).to_dict())
+        meeting.filename = summary.filename
+        if not meeting.action_items:
+            continue
+        for item in meeting.action_items:
+            item.status = "pending"
+        stale.append(meeting)
+    store.save_many(stale)
+    return len(stale)
+
+
+def classify_one_by_one(descriptions):
+    """不使用 pandas：逐一以解析時的方式分類"""
+    items = []
+    for description in descriptions:
+        MeetingParser._build_action_item(items, description)
+        items.append(None)
+    return items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark re-analysing stored meetings with the current rules")
+    parser.add_argument("--meetings", type=int, default=2000)
+    parser.add_argument("--stale", type=float, default=0.2, help="fraction of meetings stored with outdated statuses")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="classifier processes")
+    args = parser.parse_args(argv)
+    
+    folder = tempfile.mkdtemp(prefix="meeting-reprocess-bench-")
+    try:
+        store, tracker, analytics, rollup = build(folder, args.meetings, args.workers)
+        # 批次匯入與重新分析依相同的順序計算效率指標，剛匯入的會議記錄不應有任何差異
+        imported = Reprocessor(store, tracker, analytics, rollup, max_workers=args.workers).run(dry_run=True)
+        print(f"dry run after import ({imported['changed']} would change)")
+        stale = make_stale(store, args.stale)
+        descriptions = [
+            item.description for summary in store.iter_meetings() for item in store.load(summary.filename).action_items
+        ]
+        print(f"{args.meetings} meetings, {len(descriptions)} action items, {stale} stored with outdated statuses")
+        
+        started = time.perf_counter()
+        classify_descriptions(descriptions)
+        vectorized = time.perf_counter() - started
+        started = time.perf_counter()
+        classify_one_by_one(descriptions)
+        one_by_one = time.perf_counter() - started
+        print(f"classify one by one  {one_by_one * 1000:8.1f} ms")
+        print(f"classify with pandas {vectorized * 1000:8.1f} ms  ({one_by_one / vectorized:.1f}x)")
+        
+        for workers in sorted({1, args.workers}):
+            reprocessor = Reprocessor(store, tracker, analytics, rollup, max_workers=workers, batch_size=250)
+            report = reprocessor.run(dry_run=True)
+            print(f"dry run, {workers:2d} workers {report['seconds'] * 1000:8.1f} ms  ({report['changed']} would change)")
+        
+        report = reprocessor.run()
+        after = reprocessor.run(dry_run=True)
+        print(f"reprocess            {report['seconds'] * 1000:8.1f} ms  ({report['rewritten']} rewritten)")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    if imported["changed"]:
+        print(f"{imported['changed']} meetings differ right after the import")
+        return 1
+    if report["rewritten"] != stale or after["changed"]:
+        print(f"Rewrote {report['rewritten']} of {stale} stale meetings, {after['changed']} still differ")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
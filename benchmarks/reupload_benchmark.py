@@ -0,0 +1,114 @@
+"""
+重新上傳逐字稿的效能測試
+以 transcript_generator 產生的逐字稿比較三種情況的處理時間：
+第一次上傳（解析並儲存）、內容相同的重新上傳（只計算 transcript_key 並查詢對應表）、
+以及只修改一個討論要點的重新上傳（未修改的議題與工作事項區塊取自 SectionCache）。
+修改後的逐字稿以快取解析的結果與不使用快取時不同時以結束碼 1 結束：
+    python benchmarks/reupload_benchmark.py
+    python benchmarks/reupload_benchmark.py --meetings 100 --topics 12 --bullets 40
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingParser, SectionCache
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingParser, SectionCache
+
+from meeting_store import MeetingStore
+from transcript_cache import TranscriptCache, transcript_key
+from transcript_formats import parse_transcript_stream
+from transcript_generator import generate_transcript
+
+
+def edit_transcript(content):
+    """在第一個項目符號行的結尾加上文字，模擬修正一個討論要點後重新上傳"""
+    lines = content.split("\n")
+    for i, line in enumerate(lines):
+        if line.lstrip().startswith("-"):
+            lines[i] = line + "（已修正）"
+            break
+    return "\n".join(lines)
+
+
+def parse_all(payloads):
+    """以上傳時相同的方式逐段解析所有逐字稿，回傳 (會議記錄列表, 秒數)"""
+    started = time.perf_counter()
+    meetings = [parse_transcript_stream(io.BytesIO(payload), "meeting.txt") for payload in payloads]
+    return meetings, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark identical and edited transcript re-uploads")
+    parser.add_argument("--meetings", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=8, help="topics per transcript")
+    parser.add_argument("--bullets", type=int, default=20, help="discussion points per topic")
+    args = parser.parse_args(argv)
+    
+    payloads = [
+        generate_transcript(seed=number, topics=args.topics, bullets=args.bullets).encode("utf-8")
+        for number in range(args.meetings)
+    ]
+    edited = [edit_transcript(payload.decode("utf-8")).encode("utf-8") for payload in payloads]
+    size = sum(len(payload) for payload in payloads)
+    print(f"{args.meetings} transcripts, {size / (1024 * 1024):.1f} MiB")
+    
+    folder = tempfile.mkdtemp(prefix="meeting-reupload-bench-")
+    previous_cache = MeetingParser.section_cache
+    try:
+        store = MeetingStore(folder)
+        transcripts = TranscriptCache(store)
+        
+        # 第一次上傳：解析並儲存，同時填入段落快取與雜湊值對應；
+        # 依序重新解析所有逐字稿時，快取需容納全部段落，否則 LRU 會在用到之前就淘汰
+        MeetingParser.section_cache = SectionCache(max_entries=args.meetings * (args.topics * 2 + 4))
+        started = time.perf_counter()
+        meetings, _ = parse_all(payloads)
+        filenames = store.save_many(meetings)
+        first = time.perf_counter() - started
+        transcripts.remember_many([
+            (transcript_key(io.BytesIO(payload), "meeting.txt"), filename)
+            for payload, filename in zip(payloads, filenames)
+        ])
+        
+        # 內容相同的重新上傳：不解析
+        started = time.perf_counter()
+        found = sum(
+            transcripts.lookup(transcript_key(io.BytesIO(payload), "meeting.txt")) is not None for payload in payloads
+        )
+        identical = time.perf_counter() - started
+        
+        # 修改過的重新上傳：有段落快取與沒有段落快取
+        hits = MeetingParser.section_cache.hits
+        cached_meetings, cached = parse_all(edited)
+        reused = MeetingParser.section_cache.hits - hits
+        MeetingParser.section_cache = None
+        fresh_meetings, fresh = parse_all(edited)
+    finally:
+        MeetingParser.section_cache = previous_cache
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    print(f"first upload       {first * 1000:8.1f} ms")
+    print(f"identical re-upload{identical * 1000:8.1f} ms  ({first / identical:.1f}x, {found}/{args.meetings} found)")
+    print(f"edited, no cache   {fresh * 1000:8.1f} ms")
+    print(f"edited, cached     {cached * 1000:8.1f} ms  ({fresh / cached:.1f}x, "
+          f"{reused} sections reused)")
+    
+    mismatches = sum(a.to_dict() != b.to_dict() for a, b in zip(cached_meetings, fresh_meetings))
+    if mismatches or found != args.meetings:
+        print(f"{mismatches} edited transcripts parsed differently with the section cache, "
+              f"{args.meetings - found} identical transcripts not found")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+會議摘要彙總效能測試
+以 transcript_generator 產生指定數量（預設 5000）的會議記錄並建立摘要彙總，
+比較由彙總取得整體總覽與逐一讀取所有會議記錄計算相同數字的耗時，
+並量測儲存一次會議時更新彙總檔、繪製圖表與由快取取得圖表的耗時。
+總覽（重新載入彙總檔後）的 p95 超過上限（預設 50 ms）時以結束碼 1 結束：
+    python benchmarks/rollup_benchmark.py
+    python benchmarks/rollup_benchmark.py --meetings 20000 --max-ms 100
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingParser, EfficiencyAnalyzer
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingParser, EfficiencyAnalyzer
+
+from meeting_store import MeetingStore
+from meeting_analytics import TrendAnalytics
+from meeting_rollup import MeetingRollup, render_chart, CHARTS
+from page_cache import PageCache, make_etag
+from transcript_generator import generate_transcript
+
+
+DEFAULT_MEETINGS = 5000
+DEFAULT_MAX_MS = 50.0  # 總覽延遲 p95 的上限（毫秒）
+BATCH_SIZE = 500  # 建立時每次寫入的會議數
+
+
+def build(folder, meetings):
+    """產生並儲存會議記錄，同時更新趨勢與摘要彙總，回傳 (store, analytics, rollup, 秒數)"""
+    store = MeetingStore(folder)
+    analytics = TrendAnalytics(store)
+    rollup = MeetingRollup(store, analytics)
+    started = time.perf_counter()
+    for start in range(0, meetings, BATCH_SIZE):
+        batch = [
+            MeetingParser.parse_text_file(generate_transcript(seed=number, topics=4, bullets=2))
+            for number in range(start, min(meetings, start + BATCH_SIZE))
+        ]
+        filenames = store.save_many(batch)
+        stats = analytics.record_meetings([(filename, meeting, None) for filename, meeting in zip(filenames, batch)])
+        rollup.record_meetings(list(zip(filenames, batch, stats)))
+    return store, analytics, rollup, time.perf_counter() - started
+
+
+def scan_overview(store):
+    """不使用彙總：逐一讀取所有會議記錄計算會議數、工作事項數與完成數"""
+    meetings = items = completed = 0
+    for summary in store.iter_meetings():
+        meeting = store.load(summary.filename)
+        stats = EfficiencyAnalyzer.summarize(meeting)
+        meetings += 1
+        items += stats.total_items
+        completed += stats.completed_items
+    return meetings, items, completed
+
+
+def measure(function, repeat):
+    """回傳 (最後一次的結果, 排序後的各次延遲毫秒)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, sorted(timings)
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark archive-wide dashboards built from the meeting rollup")
+    parser.add_argument("--meetings", type=int, default=DEFAULT_MEETINGS)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per measurement")
+    parser.add_argument("--max-ms", type=float, default=DEFAULT_MAX_MS, help="allowed p95 latency of the overview")
+    args = parser.parse_args(argv)
+    
+    folder = tempfile.mkdtemp(prefix="meeting-rollup-bench-")
+    try:
+        store, analytics, rollup, seconds = build(folder, args.meetings)
+        print(f"Saved {args.meetings} meetings with rollup updates in {seconds:.1f}s, "
+              f"rollup file {os.path.getsize(rollup.path) / 1024:.0f} KiB")
+        
+        # 其他行程更新後第一次讀取：重新載入彙總檔並建立 DataFrame；
+        # pandas 在第一次計算總覽時才載入，載入時間由 startup_benchmark 量測，不計入這裡
+        rollup.overview()
+        def cold_overview():
+            fresh = MeetingRollup(store, analytics)
+            return fresh.overview()
+        
+        overview, cold = measure(cold_overview, args.repeat)
+        _, warm = measure(rollup.overview, args.repeat)
+        expected, scan = measure(lambda: scan_overview(store), 1)
+        found = (overview["meetings"], overview["action_items"], overview["status_counts"]["completed"])
+        print(f"overview after reload  p50 {percentile(cold, 0.5):8.2f} ms  p95 {percentile(cold, 0.95):8.2f} ms")
+        print(f"overview, loaded       p50 {percentile(warm, 0.5):8.2f} ms  p95 {percentile(warm, 0.95):8.2f} ms")
+        print(f"reading every record       {scan[0]:8.1f} ms  {'same totals' if found == expected else 'MISMATCH'}")
+        
+        # 儲存一次會議時的更新：與其他請求相同，改寫整個彙總檔
+        meeting = MeetingParser.parse_text_file(generate_transcript(seed=args.meetings))
+        filename = store.save(meeting)
+        stats = analytics.record_meeting(filename, meeting)
+        _, update = measure(lambda: rollup.record_meeting(filename, meeting, stats), args.repeat)
+        print(f"update on save         p50 {percentile(update, 0.5):8.2f} ms  p95 {percentile(update, 0.95):8.2f} ms")
+        
+        charts = PageCache(folder, folder="charts", suffix=".png")
+        for name in CHARTS:
+            _, render = measure(lambda: render_chart(rollup, name), 3)
+            etag = make_etag(rollup.signature(), name)
+            charts.put(name, etag, render_chart(rollup, name))
+            _, cached = measure(lambda: charts.get(name, etag), args.repeat)
+            print(f"chart {name:<12}  render {render[0]:8.1f} ms  cached p95 {percentile(cached, 0.95):6.3f} ms")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    if found != expected:
+        print(f"Rollup totals {found} differ from the records {expected}")
+        return 1
+    if percentile(cold, 0.95) > args.max_ms:
+        print(f"Overview slower than {args.max_ms:g} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+惡意輸入的線性時間檢查
+產生大量編號行、「名稱：」片段、超長單行等容易讓回溯式正規表示式退化為平方時間的輸入，
+在多個大小（預設 10、30、100 MB）下量測 parse_text_file 與 parse_stream，
+每 MB 的解析時間隨輸入變大而超過容許倍數時視為非線性，以結束碼 1 結束：
+    python benchmarks/scaling_benchmark.py
+    python benchmarks/scaling_benchmark.py --sizes 1,2,4 --case star_topics_one_line
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingParser
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingParser
+
+
+DEFAULT_SIZES = (10, 30, 100)  # 輸入大小（MB）
+DEFAULT_MAX_GROWTH = 2.0  # 最大輸入的每 MB 時間相對於最小輸入的容許倍數
+MODES = ("batch", "stream")
+
+
+def _repeat(unit, size):
+    """重複 unit 直到約 size 位元組（UTF-8）"""
+    return unit * max(1, size // len(unit.encode("utf-8")))
+
+
+def _numbered(template, size):
+    """以遞增編號填入 template 直到約 size 位元組"""
+    parts = []
+    written = 0
+    number = 1
+    while written < size:
+        part = template.format(number)
+        parts.append(part)
+        written += len(part.encode("utf-8"))
+        number += 1
+    return "".join(parts)
+
+
+# 惡意輸入：名稱 -> 產生指定位元組數內容的函式
+CASES = {
+    # 每一行都是編號議題，Teams 字幕匯出常見
+    "numbered_lines": lambda size: _numbered("{}. x\n", size),
+    # 同一行中大量的星號編號議題
+    "star_topics_one_line": lambda size: _numbered("*{}. x ", size),
+    # 沒有空行的「名稱：內容」，每個都是後備規則的候選
+    "field_labels": lambda size: _repeat("speaker: hello\n", size),
+    # 名稱與冒號分在不同行
+    "field_labels_split": lambda size: _repeat("名稱\n：內容\n", size),
+    # 同一行中大量的「負責人：」與日期
+    "assignees_one_line": lambda size: _repeat("負責人：王 1/2 ", size),
+    # 沒有日期的「負責人：」
+    "assignees_without_date": lambda size: _repeat("負責人：王 \n", size),
+    # 單一議題中大量的項目符號
+    "bullets_one_topic": lambda size: "1. t\n" + _repeat("- x\n", size),
+    # 工作事項區塊中大量的項目
+    "action_block": lambda size: "工作事項：\n" + _repeat("- x 負責人：y\n", size),
+}
+
+
+def _parse(mode, content):
+    if mode == "stream":
+        return MeetingParser.parse_stream(io.StringIO(content))
+    return MeetingParser.parse_text_file(content)
+
+
+def measure(name, sizes, mode):
+    """回傳 [(MB, 秒數)]，依大小排序"""
+    timings = []
+    for megabytes in sorted(sizes):
+        content = CASES[name](int(megabytes * 1024 * 1024))
+        started = time.perf_counter()
+        _parse(mode, content)
+        timings.append((megabytes, time.perf_counter() - started))
+        del content
+    return timings
+
+
+def growth(timings):
+    """最大輸入與最小輸入每 MB 時間的比值，線性時間約為 1"""
+    (small_size, small_time), (large_size, large_time) = timings[0], timings[-1]
+    if small_time <= 0:
+        return 0.0
+    return (large_time / large_size) / (small_time / small_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that MeetingParser scales linearly on adversarial inputs")
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="cases to run (default: all)")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma separated input sizes in MB")
+    parser.add_argument("--mode", action="append", choices=MODES, help="parser entry points (default: both)")
+    parser.add_argument("--max-growth", type=float, default=DEFAULT_MAX_GROWTH,
+                        help="allowed growth of seconds per MB from the smallest to the largest size")
+    args = parser.parse_args(argv)
+    
+    sizes = [float(size) for size in args.sizes.split(",") if size.strip()]
+    if len(sizes) < 2:
+        parser.error("at least two sizes are required")
+    
+    failures = []
+    for name in args.case or list(CASES):
+        for mode in args.mode or MODES:
+            timings = measure(name, sizes, mode)
+            ratio = growth(timings)
+            cells = "  ".join(f"{size:g} MB {seconds:.2f}s" for size, seconds in timings)
+            verdict = "ok" if ratio <= args.max_growth else "NONLINEAR"
+            print(f"{name:<24}{mode:<8}{cells}  growth {ratio:.2f}  {verdict}", flush=True)
+            if ratio > args.max_growth:
+                failures.append(f"{name} ({mode})")
+    
+    if failures:
+        print(f"Non-linear scaling: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+全文檢索效能測試
+以 transcript_generator 產生指定數量（預設 10000）的會議記錄並建立檢索索引，
+量測數個常見與罕見查詢的延遲，任何查詢的 p95 超過上限（預設 50 ms）時以結束碼 1 結束：
+    python benchmarks/search_benchmark.py
+    python benchmarks/search_benchmark.py --meetings 2000 --max-ms 20
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingParser
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingParser
+
+from meeting_store import MeetingStore
+from meeting_search import SearchIndex
+from transcript_generator import generate_transcript
+
+
+DEFAULT_MEETINGS = 10000
+DEFAULT_MAX_MS = 50.0  # 查詢延遲 p95 的上限（毫秒）
+BATCH_SIZE = 500  # 建立索引時每個交易的會議數
+
+# 查詢：常見的詞（幾乎每次會議都出現）、多詞、單一個字（常出現在段落結尾）、英文與不存在的詞
+QUERIES = (
+    "測試進度",
+    "供應商交期",
+    "回歸測試",
+    "客戶要求提前交付",
+    "期",
+    "regression",
+    "supplier lead time",
+    "預算 hardware",
+    "不存在的關鍵字",
+)
+
+
+def build_index(folder, meetings):
+    """產生會議記錄並寫入檢索索引，回傳 (索引, 建立秒數)"""
+    store = MeetingStore(folder)
+    index = SearchIndex(store)
+    started = time.perf_counter()
+    batch = []
+    for number in range(meetings):
+        content = generate_transcript(seed=number, topics=4, bullets=4, language="mixed" if number % 3 else "zh")
+        batch.append((f"meeting_{number:05d}.json", MeetingParser.parse_text_file(content)))
+        if len(batch) >= BATCH_SIZE:
+            index.record_meetings(batch)
+            batch = []
+    if batch:
+        index.record_meetings(batch)
+    return index, time.perf_counter() - started
+
+
+def measure(index, query, repeat):
+    """回傳 (符合的會議數, 排序後的各次延遲毫秒)"""
+    timings = []
+    total = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        total = index.search(query)["total"]
+        timings.append((time.perf_counter() - started) * 1000)
+    return total, sorted(timings)
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark full-text search over many meetings")
+    parser.add_argument("--meetings", type=int, default=DEFAULT_MEETINGS)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query")
+    parser.add_argument("--max-ms", type=float, default=DEFAULT_MAX_MS, help="allowed p95 latency per query")
+    args = parser.parse_args(argv)
+    
+    folder = tempfile.mkdtemp(prefix="meeting-search-bench-")
+    try:
+        index, seconds = build_index(folder, args.meetings)
+        size = os.path.getsize(index.index_path)
+        print(f"Indexed {args.meetings} meetings in {seconds:.1f}s ({size / (1024 * 1024):.1f} MiB)")
+        
+        failures = []
+        for query in QUERIES:
+            total, timings = measure(index, query, args.repeat)
+            p50, p95 = percentile(timings, 0.5), percentile(timings, 0.95)
+            verdict = "ok" if p95 <= args.max_ms else "SLOW"
+            print(f"{query:<20}{total:>8} hits  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms  {verdict}", flush=True)
+            if p95 > args.max_ms:
+                failures.append(query)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    if failures:
+        print(f"Queries over {args.max_ms:g} ms: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+冷啟動效能測試
+以 transcript_generator 產生的會議記錄建立資料目錄後，每次量測都啟動新的 Python 行程，
+量測匯入 src/main.py 的耗時與第一個請求的延遲（含該請求需要的服務初始化），
+模擬無伺服器部署時每個冷啟動的行程。匯入後已載入 pandas、numpy 或 matplotlib，
+或匯入耗時、第一個請求的延遲中位數超過上限時以結束碼 1 結束：
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --meetings 2000 --repeat 10 --max-import-ms 500
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_store import MeetingStore
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_store import MeetingStore
+
+from action_item_tracker import ActionItemTracker
+from meeting_analytics import TrendAnalytics
+from meeting_search import SearchIndex
+from topic_index import TopicIndex
+from meeting_rollup import MeetingRollup
+from transcript_cache import TranscriptCache
+from batch_ingest import BatchIngestor
+from transcript_generator import generate_transcript
+
+
+DEFAULT_MEETINGS = 500
+DEFAULT_MAX_IMPORT_MS = 400.0  # 匯入 src/main.py 的耗時中位數上限（毫秒）
+DEFAULT_MAX_REQUEST_MS = 600.0  # 第一個請求的延遲中位數上限（毫秒）
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib")  # 匯入時不應載入的分析函式庫
+BATCH_SIZE = 500  # 建立時每次匯入的會議數
+SRC_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def build(folder, meetings):
+    """以批次匯入產生會議記錄與所有索引，與應用程式相同，回傳第一筆會議記錄的檔名"""
+    os.makedirs(folder)
+    store = MeetingStore(folder)
+    analytics = TrendAnalytics(store)
+    ingestor = BatchIngestor(
+        store, ActionItemTracker(store), analytics,
+        search_index=SearchIndex(store), topic_index=TopicIndex(store, analytics),
+        transcript_cache=TranscriptCache(store), meeting_rollup=MeetingRollup(store, analytics),
+    )
+    for start in range(0, meetings, BATCH_SIZE):
+        ingestor.ingest([
+            (f"{number}.txt", generate_transcript(seed=number).encode("utf-8"))
+            for number in range(start, min(meetings, start + BATCH_SIZE))
+        ])
+    return next(store.iter_meetings()).filename
+
+
+# 在新的行程中執行：先不匯入任何本專案的模組，量測匯入應用程式與第一個請求，以一行 JSON 輸出
+MEASURE_SCRIPT = """
+import sys, json, time
+started = time.perf_counter()
+sys.path.append(sys.argv[1])
+import main
+imported = time.perf_counter()
+heavy = sys.argv[3].split(",")
+loaded = [name for name in heavy if name in sys.modules]
+client = main.app.test_client()
+started_request = time.perf_counter()
+response = client.get(sys.argv[2])
+finished = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "request_ms": (finished - started_request) * 1000,
+    "status": response.status_code,
+    "heavy_after_import": loaded,
+    "heavy_after_request": [name for name in heavy if name in sys.modules],
+    "services": [service._name for service in main.SERVICES if service.initialized],
+}))
+"""
+
+
+def run_fresh(url, data_folder, upload_folder):
+    """啟動新的 Python 行程量測一次冷啟動，回傳 MEASURE_SCRIPT 輸出的結果"""
+    env = dict(os.environ, DATA_FOLDER=data_folder, UPLOAD_FOLDER=upload_folder, LAZY_INIT="1")
+    output = subprocess.run(
+        [sys.executable, "-c", MEASURE_SCRIPT, SRC_FOLDER, url, ",".join(HEAVY_MODULES)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold starts: importing the app and serving the first request")
+    parser.add_argument("--meetings", type=int, default=DEFAULT_MEETINGS)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh processes per route")
+    parser.add_argument("--max-import-ms", type=float, default=DEFAULT_MAX_IMPORT_MS, help="allowed median import time")
+    parser.add_argument("--max-request-ms", type=float, default=DEFAULT_MAX_REQUEST_MS,
+                        help="allowed median latency of the first request")
+    args = parser.parse_args(argv)
+    
+    folder = tempfile.mkdtemp(prefix="meeting-startup-bench-")
+    failures = []
+    try:
+        data_folder = os.path.join(folder, "data")
+        filename = build(data_folder, args.meetings)
+        print(f"{args.meetings} meetings, {args.repeat} fresh processes per route")
+        
+        routes = ("/", "/api/meetings?limit=20", f"/meeting/{filename}", "/api/search?q=預算", "/api/dashboard")
+        imports = []
+        for url in routes:
+            runs = [run_fresh(url, data_folder, os.path.join(folder, "uploads")) for _ in range(args.repeat)]
+            imports.extend(run["import_ms"] for run in runs)
+            latency = statistics.median(run["request_ms"] for run in runs)
+            last = runs[-1]
+            print(f"{url[:40]:<40} first request p50 {latency:8.1f} ms  max {max(run['request_ms'] for run in runs):8.1f} ms"
+                  f"  status {last['status']}  loads {', '.join(last['heavy_after_request']) or '-'}"
+                  f"  opens {', '.join(last['services']) or '-'}")
+            if any(run["heavy_after_import"] for run in runs):
+                failures.append(f"Importing the app loaded {', '.join(runs[0]['heavy_after_import'])}")
+            if latency > args.max_request_ms:
+                failures.append(f"First request to {url} slower than {args.max_request_ms:g} ms")
+        
+        import_ms = statistics.median(imports)
+        print(f"{'import src/main.py':<40} p50 {import_ms:8.1f} ms  max {max(imports):8.1f} ms")
+        if import_ms > args.max_import_ms:
+            failures.append(f"Import slower than {args.max_import_ms:g} ms")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    for failure in dict.fromkeys(failures):
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
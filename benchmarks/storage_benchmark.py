@@ -0,0 +1,116 @@
+"""
+會議記錄檔案格式效能測試
+以既有的會議記錄目錄（--archive）或 transcript_generator 產生的會議記錄（預設 2000 筆），
+比較各格式的檔案大小、編碼與完整解碼的時間，以及只讀取標題與效率指標的時間：
+    python benchmarks/storage_benchmark.py
+    python benchmarks/storage_benchmark.py --archive src/data
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingParser
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingParser
+
+from meeting_codecs import CODECS, MEETING_EXTENSIONS, get_codec, decode_meeting, read_meeting_fields
+from transcript_generator import generate_transcript
+
+
+DEFAULT_MEETINGS = 2000
+SUMMARY_FIELDS = ("title", "efficiency_metrics")  # 部分讀取的欄位
+
+
+def load_archive(folder):
+    """讀取目錄中所有格式的會議記錄，回傳字典列表"""
+    documents = []
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith(MEETING_EXTENSIONS):
+            with open(os.path.join(folder, filename), 'rb') as f:
+                documents.append(decode_meeting(f.read()))
+    return documents
+
+
+def generate_archive(meetings):
+    """產生會議記錄，回傳字典列表"""
+    documents = []
+    for number in range(meetings):
+        content = generate_transcript(seed=number, topics=4, bullets=4, language="mixed" if number % 3 else "zh")
+        documents.append(MeetingParser.parse_text_file(content).to_dict())
+    return documents
+
+
+def measure(codec, documents, folder):
+    """以 codec 寫入全部會議記錄並讀回，回傳 (總位元組數, 編碼秒數, 解碼秒數, 部分讀取秒數)"""
+    started = time.perf_counter()
+    payloads = [codec.encode(data) for data in documents]
+    encode_seconds = time.perf_counter() - started
+    
+    paths = []
+    for number, payload in enumerate(payloads):
+        path = os.path.join(folder, f"{number:06d}{codec.extension}")
+        with open(path, 'wb') as f:
+            f.write(payload)
+        paths.append(path)
+    
+    started = time.perf_counter()
+    for path in paths:
+        with open(path, 'rb') as f:
+            decode_meeting(f.read())
+    decode_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    for path in paths:
+        with open(path, 'rb') as f:
+            read_meeting_fields(f, SUMMARY_FIELDS)
+    fields_seconds = time.perf_counter() - started
+    
+    return sum(len(payload) for payload in payloads), encode_seconds, decode_seconds, fields_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare meeting record file formats")
+    parser.add_argument("--archive", help="existing meeting record folder (default: generate meetings)")
+    parser.add_argument("--meetings", type=int, default=DEFAULT_MEETINGS, help="meetings to generate without --archive")
+    parser.add_argument("--format", action="append", choices=sorted(CODECS), help="formats to compare (default: all installed)")
+    args = parser.parse_args(argv)
+    
+    documents = load_archive(args.archive) if args.archive else generate_archive(args.meetings)
+    if not documents:
+        print("No meeting records found")
+        return 1
+    
+    codecs = []
+    for name in args.format or CODECS:
+        try:
+            codecs.append(get_codec(name))
+        except ValueError as e:
+            print(f"Skipping {name}: {e}")
+    
+    print(f"{len(documents)} meetings")
+    print(f"{'format':<14}{'size MiB':>10}{'ratio':>8}{'encode ms':>11}{'decode ms':>11}{'title+metrics ms':>18}")
+    baseline = None
+    folder = tempfile.mkdtemp(prefix="meeting-storage-bench-")
+    try:
+        for codec in codecs:
+            size, encode_seconds, decode_seconds, fields_seconds = measure(codec, documents, folder)
+            baseline = baseline or size
+            print(
+                f"{codec.name:<14}{size / (1024 * 1024):>10.2f}{size / baseline:>8.1%}"
+                f"{encode_seconds * 1000:>11.0f}{decode_seconds * 1000:>11.0f}{fields_seconds * 1000:>18.0f}",
+                flush=True,
+            )
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
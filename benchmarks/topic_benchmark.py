@@ -0,0 +1,134 @@
+"""
+相近議題索引效能測試
+以 transcript_generator 產生指定數量（預設 5000）的會議記錄並建立議題索引，
+量測以 LSH 查詢相近議題的延遲，並與逐一比對所有歷史議題的做法比較；
+任何查詢的 p95 超過上限（預設 20 ms）時以結束碼 1 結束：
+    python benchmarks/topic_benchmark.py
+    python benchmarks/topic_benchmark.py --meetings 20000 --max-ms 30
+"""
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+
+# 添加上層目錄到 Python 路徑，以便導入會議資料結構模組
+try:
+    from meeting_data_structure import MeetingParser, TOPIC_SIMILARITY, topic_shingles, topic_similarity
+except ImportError:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from meeting_data_structure import MeetingParser, TOPIC_SIMILARITY, topic_shingles, topic_similarity
+
+from meeting_store import MeetingStore
+from meeting_analytics import TrendAnalytics
+from topic_index import TopicIndex
+from transcript_generator import generate_transcript
+
+
+DEFAULT_MEETINGS = 5000
+DEFAULT_MAX_MS = 20.0  # 查詢延遲 p95 的上限（毫秒）
+BATCH_SIZE = 500  # 建立索引時每個交易的會議數
+
+# 查詢：改寫過措辭的常見議題、英文與不存在的議題
+QUERIES = (
+    "ECU 測試進度追蹤",
+    "供應商交期確認",
+    "回歸測試結果",
+    "regression test status",
+    "完全無關的議題標題",
+)
+
+
+def build_index(folder, meetings):
+    """產生會議記錄並寫入議題索引，回傳 (索引, 建立秒數)"""
+    store = MeetingStore(folder)
+    analytics = TrendAnalytics(store)
+    index = TopicIndex(store, analytics)
+    started = time.perf_counter()
+    batch = []
+    for number in range(meetings):
+        content = generate_transcript(seed=number, topics=4, bullets=2, language="mixed" if number % 3 else "zh")
+        batch.append((f"meeting_{number:05d}.json", MeetingParser.parse_text_file(content)))
+        if len(batch) >= BATCH_SIZE:
+            analytics.record_meetings([(filename, meeting, None) for filename, meeting in batch])
+            index.record_meetings(batch)
+            batch = []
+    if batch:
+        analytics.record_meetings([(filename, meeting, None) for filename, meeting in batch])
+        index.record_meetings(batch)
+    return index, time.perf_counter() - started
+
+
+def brute_force(index, query):
+    """逐一比對所有歷史議題，回傳相近議題所屬的議題串數"""
+    shingles = topic_shingles(query)
+    conn = sqlite3.connect(index.index_path)
+    try:
+        return len({
+            thread for stored, thread in conn.execute("SELECT shingles, thread FROM topics")
+            if topic_similarity(shingles, set(stored.split("\n"))) >= TOPIC_SIMILARITY
+        })
+    finally:
+        conn.close()
+
+
+def measure(function, repeat):
+    """回傳 (最後一次的結果, 排序後的各次延遲毫秒)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return result, sorted(timings)
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate topic lookups")
+    parser.add_argument("--meetings", type=int, default=DEFAULT_MEETINGS)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query")
+    parser.add_argument("--max-ms", type=float, default=DEFAULT_MAX_MS, help="allowed p95 latency per query")
+    args = parser.parse_args(argv)
+    
+    folder = tempfile.mkdtemp(prefix="meeting-topic-bench-")
+    try:
+        index, seconds = build_index(folder, args.meetings)
+        with sqlite3.connect(index.index_path) as conn:
+            topics = conn.execute("SELECT COUNT(*) FROM topics").fetchone()[0]
+        print(f"Indexed {topics} topics from {args.meetings} meetings in {seconds:.1f}s")
+        
+        failures = []
+        for query in QUERIES:
+            # 每段只取最新的候選，重複的議題由同一議題串中較新的議題代表，因此以議題串數比較召回
+            found, timings = measure(lambda: len({topic.thread for topic in index.similar(query, limit=1000)}), args.repeat)
+            expected, scan = measure(lambda: brute_force(index, query), 3)
+            p95 = percentile(timings, 0.95)
+            verdict = "ok" if p95 <= args.max_ms else "SLOW"
+            print(
+                f"{query:<24}{found:>6}/{expected:<6} threads  p50 {percentile(timings, 0.5):7.2f} ms  "
+                f"p95 {p95:7.2f} ms  full scan {scan[0]:8.1f} ms  {verdict}",
+                flush=True,
+            )
+            if p95 > args.max_ms:
+                failures.append(query)
+        
+        _, timings = measure(lambda: index.chains(), 3)
+        print(f"Repeated-topic chains over all series: {timings[0]:.1f} ms")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    if failures:
+        print(f"Queries over {args.max_ms:g} ms: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+合成會議逐字稿產生器
+以固定的亂數種子產生可重現的中文、英文或中英混合會議紀錄，
+可控制檔案大小、議題數、每個議題的討論要點數與工作事項區塊的密度，供效能測試使用。
+    python benchmarks/transcript_generator.py --size 1000000 --language mixed > transcript.txt
+"""
+
+import sys
+import random
+import argparse
+
+
+LANGUAGES = ("zh", "en", "mixed")
+
+_ZH_NAMES = ("王小明", "李大華", "張志豪", "陳美玲", "林怡君", "黃建國", "吳淑芬", "劉家豪")
+_EN_NAMES = ("Alice", "Bob", "Carol", "David", "Emma", "Frank", "Grace", "Henry")
+_ZH_SUBJECTS = ("ECU 軟體", "電池管理", "產線品質", "供應鏈", "測試驗證", "專案管理")
+_EN_SUBJECTS = ("Firmware", "Battery Management", "Line Quality", "Supply Chain", "Validation", "Program")
+_ZH_TOPICS = ("測試進度", "規格變更", "成本分析", "風險評估", "客戶回饋", "排程調整", "品質異常", "資源分配")
+_EN_TOPICS = ("test progress", "spec change", "cost analysis", "risk review", "customer feedback",
+              "schedule update", "quality issue", "resource plan")
+_ZH_PHRASES = ("目前進度符合預期", "需要再確認供應商交期", "測試環境尚未就緒", "客戶要求提前交付",
+               "建議增加一輪回歸測試", "預算仍有餘裕", "與硬體團隊同步介面定義", "問題已回報原廠")
+_EN_PHRASES = ("progress is on track", "supplier lead time needs confirmation", "test rig is not ready yet",
+               "customer asked for an earlier delivery", "another regression round is recommended",
+               "budget still has headroom", "interface spec to be aligned with hardware", "issue escalated to vendor")
+_ZH_STATUS = ("已完成", "進行中", "延遲", "")
+_EN_STATUS = ("done", "in progress", "blocked", "")
+
+
+def generate_transcript(seed=0, size=None, topics=10, bullets=5, action_density=0.5, language="zh"):
+    """產生一份會議紀錄
+    
+    size 為目標位元組數（UTF-8），指定時會持續加入議題直到達到大小，topics 只作為最少議題數；
+    bullets 為每個議題最多的討論要點數；action_density 為每個議題後接一個工作事項區塊的機率，
+    為 0 時整份紀錄沒有工作事項區塊，解析器會改用「名稱：內容」的後備規則；
+    language 為 zh、en 或 mixed（中文標頭、中英混合內容）。
+    """
+    if language not in LANGUAGES:
+        raise ValueError(f"language must be one of {LANGUAGES}")
+    rng = random.Random(seed)
+    english = language == "en"
+    names = _EN_NAMES if english else _ZH_NAMES + (_EN_NAMES if language == "mixed" else ())
+    
+    lines = _header(rng, language, names)
+    written = sum(len(line.encode("utf-8")) + 1 for line in lines)
+    topic_number = 0
+    while topic_number < topics or (size is not None and written < size):
+        topic_number += 1
+        block = _topic(rng, language, names, topic_number, bullets)
+        if rng.random() < action_density:
+            block.extend(_action_block(rng, language, names))
+        elif english or rng.random() < 0.5:
+            # 沒有工作事項區塊時，以發言紀錄的形式出現「名稱：內容」
+            block.extend(_speaker_lines(rng, language, names))
+        block.append("")
+        lines.extend(block)
+        written += sum(len(line.encode("utf-8")) + 1 for line in block)
+    
+    return "\n".join(lines) + "\n"
+
+
+def _pick(rng, language, zh, en):
+    """依語言選取片語，mixed 時中英各半"""
+    if language == "en" or (language == "mixed" and rng.random() < 0.5):
+        return rng.choice(en)
+    return rng.choice(zh)
+
+
+def _header(rng, language, names):
+    year, month, day = 2024, rng.randint(1, 12), rng.randint(1, 28)
+    hour = rng.randint(8, 17)
+    attendees = rng.sample(names, k=min(len(names), rng.randint(3, 6)))
+    if language == "en":
+        subject = rng.choice(_EN_SUBJECTS)
+        return [
+            f"Subject: {subject} weekly sync",
+            f"To: {', '.join(attendees)}",
+            f"Date: {year}-{month:02d}-{day:02d} {hour}:00",
+            "",
+        ]
+    subject = rng.choice(_ZH_SUBJECTS)
+    return [
+        f"{subject} 工程會議紀錄",
+        f"會議時間：{year}年{month}月{day}日 {hour}:00",
+        f"參與人員：{'、'.join(attendees)}",
+        "",
+    ]
+
+
+def _topic(rng, language, names, number, bullets):
+    title = _pick(rng, language, _ZH_TOPICS, _EN_TOPICS)
+    lines = [f"{number}. {title}"]
+    lines.append(" ".join(_pick(rng, language, _ZH_PHRASES, _EN_PHRASES) for _ in range(rng.randint(1, 4))))
+    for _ in range(rng.randint(1, max(1, bullets))):
+        lines.append(f"- {_pick(rng, language, _ZH_PHRASES, _EN_PHRASES)}（{rng.choice(names)}）")
+    if language != "en" and rng.random() < 0.5:
+        lines.append(f"決策：{rng.choice(_ZH_PHRASES)}")
+    if language != "en" and rng.random() < 0.2:
+        lines.append(f"結論：{rng.choice(_ZH_PHRASES)}")
+    return lines
+
+
+def _due_date(rng):
+    return f"{rng.randint(1, 12)}/{rng.randint(1, 28)}"
+
+
+def _action_block(rng, language, names):
+    lines = ["", "工作事項："]
+    for _ in range(rng.randint(1, 5)):
+        task = _pick(rng, language, _ZH_TOPICS, _EN_TOPICS)
+        status = _pick(rng, language, _ZH_STATUS, _EN_STATUS)
+        lines.append(f"- 更新{task}報告 負責人：{rng.choice(names)} {_due_date(rng)}前完成 {status}".rstrip())
+    return lines
+
+
+def _speaker_lines(rng, language, names):
+    lines = [""]
+    for _ in range(rng.randint(1, 3)):
+        phrase = _pick(rng, language, _ZH_PHRASES, _EN_PHRASES)
+        if language == "en":
+            status = rng.choice(_EN_STATUS)
+            lines.append(f"{rng.choice(names)}: {phrase}, due {_due_date(rng)} {status}".rstrip())
+        else:
+            status = rng.choice(_ZH_STATUS)
+            lines.append(f"{rng.choice(names)}：{phrase}，{_due_date(rng)}前完成 {status}".rstrip())
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic meeting transcript")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=None, help="target size in bytes")
+    parser.add_argument("--topics", type=int, default=10)
+    parser.add_argument("--bullets", type=int, default=5)
+    parser.add_argument("--action-density", type=float, default=0.5)
+    parser.add_argument("--language", choices=LANGUAGES, default="zh")
+    args = parser.parse_args(argv)
+    
+    sys.stdout.write(generate_transcript(
+        seed=args.seed, size=args.size, topics=args.topics, bullets=args.bullets,
+        action_density=args.action_density, language=args.language,
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+延遲初始化
+無伺服器部署時每次冷啟動都要重新匯入應用程式，匯入時只應定義函式與設定：
+LazyService 在第一次使用服務時才呼叫建立函式（開啟 SQLite、建立目錄、啟動背景執行緒），
+LazyPattern 在第一次比對時才編譯正規表示式，解析器的規則表不會拖慢不需解析的請求。
+"""
+
+import re
+import threading
+
+
+class LazyService:
+    """第一次存取屬性時才建立的服務
+    
+    factory 為不需參數的建立函式，只會被呼叫一次；多個執行緒同時第一次存取時，其他執行緒等待建立完成。
+    建立失敗時拋出建立函式的例外，下次存取會再嘗試建立。
+    需要傳入其他類別的建構函式時以 resolve() 取得實際的物件。
+    """
+    
+    __slots__ = ("_factory", "_instance", "_lock", "_name")
+    
+    def __init__(self, factory, name=None):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+        self._name = name or getattr(factory, "__name__", "service")
+    
+    @property
+    def initialized(self):
+        """是否已建立服務"""
+        return self._instance is not None
+    
+    def resolve(self):
+        """回傳服務物件，尚未建立時先建立"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._instance = self._factory()
+        return instance
+    
+    def __getattr__(self, name):
+        # 只有在 __slots__ 中找不到的屬性才會呼叫；私有屬性不觸發建立，避免複製或序列化時遞迴
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+    
+    def __repr__(self):
+        state = "initialized" if self._instance is not None else "not initialized"
+        return f"<LazyService {self._name} ({state})>"
+
+
+class LazyPattern:
+    """第一次使用時才編譯的正規表示式，用法與 re.compile 的結果相同
+    
+    第一次存取 search、match 等屬性時編譯，並把取得的屬性存入實例，
+    之後的呼叫直接由實例取得，不再經過 __getattr__，比對的耗時與編譯後的樣式相同。
+    需要傳給 re 模組函式或 pandas 時以 compiled 取得編譯後的樣式。
+    """
+    
+    def __init__(self, pattern, flags=0):
+        self._source = pattern
+        self._flags = flags
+        self._compiled = None
+    
+    @property
+    def compiled(self):
+        """編譯後的 re.Pattern"""
+        compiled = self._compiled
+        if compiled is None:
+            # 多個執行緒同時編譯時結果相同，不需加鎖
+            compiled = self._compiled = re.compile(self._source, self._flags)
+        return compiled
+    
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        value = getattr(self.compiled, name)
+        self.__dict__[name] = value
+        return value
+    
+    def __repr__(self):
+        return f"LazyPattern({self._source!r})"
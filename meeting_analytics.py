@@ -0,0 +1,448 @@
+"""
+會議趨勢分析
+每次儲存會議記錄時，以一次走訪工作事項列表得到的統計更新 SQLite 中的彙總資料，
+查詢同一系列最近 4、12、52 次會議的完成率、延遲率、重複議題比例與各負責人的產出時，
+只加總已彙總的資料，不需重新讀取任何會議記錄。
+每個系列的最新一次會議另外記錄一筆，新會議取得比較基準時只需讀取該筆資料
+"""
+
+import os
+import re
+import json
+import sqlite3
+import unicodedata
+from collections import namedtuple
+from contextlib import contextmanager
+from difflib import SequenceMatcher
+
+from meeting_data_structure import EfficiencyAnalyzer, MeetingStats, date_sort_key, time_sort_key, repeated_topic_titles
+from action_item_tracker import normalize_assignee
+
+
+ANALYTICS_FILENAME = "analytics.sqlite3"  # 彙總資料檔名，與會議記錄放在同一個目錄
+ANALYTICS_VERSION = 4  # 資料結構版本，記錄於 PRAGMA user_version
+DEFAULT_WINDOWS = (4, 12, 52)  # 預設的滾動視窗大小（會議次數）
+SERIES_PARTICIPANT_OVERLAP = 0.6  # 標題未出現過時，參與人員重疊比例（Jaccard）至少此值才併入既有系列
+SERIES_TITLE_SIMILARITY = 0.6  # 同上，系列名稱的相似度下限（difflib 的 ratio）
+
+# 系列名稱：移除標題中的日期、編號、標點與空白
+_SERIES_NOISE_RE = re.compile(r"\d{4}[-/年.]\d{1,2}[-/月.]\d{1,2}日?|\d+|[\W_]+")
+# 明確的系列標籤：標題開頭的 [名稱] 或 【名稱】
+_SERIES_TAG_RE = re.compile(r"\s*[\[【]([^\]】]+)[\]】]")
+
+_TABLES = ("meeting_stats", "assignee_stats", "series_latest")
+
+_SCHEMA = (
+    # 每次會議的統計
+    """
+    CREATE TABLE IF NOT EXISTS meeting_stats (
+        filename TEXT PRIMARY KEY,
+        series TEXT NOT NULL,
+        sort_date TEXT NOT NULL,
+        sort_time TEXT NOT NULL,
+        total_items INTEGER NOT NULL,
+        completed_items INTEGER NOT NULL,
+        delayed_items INTEGER NOT NULL,
+        topic_count INTEGER NOT NULL,
+        repeated_topics INTEGER NOT NULL,
+        topic_titles TEXT NOT NULL,
+        participants TEXT NOT NULL DEFAULT '[]'
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS stats_by_series ON meeting_stats (series, sort_date DESC, sort_time DESC, filename DESC)",
+    # 每次會議中各負責人的統計
+    """
+    CREATE TABLE IF NOT EXISTS assignee_stats (
+        filename TEXT NOT NULL,
+        assignee TEXT NOT NULL,
+        total_items INTEGER NOT NULL,
+        completed_items INTEGER NOT NULL,
+        delayed_items INTEGER NOT NULL,
+        PRIMARY KEY (filename, assignee)
+    )
+    """,
+    # 每個系列日期最新的一次會議
+    """
+    CREATE TABLE IF NOT EXISTS series_latest (
+        series TEXT PRIMARY KEY,
+        filename TEXT NOT NULL,
+        sort_date TEXT NOT NULL,
+        sort_time TEXT NOT NULL,
+        participants TEXT NOT NULL
+    )
+    """,
+)
+
+# 系列最新一次會議的檔名、排序日期與時間、參與人員
+SeriesLatest = namedtuple("SeriesLatest", ["filename", "sort_date", "sort_time", "participants"])
+
+
+def series_key(title):
+    """由會議標題取得系列名稱，同一系列的標題只差在日期或編號"""
+    text = unicodedata.normalize("NFKC", title or "").casefold()
+    return _SERIES_NOISE_RE.sub("", text)
+
+
+def detect_series(title, participants, candidates):
+    """判斷會議所屬的系列，回傳系列名稱
+    
+    標題開頭有 [名稱] 或 【名稱】 標籤時以標籤為準；否則以標題去除日期與編號後的名稱為準。
+    名稱未出現在 candidates（{系列名稱: SeriesLatest}）中時，若某個既有系列最新一次會議的參與人員
+    與此次高度重疊，且系列名稱相近（標題為空或只有日期時不比較名稱），則併入該系列。
+    """
+    tag = _SERIES_TAG_RE.match(title or "")
+    key = series_key(tag.group(1) if tag else title)
+    if tag or key in candidates:
+        return key
+    
+    attendees = set(participants or [])
+    best, best_overlap = key, SERIES_PARTICIPANT_OVERLAP
+    for series, latest in candidates.items():
+        others = set(latest.participants)
+        if not attendees or not others:
+            continue
+        overlap = len(attendees & others) / len(attendees | others)
+        if overlap < best_overlap:
+            continue
+        if key and SequenceMatcher(None, key, series).ratio() < SERIES_TITLE_SIMILARITY:
+            continue
+        best, best_overlap = series, overlap
+    return best
+
+
+def _rate(part, total):
+    return (part / total) * 100 if total > 0 else 0
+
+
+class TrendAnalytics:
+    """會議趨勢的彙總資料與滾動視窗查詢
+    
+    系列由 detect_series 判斷，會議依正規化後的 (日期, 時間, 檔名) 排序。
+    重複議題數為與同一系列前一次會議標題相同或相近（見 repeated_topic_titles）的議題數；
+    會議依日期插入系列中間時，只需重新計算它與下一次會議的重複議題數。
+    第一次開啟時會由 MeetingStore 中既有的會議記錄依日期順序一次建立彙總資料。
+    """
+    
+    def __init__(self, meeting_store):
+        self.meeting_store = meeting_store
+        self.index_path = os.path.join(meeting_store.data_folder, ANALYTICS_FILENAME)
+        self._init_index()
+    
+    @contextmanager
+    def _connect(self):
+        """開啟資料庫連線，區塊結束時提交並關閉"""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _init_index(self):
+        """建立資料結構，新建立的資料庫會匯入既有的會議記錄"""
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < ANALYTICS_VERSION:
+                for table in _TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+        
+        if version < ANALYTICS_VERSION:
+            self.rebuild()
+            with self._connect() as conn:
+                conn.execute(f"PRAGMA user_version = {ANALYTICS_VERSION}")
+    
+    def rebuild(self):
+        """由所有會議記錄依日期由舊到新重新建立彙總資料，系列判斷與逐次上傳時相同"""
+        with self._connect() as conn:
+            for table in _TABLES:
+                conn.execute(f"DELETE FROM {table}")
+        
+        filenames = [summary.filename for summary in self.meeting_store.iter_meetings()]
+        for filename in reversed(filenames):
+            meeting = self.meeting_store.load(filename)
+            if meeting is not None:
+                self.record_meeting(filename, meeting)
+    
+    def record_meeting(self, filename, meeting, stats=None):
+        """記錄一次會議的統計，回傳其 MeetingStats"""
+        return self.record_meetings([(filename, meeting, stats)])[0]
+    
+    def record_meetings(self, records):
+        """在同一個交易中記錄多次會議的統計
+        
+        records 為 (檔案名稱, 會議記錄, MeetingStats 或 None) 列表，回傳各次會議的 MeetingStats。
+        """
+        results = []
+        with self._connect() as conn:
+            for filename, meeting, stats in records:
+                if stats is None:
+                    stats = EfficiencyAnalyzer.summarize(meeting)
+                self._record(conn, filename, meeting, stats)
+                results.append(stats)
+        return results
+    
+    def _record(self, conn, filename, meeting, stats):
+        """寫入一次會議的統計，並重新計算受影響會議的重複議題數與系列的最新一次會議"""
+        series = detect_series(meeting.title, meeting.participants, self._candidates(conn))
+        date_key = date_sort_key(meeting.date)
+        time_key = time_sort_key(meeting.time)
+        
+        # 負責人依正規化後的名稱合併
+        assignees = {}
+        for assignee, counts in stats.assignees.items():
+            merged = assignees.setdefault(normalize_assignee(assignee), [0, 0, 0])
+            for i, count in enumerate(counts):
+                merged[i] += count
+        
+        # 同名檔案被改寫時，原位置的下一次會議需要重新比較
+        old_next = None
+        old = conn.execute(
+            "SELECT series, sort_date, sort_time FROM meeting_stats WHERE filename = ?", (filename,)
+        ).fetchone()
+        if old is not None:
+            old_next = self._neighbor(conn, old[0], old[1], old[2], filename, after=True)
+        conn.execute("DELETE FROM meeting_stats WHERE filename = ?", (filename,))
+        conn.execute("DELETE FROM assignee_stats WHERE filename = ?", (filename,))
+        
+        previous = self._neighbor(conn, series, date_key, time_key, filename, after=False)
+        previous_titles = set(json.loads(previous[1])) if previous else set()
+        conn.execute(
+            "INSERT INTO meeting_stats (filename, series, sort_date, sort_time, total_items, completed_items, "
+            "delayed_items, topic_count, repeated_topics, topic_titles, participants) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                filename, series, date_key, time_key, stats.total_items, stats.completed_items, stats.delayed_items,
+                len(set(stats.topic_titles)), len(repeated_topic_titles(set(stats.topic_titles), previous_titles)),
+                json.dumps(stats.topic_titles, ensure_ascii=False),
+                json.dumps(meeting.participants or [], ensure_ascii=False),
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO assignee_stats (filename, assignee, total_items, completed_items, delayed_items) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(filename, assignee, *counts) for assignee, counts in assignees.items()],
+        )
+        
+        following = [old_next, self._neighbor(conn, series, date_key, time_key, filename, after=True)]
+        for row in following:
+            if row is not None:
+                self._refresh_repeated(conn, row[0])
+        
+        self._refresh_latest(conn, series)
+        if old is not None and old[0] != series:
+            self._refresh_latest(conn, old[0])
+    
+    @staticmethod
+    def _refresh_latest(conn, series):
+        """重新記錄系列日期最新的一次會議，系列已沒有會議時移除"""
+        row = conn.execute(
+            "SELECT filename, sort_date, sort_time, participants FROM meeting_stats WHERE series = ? "
+            "ORDER BY sort_date DESC, sort_time DESC, filename DESC LIMIT 1",
+            (series,),
+        ).fetchone()
+        if row is None:
+            conn.execute("DELETE FROM series_latest WHERE series = ?", (series,))
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO series_latest (series, filename, sort_date, sort_time, participants) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (series, *row),
+            )
+    
+    @staticmethod
+    def _candidates(conn):
+        """回傳 {系列名稱: SeriesLatest}，供 detect_series 比對"""
+        return {
+            series: SeriesLatest(filename, date_key, time_key, json.loads(participants))
+            for series, filename, date_key, time_key, participants in conn.execute(
+                "SELECT series, filename, sort_date, sort_time, participants FROM series_latest"
+            )
+        }
+    
+    def series_candidates(self):
+        """回傳各系列最新一次會議的 {系列名稱: SeriesLatest}"""
+        with self._connect() as conn:
+            return self._candidates(conn)
+    
+    def series_meetings(self, series=None):
+        """回傳 {系列名稱: 依日期、時間由舊到新的檔名列表}，series 指定時只回傳該系列"""
+        query = "SELECT series, filename FROM meeting_stats"
+        params = ()
+        if series is not None:
+            query += " WHERE series = ?"
+            params = (series,)
+        query += " ORDER BY series, sort_date, sort_time, filename"
+        result = {}
+        with self._connect() as conn:
+            for name, filename in conn.execute(query, params):
+                result.setdefault(name, []).append(filename)
+        return result
+    
+    def series_by_filename(self, filenames):
+        """回傳 {檔名: 系列名稱}，尚未記錄的檔名不在結果中"""
+        filenames = list(filenames)
+        result = {}
+        with self._connect() as conn:
+            # 分批查詢，避免超過 SQLite 的參數數量上限
+            for start in range(0, len(filenames), 500):
+                batch = filenames[start:start + 500]
+                result.update(conn.execute(
+                    f"SELECT filename, series FROM meeting_stats WHERE filename IN ({', '.join('?' * len(batch))})",
+                    batch,
+                ))
+        return result
+    
+    def series_of(self, meeting):
+        """回傳會議所屬的系列名稱"""
+        return detect_series(meeting.title, meeting.participants, self.series_candidates())
+    
+    def predecessor(self, meeting, series=None, filename=None):
+        """回傳同一系列中在此會議之前的最近一次會議 (檔名, 排序日期, 排序時間)，沒有時回傳 None
+        
+        會議依 (日期, 時間, 檔名) 排序，與 series_meetings 及批次匯入的順序相同；
+        filename 為此會議已儲存的檔名，尚未儲存時視為同一時間中最晚儲存的會議。
+        一般情況下新會議的日期不早於系列最新的一次會議，只需讀取 series_latest 的一筆資料；
+        補登較舊的會議時才由索引尋找前一次會議。
+        """
+        position = (date_sort_key(meeting.date), time_sort_key(meeting.time), filename or "\U0010ffff")
+        with self._connect() as conn:
+            candidates = self._candidates(conn)
+            if series is None:
+                series = detect_series(meeting.title, meeting.participants, candidates)
+            latest = candidates.get(series)
+            if latest is None:
+                return None
+            if (latest.sort_date, latest.sort_time, latest.filename) < position:
+                return latest.filename, latest.sort_date, latest.sort_time
+            row = self._neighbor(conn, series, *position, after=False)
+            return (row[0], row[2], row[3]) if row is not None else None
+    
+    def successors(self, filenames):
+        """回傳 filenames 中各次會議在同一系列中緊接的下一次會議 {下一次會議檔名: 檔名}
+        
+        下一次會議本身也在 filenames 中時不列入；補登較舊的會議後，這些會議的前一次會議改為補登的會議。
+        """
+        filenames = set(filenames)
+        result = {}
+        with self._connect() as conn:
+            for filename in filenames:
+                row = conn.execute(
+                    "SELECT series, sort_date, sort_time FROM meeting_stats WHERE filename = ?", (filename,)
+                ).fetchone()
+                if row is None:
+                    continue
+                following = self._neighbor(conn, *row, filename, after=True)
+                if following is not None and following[0] not in filenames:
+                    result[following[0]] = filename
+        return result
+    
+    def previous_stats(self, meeting, series=None):
+        """回傳同一系列前一次會議的 MeetingStats，作為效率指標的比較基準，沒有時回傳 None"""
+        previous = self.predecessor(meeting, series)
+        return self.stats(previous[0]) if previous else None
+    
+    @staticmethod
+    def _neighbor(conn, series, date_key, time_key, filename, after):
+        """回傳同一系列中依 (日期, 時間, 檔名) 緊鄰的前一次或下一次會議 (檔名, 議題標題 JSON, 排序日期, 排序時間)"""
+        if after:
+            condition, order = "(sort_date, sort_time, filename) > (?, ?, ?)", "sort_date, sort_time, filename"
+        else:
+            condition, order = "(sort_date, sort_time, filename) < (?, ?, ?)", "sort_date DESC, sort_time DESC, filename DESC"
+        return conn.execute(
+            f"SELECT filename, topic_titles, sort_date, sort_time FROM meeting_stats WHERE series = ? AND {condition} "
+            f"ORDER BY {order} LIMIT 1",
+            (series, date_key, time_key, filename),
+        ).fetchone()
+    
+    def _refresh_repeated(self, conn, filename):
+        """重新計算一次會議與其前一次會議的重複議題數"""
+        row = conn.execute(
+            "SELECT series, sort_date, sort_time, topic_titles FROM meeting_stats WHERE filename = ?", (filename,)
+        ).fetchone()
+        if row is None:
+            return
+        previous = self._neighbor(conn, row[0], row[1], row[2], filename, after=False)
+        previous_titles = set(json.loads(previous[1])) if previous else set()
+        repeated = len(repeated_topic_titles(set(json.loads(row[3])), previous_titles))
+        conn.execute("UPDATE meeting_stats SET repeated_topics = ? WHERE filename = ?", (repeated, filename))
+    
+    def stats(self, filename):
+        """回傳一次會議的 MeetingStats，尚未記錄時由會議記錄計算並記錄，檔案不存在時回傳 None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT total_items, completed_items, delayed_items, topic_titles FROM meeting_stats WHERE filename = ?",
+                (filename,),
+            ).fetchone()
+            if row is not None:
+                assignees = {
+                    assignee: [total, completed, delayed]
+                    for assignee, total, completed, delayed in conn.execute(
+                        "SELECT assignee, total_items, completed_items, delayed_items FROM assignee_stats WHERE filename = ?",
+                        (filename,),
+                    )
+                }
+                return MeetingStats(row[0], row[1], row[2], assignees, json.loads(row[3]))
+        
+        meeting = self.meeting_store.load(filename)
+        if meeting is None:
+            return None
+        return self.record_meeting(filename, meeting)
+    
+    def window(self, series, size):
+        """回傳系列最近 size 次會議的彙總指標"""
+        recent = (
+            "SELECT filename FROM meeting_stats WHERE series = ? ORDER BY sort_date DESC, sort_time DESC, filename DESC LIMIT ?"
+        )
+        with self._connect() as conn:
+            meetings, total, completed, delayed, topics, repeated = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(total_items), 0), COALESCE(SUM(completed_items), 0), "
+                "COALESCE(SUM(delayed_items), 0), COALESCE(SUM(topic_count), 0), COALESCE(SUM(repeated_topics), 0) "
+                f"FROM meeting_stats WHERE filename IN ({recent})",
+                (series, size),
+            ).fetchone()
+            assignee_rows = conn.execute(
+                "SELECT assignee, SUM(total_items), SUM(completed_items), SUM(delayed_items) "
+                f"FROM assignee_stats WHERE filename IN ({recent}) GROUP BY assignee ORDER BY assignee",
+                (series, size),
+            ).fetchall()
+        
+        return {
+            "meetings": meetings,
+            "action_items": total,
+            "completion_rate": _rate(completed, total),
+            "delay_rate": _rate(delayed, total),
+            "repeated_topics_rate": _rate(repeated, topics),
+            "assignees": {
+                assignee: {
+                    "action_items": assignee_total,
+                    "completed": assignee_completed,
+                    "delayed": assignee_delayed,
+                    "throughput": assignee_completed / meetings if meetings else 0,  # 每次會議完成的工作事項數
+                }
+                for assignee, assignee_total, assignee_completed, assignee_delayed in assignee_rows
+            },
+        }
+    
+    def trends(self, series=None, windows=DEFAULT_WINDOWS):
+        """回傳各系列（或指定系列）在各個滾動視窗的彙總指標"""
+        query = "SELECT series, COUNT(*), MAX(sort_date) FROM meeting_stats"
+        params = ()
+        if series is not None:
+            query += " WHERE series = ?"
+            params = (series,)
+        query += " GROUP BY series ORDER BY MAX(sort_date) DESC"
+        
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        return [
+            {
+                "series": name,
+                "meetings": count,
+                "latest_date": latest_date,
+                "windows": {str(size): self.window(name, size) for size in windows},
+            }
+            for name, count, latest_date in rows
+        ]
@@ -0,0 +1,187 @@
+"""
+會議記錄檔案的序列化格式
+MeetingStore 以選定的格式寫入會議記錄，讀取時依檔案開頭判斷格式，
+因此既有的 JSON 檔案與其他格式的檔案可以放在同一個目錄中：
+    json          縮排 2 格的 JSON（原本的格式，方便人工閱讀）
+    json-compact  不縮排的 JSON
+    msgpack       MessagePack，需要安裝 msgpack 套件
+    binary        分段的二進位格式，檔頭記錄各段的位移與長度，
+                  只需要標題或效率指標時不必解碼議題與工作事項
+"""
+
+import json
+import struct
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+DEFAULT_FORMAT = "json"
+
+# 分段格式：檔頭為 MAGIC、版本與段數，接著每段一筆 (名稱, 位移, 長度)；
+# 檔頭之後是一個不縮排的 JSON 物件，每段是其中連續的幾個鍵值，完整讀取時只需解碼一次
+BINARY_MAGIC = b"MTRB"
+BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct("<4sBB")
+_BINARY_ENTRY = struct.Struct("<16sII")
+
+# 會議記錄欄位所在的段，同一段的欄位一起讀取
+_SECTION_FIELDS = (
+    ("summary", ("title", "date", "time", "participants")),
+    ("metrics", ("efficiency_metrics",)),
+    ("warnings", ("warnings",)),
+    ("topics", ("topics",)),
+    ("items", ("action_items",)),
+)
+_FIELD_SECTIONS = {field: section for section, fields in _SECTION_FIELDS for field in fields}
+
+
+class JsonCodec:
+    """JSON 格式，indent 為 None 時不縮排並省略分隔符號後的空白"""
+    
+    def __init__(self, name, indent=None):
+        self.name = name
+        self.extension = ".json"
+        self.indent = indent
+    
+    def encode(self, data):
+        separators = None if self.indent is not None else (",", ":")
+        return json.dumps(data, ensure_ascii=False, indent=self.indent, separators=separators).encode("utf-8")
+    
+    def decode(self, payload):
+        return json.loads(payload)
+    
+    def read_fields(self, f, fields):
+        data = self.decode(f.read())
+        return {field: data[field] for field in fields if field in data}
+
+
+class MsgpackCodec:
+    """MessagePack 格式"""
+    
+    name = "msgpack"
+    extension = ".msgpack"
+    
+    def encode(self, data):
+        return msgpack.packb(data, use_bin_type=True)
+    
+    def decode(self, payload):
+        return msgpack.unpackb(payload, raw=False)
+    
+    def read_fields(self, f, fields):
+        data = self.decode(f.read())
+        return {field: data[field] for field in fields if field in data}
+
+
+class BinaryCodec:
+    """分段的二進位格式
+    
+    檔頭之後的 JSON 物件依 _SECTION_FIELDS 的順序存放各段，只有存在的欄位才會寫入。
+    decode 一次解碼整個物件；read_fields 只讀取檔頭與需要的段，其他段不讀取也不解碼。
+    """
+    
+    name = "binary"
+    extension = ".mtr"
+    
+    def encode(self, data):
+        sections = []
+        for section, fields in _SECTION_FIELDS:
+            values = {field: data[field] for field in fields if field in data}
+            if values:
+                # 去掉大括號，只保留鍵值
+                fragment = json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")[1:-1]
+                sections.append((section, fragment))
+        
+        body_start = _BINARY_HEADER.size + _BINARY_ENTRY.size * len(sections)
+        offset = body_start + 1
+        parts = [_BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(sections))]
+        for section, fragment in sections:
+            parts.append(_BINARY_ENTRY.pack(section.encode("ascii"), offset, len(fragment)))
+            offset += len(fragment) + 1
+        parts.append(b"{" + b",".join(fragment for _, fragment in sections) + b"}")
+        return b"".join(parts)
+    
+    def decode(self, payload):
+        _, _, count = self._check_header(payload)
+        return json.loads(payload[_BINARY_HEADER.size + _BINARY_ENTRY.size * count:])
+    
+    def read_fields(self, f, fields):
+        head = f.read(_BINARY_HEADER.size)
+        _, _, count = self._check_header(head)
+        head += f.read(_BINARY_ENTRY.size * count)
+        entries = self._entries(head)
+        
+        data = {}
+        for section in sorted({_FIELD_SECTIONS[field] for field in fields if field in _FIELD_SECTIONS}):
+            if section in entries:
+                offset, length = entries[section]
+                f.seek(offset)
+                data.update(json.loads(b"{" + f.read(length) + b"}"))
+        return {field: data[field] for field in fields if field in data}
+    
+    @staticmethod
+    def _check_header(head):
+        if len(head) < _BINARY_HEADER.size:
+            raise ValueError("truncated binary meeting record")
+        magic, version, count = _BINARY_HEADER.unpack_from(head)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError(f"unsupported binary meeting record (version {version})")
+        return magic, version, count
+    
+    def _entries(self, head):
+        """回傳 {段名稱: (位移, 長度)}"""
+        _, _, count = self._check_header(head)
+        if len(head) < _BINARY_HEADER.size + _BINARY_ENTRY.size * count:
+            raise ValueError("truncated binary meeting record")
+        entries = {}
+        for i in range(count):
+            name, offset, length = _BINARY_ENTRY.unpack_from(head, _BINARY_HEADER.size + _BINARY_ENTRY.size * i)
+            entries[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+        return entries
+
+
+CODECS = {
+    "json": JsonCodec("json", indent=2),
+    "json-compact": JsonCodec("json-compact"),
+    "msgpack": MsgpackCodec(),
+    "binary": BinaryCodec(),
+}
+MEETING_EXTENSIONS = tuple(sorted({codec.extension for codec in CODECS.values()}))
+
+
+def get_codec(name):
+    """依名稱取得格式，名稱不存在或需要的套件未安裝時拋出 ValueError"""
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"unknown meeting record format: {name} (choose from {', '.join(CODECS)})")
+    if codec is CODECS["msgpack"] and msgpack is None:
+        raise ValueError("the msgpack format requires the msgpack package")
+    return codec
+
+
+def sniff_codec(head):
+    """依檔案開頭的位元組判斷格式，縮排與否的 JSON 都以同一個格式解碼"""
+    if head.startswith(BINARY_MAGIC):
+        return CODECS["binary"]
+    stripped = head.lstrip(b" \t\r\n")
+    if not stripped or stripped[:1] in b"{[" or stripped.startswith(b"\xef\xbb\xbf"):
+        return CODECS["json"]
+    return get_codec("msgpack")
+
+
+def decode_meeting(payload):
+    """解碼任一格式的會議記錄，回傳字典"""
+    if payload.startswith(b"\xef\xbb\xbf"):
+        payload = payload[3:]
+    return sniff_codec(payload[:16]).decode(payload)
+
+
+def read_meeting_fields(f, fields):
+    """從以二進位模式開啟的會議記錄檔案讀取指定欄位，回傳字典，檔案中沒有的欄位不會出現"""
+    head = f.read(16)
+    f.seek(0)
+    if head.startswith(b"\xef\xbb\xbf"):
+        f.seek(3)
+    return sniff_codec(head).read_fields(f, fields)
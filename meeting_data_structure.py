@@ -3,8 +3,27 @@
 用於解析 Teams 會議字幕文字檔，並自動彙整會議紀錄與工作事項
 """
 
+import time
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import namedtuple, OrderedDict
+from datetime import date
+
+from perf_metrics import metrics
+from lazy_loading import LazyPattern
+
+
 class MeetingRecord:
-    """會議記錄的主要資料結構"""
+    """會議記錄的主要資料結構
+    
+    以 __slots__ 保存屬性，不為每筆會議記錄配置 __dict__，大量會議記錄常駐於快取時較省記憶體。
+    """
+    
+    __slots__ = (
+        "title", "date", "time", "participants", "topics", "action_items",
+        "previous_meeting", "efficiency_metrics", "warnings", "filename",
+    )
     
     def __init__(self):
         # 會議基本資訊
@@ -22,10 +41,16 @@ class MeetingRecord:
         # 效率分析
         self.previous_meeting = None  # 前次會議記錄，用於效率分析
         self.efficiency_metrics = {}  # 效率指標，如完成率、延遲率等
+        
+        # 解析警告，例如超過解析時間上限而只取得部分結果
+        self.warnings = []
+        
+        # 儲存後的檔案名稱，由 MeetingStore 讀取時設定，不寫入 JSON
+        self.filename = ""
     
     def to_dict(self):
         """將會議記錄轉換為字典格式，方便 JSON 序列化"""
-        return {
+        data = {
             "title": self.title,
             "date": self.date,
             "time": self.time,
@@ -34,6 +59,10 @@ class MeetingRecord:
             "action_items": [item.to_dict() for item in self.action_items],
             "efficiency_metrics": self.efficiency_metrics
         }
+        # 只有在有警告時才寫入，完整解析的會議記錄格式不變
+        if self.warnings:
+            data["warnings"] = self.warnings
+        return data
     
     @classmethod
     def from_dict(cls, data):
@@ -55,6 +84,7 @@ class MeetingRecord:
             meeting.action_items.append(item)
         
         meeting.efficiency_metrics = data.get("efficiency_metrics", {})
+        meeting.warnings = data.get("warnings", [])
         
         return meeting
 
@@ -62,6 +92,8 @@ class MeetingRecord:
 class Topic:
     """會議議題的資料結構"""
     
+    __slots__ = ("id", "title", "description", "discussion_points", "decisions", "related_action_items")
+    
     def __init__(self):
         self.id = ""  # 議題編號，如 "1"、"2" 等
         self.title = ""  # 議題標題
@@ -98,14 +130,16 @@ class Topic:
 class ActionItem:
     """工作事項的資料結構"""
     
+    __slots__ = ("id", "description", "assignee", "due_date", "status", "related_topic_id", "completion_date", "notes")
+    
     def __init__(self):
         self.id = ""  # 工作事項 ID，用於追蹤
         self.description = ""  # 工作事項描述
         self.assignee = ""  # 負責人
-        self.due_date = ""  # 截止日期
+        self.due_date = ""  # 截止日期，ISO 格式（只有月日時以會議日期推算年份），無法辨識時為原本的文字
         self.status = ""  # 狀態：pending（待處理）、in_progress（進行中）、completed（已完成）、delayed（延遲）
         self.related_topic_id = ""  # 相關議題 ID
-        self.completion_date = ""  # 完成日期
+        self.completion_date = ""  # 完成日期，ISO 格式；解析時已完成的工作事項以會議日期為準
         self.notes = ""  # 備註
     
     def to_dict(self):
@@ -137,338 +171,1436 @@ class ActionItem:
         return item
 
 
+MeetingStats = namedtuple("MeetingStats", [
+    "total_items",      # 工作事項總數
+    "completed_items",  # 已完成的工作事項數
+    "delayed_items",    # 延遲的工作事項數
+    "assignees",        # 負責人 -> [總數, 完成數, 延遲數]
+    "topic_titles",     # 議題標題列表
+])
+
+
 class EfficiencyAnalyzer:
     """會議效率分析器"""
     
     @staticmethod
     def analyze(current_meeting, previous_meeting=None):
         """分析會議效率，比較當前會議與前次會議"""
+        previous_stats = EfficiencyAnalyzer.summarize(previous_meeting) if previous_meeting else None
+        return EfficiencyAnalyzer.compare(EfficiencyAnalyzer.summarize(current_meeting), previous_stats)
+    
+    @staticmethod
+    def summarize(meeting):
+        """走訪一次工作事項列表，統計完成數、延遲數與各負責人的數量"""
+        completed_items = 0
+        delayed_items = 0
+        assignees = {}
+        for item in meeting.action_items:
+            counts = assignees.setdefault(item.assignee, [0, 0, 0])
+            counts[0] += 1
+            if item.status == "completed":
+                completed_items += 1
+                counts[1] += 1
+            elif item.status == "delayed":
+                delayed_items += 1
+                counts[2] += 1
+        
+        return MeetingStats(
+            len(meeting.action_items), completed_items, delayed_items, assignees,
+            [topic.title for topic in meeting.topics],
+        )
+    
+    @staticmethod
+    def compare(current_stats, previous_stats=None):
+        """由兩次會議的統計計算效率指標"""
         metrics = {}
         
         # 計算當前會議的工作事項完成率
-        total_items = len(current_meeting.action_items)
-        completed_items = sum(1 for item in current_meeting.action_items if item.status == "completed")
-        completion_rate = (completed_items / total_items) * 100 if total_items > 0 else 0
+        total_items = current_stats.total_items
+        completion_rate = (current_stats.completed_items / total_items) * 100 if total_items > 0 else 0
         metrics["current_completion_rate"] = completion_rate
         
         # 如果有前次會議記錄，進行比較分析
-        if previous_meeting:
+        if previous_stats:
             # 計算前次會議的工作事項完成率
-            prev_total_items = len(previous_meeting.action_items)
-            prev_completed_items = sum(1 for item in previous_meeting.action_items if item.status == "completed")
-            prev_completion_rate = (prev_completed_items / prev_total_items) * 100 if prev_total_items > 0 else 0
+            prev_total_items = previous_stats.total_items
+            prev_completion_rate = (previous_stats.completed_items / prev_total_items) * 100 if prev_total_items > 0 else 0
             metrics["previous_completion_rate"] = prev_completion_rate
             
             # 計算完成率變化
             metrics["completion_rate_change"] = completion_rate - prev_completion_rate
             
             # 計算延遲率變化
-            current_delayed_items = sum(1 for item in current_meeting.action_items if item.status == "delayed")
-            current_delay_rate = (current_delayed_items / total_items) * 100 if total_items > 0 else 0
-            
-            prev_delayed_items = sum(1 for item in previous_meeting.action_items if item.status == "delayed")
-            prev_delay_rate = (prev_delayed_items / prev_total_items) * 100 if prev_total_items > 0 else 0
+            current_delay_rate = (current_stats.delayed_items / total_items) * 100 if total_items > 0 else 0
+            prev_delay_rate = (previous_stats.delayed_items / prev_total_items) * 100 if prev_total_items > 0 else 0
             
             metrics["current_delay_rate"] = current_delay_rate
             metrics["previous_delay_rate"] = prev_delay_rate
             metrics["delay_rate_change"] = current_delay_rate - prev_delay_rate
             
-            # 分析重複議題
-            current_topics = set(topic.title for topic in current_meeting.topics)
-            previous_topics = set(topic.title for topic in previous_meeting.topics)
-            repeated_topics = current_topics.intersection(previous_topics)
+            # 分析重複議題，改寫過措辭的相近標題也視為重複
+            current_topics = set(current_stats.topic_titles)
+            repeated_topics = repeated_topic_titles(current_topics, previous_stats.topic_titles)
             
             metrics["repeated_topics_count"] = len(repeated_topics)
             metrics["repeated_topics_percentage"] = (len(repeated_topics) / len(current_topics)) * 100 if current_topics else 0
-            metrics["repeated_topics"] = list(repeated_topics)
+            metrics["repeated_topics"] = repeated_topics
         
         return metrics
 
 
+# 解析用的正規表示式，於模組載入時編譯一次
+_LETTERS = r"A-Za-z\u4e00-\u9fa5"
+_DATE_TEXT = r"(\d{4}年\d{1,2}月\d{1,2}日|\d{4}[-/]\d{1,2}[-/]\d{1,2})"
+
+# 會議標題
+_TITLE_RE = LazyPattern(r"(.*?)(會議|評審會議|工程會議|週會).*?紀錄")
+_TITLE_KEYWORDS = ("會議", "週會")
+_SUBJECT_RE = LazyPattern(r"Subject:.*?([^\n]+)")
+
+# 會議日期和時間
+_MEETING_TIME_LABEL_RE = LazyPattern(r"會議時間[：:]")
+_MEETING_DATE_RE = LazyPattern(r"會議時間[：:]\s*" + _DATE_TEXT)
+_DATE_RE = LazyPattern(_DATE_TEXT)
+_DATE_HINT_RE = LazyPattern(r"[-/年]\d")
+_TIME_RE = LazyPattern(r"(\d{1,2}[:：]\d{2})")
+
+# 參與人員
+_PARTICIPANTS_LABEL_RE = LazyPattern(r"參[與加]人員[：:]")
+_PARTICIPANTS_RE = LazyPattern(r"參[與加]人員[：:]\s*(.*?)(?=\n|$)")
+_RECIPIENTS_RE = LazyPattern(r"To:.*?([^\n]+)")
+_PARTICIPANTS_SPLIT_RE = LazyPattern(r"[,，、；;]")
+
+# 議題：「1. 」延續到下一個以編號開頭的行，「*1. 」延續到下一個星號編號
+_TOPIC_START_RE = LazyPattern(r"\d+\.\s")
+_TOPIC_HEAD_RE = LazyPattern(r"(\d+)\.\s+")
+_TOPIC_LINE_RE = LazyPattern(r"\s*\d+\.\s")
+_STAR_TOPIC_RE = LazyPattern(r"\*\d+\.\s")
+_STAR_TOPIC_HEAD_RE = LazyPattern(r"\*(\d+)\.\s+")
+
+# 討論要點與決策：內容從起點延續到下一個分隔處，以 (起點, 分隔) 表示
+_BULLET_SECTION = (LazyPattern(r"[-•*]\s*"), LazyPattern(r"\n[-•*]"))
+_PAREN_SECTION = (LazyPattern(r"(\d+)\)\s+"), LazyPattern(r"\n\d+\)"))
+_PAREN_ITEM_RE = LazyPattern(r"\d+\)\s")
+_DECISION_LABEL_RE = LazyPattern(r"決[策定][：:]|結論[：:]")
+_NEWLINE_RE = LazyPattern(r"\n")
+_DECISION_SECTIONS = (
+    (LazyPattern(r"決[策定][：:]\s*"), _NEWLINE_RE),
+    (LazyPattern(r"結論[：:]\s*"), _NEWLINE_RE),
+)
+
+# 工作事項
+_ACTION_BLOCK_LABELS = (LazyPattern(r"工作事項[：:]"), LazyPattern(r"本次會議待辦事項"))
+_NUMBERED_SECTION = (LazyPattern(r"(\d+)\.\s+"), LazyPattern(r"\n\d+\."))
+_ASSIGNEE_LABEL_RE = LazyPattern(r"負責人[：:]")
+_ASSIGNEE_RE = LazyPattern(r"負責人[：:]\s*(.*?)(?=\n|$)")
+_ASSIGNEE_DUE_HEAD_RE = LazyPattern(r"負責人[：:]\s*([" + _LETTERS + r"]+)")
+_DUE_DATE_RE = LazyPattern(r"(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})[前完成]*")
+_FIELD_LABEL_SCAN_RE = LazyPattern(r"(?<![" + _LETTERS + r"])[" + _LETTERS + r"]+\s*[:：]")
+_FIELD_LABEL_HEAD_RE = LazyPattern(r"([" + _LETTERS + r"]+)\s*[:：]\s*")
+_FIELD_COLON_LINE_RE = LazyPattern(r"\s*[:：]")
+_LETTER_RUN_RE = LazyPattern(r"[" + _LETTERS + r"]+")
+_STATUS_RULES = (
+    (LazyPattern(r"(已完成|完成|已處理)"), "completed"),
+    (LazyPattern(r"(進行中|處理中)"), "in_progress"),
+    (LazyPattern(r"(延遲|延期|待處理)"), "delayed"),
+)
+_ISO_DATE_PARTS_RE = LazyPattern(r"\s*(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})\s*日?")
+_MONTH_DAY_PARTS_RE = LazyPattern(r"\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})\s*日?")
+
+
+def action_item_rules():
+    """回傳工作事項的分類規則 (截止日期的正規表示式, ((狀態的正規表示式, 狀態), ...))
+    
+    狀態依序比對，第一個符合的規則決定狀態，都不符合時為 pending；
+    reprocess 以相同的規則重新分類已儲存的會議記錄。
+    """
+    return _DUE_DATE_RE, _STATUS_RULES
+
+
+def normalize_date(text):
+    """將 2024年3月5日、2024/3/5 等日期字串轉換為 ISO 格式（2024-03-05），無法辨識時回傳空字串"""
+    match = _ISO_DATE_PARTS_RE.match(text or "")
+    if not match:
+        return ""
+    try:
+        return date(*(int(part) for part in match.groups())).isoformat()
+    except ValueError:
+        return ""
+
+
+def normalize_due_date(text, meeting_date=""):
+    """將截止日期轉換為 ISO 格式，無法辨識時回傳空字串
+    
+    含年份的日期直接轉換；只有月日（3/20、3月20日）時以會議日期推算年份，
+    取前一年、當年與隔年中最接近會議日期的一個，例如 12 月的會議提到 1/10 視為隔年。
+    沒有可辨識的會議日期時無法推算年份，同樣回傳空字串。
+    """
+    iso = normalize_date(text)
+    if iso or not text:
+        return iso
+    match = _MONTH_DAY_PARTS_RE.match(text)
+    meeting_iso = normalize_date(meeting_date)
+    if not match or not meeting_iso:
+        return ""
+    month, day = (int(part) for part in match.groups())
+    meeting_day = date.fromisoformat(meeting_iso)
+    candidates = []
+    for year in (meeting_day.year - 1, meeting_day.year, meeting_day.year + 1):
+        try:
+            candidates.append(date(year, month, day))
+        except ValueError:
+            continue
+    if not candidates:
+        return ""
+    # 距離相同時取較晚的日期（截止日期通常在會議之後）
+    return min(candidates, key=lambda due: (abs((due - meeting_day).days), -due.toordinal())).isoformat()
+
+
+def normalize_completion_date(completion_date, status, meeting_date=""):
+    """已完成的工作事項的完成日期（ISO 格式），其他狀態回傳空字串
+    
+    有記錄完成日期時轉換該日期（無法辨識時保留原字串），否則以會議日期作為最晚的完成日期。
+    """
+    if status != "completed":
+        return ""
+    return normalize_due_date(completion_date, meeting_date) or completion_date or normalize_date(meeting_date)
+
+
+def normalize_action_item_dates(meeting):
+    """將會議記錄中工作事項的截止日期與完成日期轉換為 ISO 格式
+    
+    無法推算的截止日期保留原本的文字；解析器在取得會議日期後呼叫，reprocess 以相同的方式更新舊的會議記錄。
+    """
+    for item in meeting.action_items:
+        item.due_date = normalize_due_date(item.due_date, meeting.date) or item.due_date
+        item.completion_date = normalize_completion_date(item.completion_date, item.status, meeting.date)
+
+
+TOPIC_SIMILARITY = 0.5  # 兩個議題文字的字元二字組 Jaccard 相似度至少此值時視為同一議題
+TOPIC_CONTAINMENT = 0.8  # 或較短一方的二字組至少此比例出現在另一方中（例如加上「追蹤」的標題）
+TOPIC_MIN_SHINGLES = 3  # 以包含比例判斷時，較短一方至少需要的二字組數
+_TOPIC_NOISE_RE = LazyPattern(r"[\W_]+")
+
+
+def topic_shingles(text):
+    """議題文字的字元二字組集合，比較前先正規化全半形、忽略大小寫並移除標點與空白"""
+    text = _TOPIC_NOISE_RE.sub("", unicodedata.normalize("NFKC", text or "").casefold())
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def topic_similarity(shingles, other):
+    """兩個二字組集合的相似度：Jaccard 與包含比例中較高者（包含比例需達 TOPIC_CONTAINMENT 才採用）"""
+    if not shingles or not other:
+        return 0.0
+    common = len(shingles & other)
+    jaccard = common / (len(shingles) + len(other) - common)
+    smaller = min(len(shingles), len(other))
+    if smaller >= TOPIC_MIN_SHINGLES and common / smaller >= TOPIC_CONTAINMENT:
+        return max(jaccard, common / smaller)
+    return jaccard
+
+
+def repeated_topic_titles(titles, previous_titles):
+    """回傳 titles 中與 previous_titles 任一標題相同或相近的標題，依原本順序"""
+    previous = [topic_shingles(title) for title in set(previous_titles)]
+    repeated = []
+    for title in titles:
+        shingles = topic_shingles(title)
+        if any(topic_similarity(shingles, other) >= TOPIC_SIMILARITY for other in previous):
+            repeated.append(title)
+    return repeated
+
+
+def date_sort_key(text):
+    """排序用的日期：可辨識的日期轉換為 ISO 格式，讓 2024年3月5日 與 2024/3/5 依實際日期排序，其他保留原字串"""
+    return normalize_date(text) or text or ""
+
+
+def time_sort_key(text):
+    """排序用的時間：9:00、14：30 轉換為 09:00、14:30，讓同一天的會議依實際時間排序，其他保留原字串"""
+    match = _TIME_RE.search(text or "")
+    if match is None:
+        return text or ""
+    hour, minute = match.group(1).replace("：", ":").split(":")
+    return f"{int(hour):02d}:{minute}"
+
+
+# 解析事件類型
+EVENT_TITLE = "title"                      # 標題行（…會議…紀錄）
+EVENT_SUBJECT = "subject"                  # Subject: 標題行
+EVENT_MEETING_TIME = "meeting_time"        # 會議時間： 標籤
+EVENT_DATE = "date"                        # 含日期的行
+EVENT_TIME = "time"                        # 含時間的行
+EVENT_PARTICIPANTS = "participants"        # 參與人員： 標籤
+EVENT_RECIPIENTS = "recipients"            # To: 收件人行
+EVENT_TOPIC_START = "topic_start"          # 含「編號. 」的行
+EVENT_TOPIC_BREAK = "topic_break"          # 下一個以編號開頭之行前的換行
+EVENT_STAR_TOPIC = "star_topic"            # 含「*編號. 」的行
+EVENT_BULLET = "bullet"                    # 含項目符號的行
+EVENT_PAREN_ITEM = "paren_item"            # 含「編號) 」的行
+EVENT_DECISION = "decision"                # 決策：/決定：/結論： 標籤
+EVENT_ACTION_BLOCK = "action_block"        # 工作事項：/本次會議待辦事項 標籤
+EVENT_PARAGRAPH_BREAK = "paragraph_break"  # 空行（連續兩個換行）
+EVENT_ASSIGNEE = "assignee"                # 負責人： 標籤
+EVENT_DUE_DATE = "due_date"                # 含截止日期的行
+EVENT_FIELD_LABEL = "field_label"          # 「名稱：」形式的欄位標籤
+EVENT_KINDS = (
+    EVENT_TITLE, EVENT_SUBJECT, EVENT_MEETING_TIME, EVENT_DATE, EVENT_TIME,
+    EVENT_PARTICIPANTS, EVENT_RECIPIENTS, EVENT_TOPIC_START, EVENT_TOPIC_BREAK,
+    EVENT_STAR_TOPIC, EVENT_BULLET, EVENT_PAREN_ITEM, EVENT_DECISION,
+    EVENT_ACTION_BLOCK, EVENT_PARAGRAPH_BREAK, EVENT_ASSIGNEE, EVENT_DUE_DATE,
+    EVENT_FIELD_LABEL,
+)
+
+ParseEvent = namedtuple("ParseEvent", ["kind", "pos"])
+
+
+class TranscriptTokenizer:
+    """逐行分類器，將每一行轉換為型別化的解析事件
+    
+    每一行只看一次：先以字串包含檢查過濾，再視需要以預先編譯的正規表示式確認。
+    跨行的規則（空白行之後的編號行、名稱與冒號分在不同行）以少量狀態延後判斷。
+    傳入的每一行需保留結尾的換行字元；事件位置為該行第一個符合處在全文中的位置，
+    只需標記整行的事件則記錄行首位置。
+    """
+    
+    def __init__(self):
+        self.offset = 0  # 下一行在全文中的起始位置
+        self.positions = {kind: [] for kind in EVENT_KINDS}  # 事件類型 -> 遞增的位置列表
+        self._pending_topic_breaks = []  # 等待編號行確認的換行位置
+        self._pending_field = None  # (行首位置, 行) 行尾可能是名稱，等待後續行的冒號
+    
+    def feed_line(self, line):
+        """分類一行文字並記錄其事件"""
+        positions = self.positions
+        start = self.offset
+        self.offset += len(line)
+        break_pos = start - 1 if start else None  # 此行之前的換行位置
+        
+        if not line or line.isspace():
+            # 空白行延續等待中的編號行與冒號判斷
+            if break_pos is not None and line == "\n":
+                positions[EVENT_PARAGRAPH_BREAK].append(break_pos)
+            if line.endswith("\n"):
+                if break_pos is not None:
+                    self._pending_topic_breaks.append(break_pos)
+            else:
+                self._pending_topic_breaks = []
+                self._pending_field = None
+            return
+        
+        has_colon = ":" in line or "：" in line
+        has_dash = "-" in line or "/" in line
+        has_date = (has_dash or "年" in line) and _DATE_HINT_RE.search(line)
+        
+        # 標頭資訊
+        if "紀錄" in line:
+            keyword = min((line.find(k) for k in _TITLE_KEYWORDS if k in line), default=-1)
+            if keyword >= 0 and line.rfind("紀錄") >= keyword + 2:
+                positions[EVENT_TITLE].append(start)
+        if "Subject:" in line:
+            match = _SUBJECT_RE.search(line)
+            if match:
+                positions[EVENT_SUBJECT].append(start + match.start())
+        if "會議時間" in line:
+            match = _MEETING_TIME_LABEL_RE.search(line)
+            if match:
+                positions[EVENT_MEETING_TIME].append(start + match.start())
+        if has_date:
+            match = _DATE_RE.search(line)
+            if match:
+                positions[EVENT_DATE].append(start + match.start())
+        if has_colon:
+            match = _TIME_RE.search(line)
+            if match:
+                positions[EVENT_TIME].append(start + match.start())
+        if "人員" in line:
+            match = _PARTICIPANTS_LABEL_RE.search(line)
+            if match:
+                positions[EVENT_PARTICIPANTS].append(start + match.start())
+        if "To:" in line:
+            match = _RECIPIENTS_RE.search(line)
+            if match:
+                positions[EVENT_RECIPIENTS].append(start + match.start())
+        
+        # 議題起點，以及其前方（可隔著空白行）的換行
+        if "." in line:
+            match = _TOPIC_START_RE.search(line)
+            if match:
+                positions[EVENT_TOPIC_START].append(start + match.start())
+                if _TOPIC_LINE_RE.match(line):
+                    positions[EVENT_TOPIC_BREAK].extend(self._pending_topic_breaks)
+                    if break_pos is not None:
+                        positions[EVENT_TOPIC_BREAK].append(break_pos)
+            if "*" in line:
+                match = _STAR_TOPIC_RE.search(line)
+                if match:
+                    positions[EVENT_STAR_TOPIC].append(start + match.start())
+        if self._pending_topic_breaks:
+            self._pending_topic_breaks = []
+        
+        # 討論要點與決策
+        if "-" in line or "•" in line or "*" in line:
+            positions[EVENT_BULLET].append(start)
+        if ")" in line and _PAREN_ITEM_RE.search(line):
+            positions[EVENT_PAREN_ITEM].append(start)
+        if ("決" in line or "結論" in line) and _DECISION_LABEL_RE.search(line):
+            positions[EVENT_DECISION].append(start)
+        
+        # 工作事項
+        if "工作事項" in line or "本次會議待辦事項" in line:
+            positions[EVENT_ACTION_BLOCK].append(start)
+        if "負責人" in line:
+            match = _ASSIGNEE_LABEL_RE.search(line)
+            if match:
+                positions[EVENT_ASSIGNEE].append(start + match.start())
+        if has_date and has_dash:
+            match = _DUE_DATE_RE.search(line)
+            if match:
+                positions[EVENT_DUE_DATE].append(start + match.start())
+        
+        # 「名稱：」欄位標籤，名稱與冒號之間的空白可以跨行
+        if self._pending_field is not None:
+            if has_colon and _FIELD_COLON_LINE_RE.match(line):
+                self._confirm_pending_field()
+            self._pending_field = None
+        match = _FIELD_LABEL_SCAN_RE.search(line) if has_colon else None
+        if match:
+            positions[EVENT_FIELD_LABEL].append(start + match.start())
+        elif line.endswith("\n"):
+            self._pending_field = (start, line)
+    
+    def _confirm_pending_field(self):
+        """後續行以冒號開頭時，若前一個非空白行以名稱結尾則記錄欄位標籤"""
+        start, line = self._pending_field
+        text = line.rstrip()
+        match = _LETTER_RUN_RE.match(text[::-1])
+        if match:
+            self.positions[EVENT_FIELD_LABEL].append(start + len(text) - match.end())
+
+
+class ParseEventStream:
+    """整份文字的解析事件索引
+    
+    各個 _extract_* 方法透過事件索引直接跳到相關的行，
+    再以預先編譯的正規表示式在原文的指定範圍內比對，
+    結果與在全文上直接比對相同，但不需為每個欄位重新掃描全文。
+    """
+    
+    def __init__(self, content):
+        self.content = content
+        self.start = 0
+        self.end = len(content)
+        
+        tokenizer = TranscriptTokenizer()
+        lines = content.split("\n")
+        last = lines.pop()
+        for line in lines:
+            tokenizer.feed_line(line + "\n")
+        if last:
+            tokenizer.feed_line(last)
+        self._index = tokenizer.positions
+        self._line_cache = [0, 0]  # 最近查詢的行 [行首, 下一行行首)，與所有範圍共用
+    
+    @property
+    def events(self):
+        """依位置排序的事件列表"""
+        events = [ParseEvent(kind, pos) for kind, positions in self._index.items() for pos in positions]
+        events.sort(key=lambda event: event.pos)
+        return events
+    
+    @property
+    def text(self):
+        return self.content[self.start:self.end]
+    
+    def window(self, start, end):
+        """回傳共用同一份索引、只涵蓋 [start, end) 的事件串流"""
+        view = ParseEventStream.__new__(ParseEventStream)
+        view.content = self.content
+        view.start = start
+        view.end = end
+        view._index = self._index
+        view._line_cache = self._line_cache
+        return view
+    
+    def strip_window(self, start, end):
+        """回傳去除前後空白後的範圍，等同於對該段文字呼叫 str.strip()"""
+        text = self.content[start:end]
+        stripped = text.lstrip()
+        start += len(text) - len(stripped)
+        return self.window(start, start + len(stripped.rstrip()))
+    
+    def has(self, kind):
+        """範圍內（含起點所在行）是否有 kind 事件"""
+        positions = self._index[kind]
+        i = bisect_left(positions, self._line_bounds(self.start)[0])
+        return i < len(positions) and positions[i] < self.end
+    
+    def find(self, kind, pattern, pos):
+        """從 pos 起尋找第一個符合 pattern 的位置
+        
+        只在帶有 kind 事件的行內搜尋，因此 pattern 必須能在單行（含換行字元）內判定。
+        """
+        positions = self._index[kind]
+        content = self.content
+        
+        # 從 pos 所在行開始，該行的事件位置可能在 pos 之前
+        i = bisect_left(positions, self._line_bounds(pos)[0])
+        while i < len(positions) and positions[i] < self.end:
+            stop = min(self._line_bounds(positions[i])[1], self.end)
+            match = pattern.search(content, max(positions[i], pos), stop)
+            if match:
+                return match
+            i = bisect_left(positions, stop, i + 1)
+        return None
+    
+    def _line_bounds(self, pos):
+        """回傳 pos 所在行的 (行首, 下一行行首)
+        
+        同一行內的連續查詢使用快取，很長的單行不需每次都重新掃描行首與行尾。
+        """
+        cache = self._line_cache
+        if cache[0] <= pos < cache[1]:
+            return cache[0], cache[1]
+        content = self.content
+        start = content.rfind("\n", 0, pos) + 1
+        end = content.find("\n", pos) + 1 or len(content)
+        cache[0], cache[1] = start, end
+        return start, end
+    
+    def next_position(self, kind, pos):
+        """回傳 pos 之後第一個 kind 事件的位置，沒有時回傳範圍結尾"""
+        positions = self._index[kind]
+        i = bisect_left(positions, pos)
+        if i < len(positions) and positions[i] < self.end:
+            return positions[i]
+        return self.end
+
+
+DEFAULT_SECTION_CACHE_ENTRIES = 4096  # 段落解析結果快取的項目上限
+SECTION_CACHE_MAX_CHARS = 64 * 1024  # 超過此字數的段落不快取
+
+
+class SectionCache:
+    """議題與工作事項區塊解析結果的 LRU 快取
+    
+    以段落文字為鍵，保存由該段落取得的議題欄位或工作事項欄位（不含編號）。
+    重新上傳只修改了部分段落的逐字稿時，未修改的議題與工作事項區塊直接沿用上次的結果，
+    不再執行 _extract_discussion_points、_extract_decisions 與 _build_action_item；
+    標題、時間與參與人員只取決於開頭幾行，每次都重新解析。
+    保存的值為 tuple，取出後由呼叫端建立新的物件，各次解析的結果不會共用列表。
+    """
+    
+    def __init__(self, max_entries=DEFAULT_SECTION_CACHE_ENTRIES, max_chars=SECTION_CACHE_MAX_CHARS):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """回傳快取的解析結果，沒有時回傳 None"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key, text, value):
+        """保存 text 段落的解析結果，段落過長時不保存"""
+        if len(text) > self.max_chars or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """回傳快取的使用狀況與命中統計"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
 class MeetingParser:
     """會議記錄解析器，用於從文字檔中提取會議資訊"""
     
+    # 段落解析結果的快取，None 表示不快取；全文解析與逐行解析共用
+    section_cache = None
+    
+    @staticmethod
+    def tokenize(file_content):
+        """將文字檔內容逐行分類為解析事件，供各個 _extract_* 方法共用"""
+        return ParseEventStream(file_content)
+    
     @staticmethod
-    def parse_text_file(file_content):
-        """解析文字檔內容，建立會議記錄物件"""
+    def parse_text_file(file_content, time_budget=None):
+        """解析文字檔內容，建立會議記錄物件
+        
+        指定 time_budget（秒）時改以逐行解析，超過時間上限即停止並回傳部分結果，
+        會議記錄的 warnings 會說明只處理了多少內容。
+        """
+        if time_budget:
+            return MeetingParser.parse_stream((file_content,), time_budget)
+        
         meeting = MeetingRecord()
+        with metrics.stage("parse.tokenize"):
+            stream = MeetingParser.tokenize(file_content)
         
         # 解析會議標題
-        title_match = MeetingParser._extract_title(file_content)
+        with metrics.stage("parse.title"):
+            title_match = MeetingParser._extract_title(file_content, stream)
         if title_match:
             meeting.title = title_match
         
         # 解析會議時間
-        date_match, time_match = MeetingParser._extract_datetime(file_content)
+        with metrics.stage("parse.datetime"):
+            date_match, time_match = MeetingParser._extract_datetime(file_content, stream)
         if date_match:
             meeting.date = date_match
         if time_match:
             meeting.time = time_match
         
         # 解析參與人員
-        participants = MeetingParser._extract_participants(file_content)
+        with metrics.stage("parse.participants"):
+            participants = MeetingParser._extract_participants(file_content, stream)
         meeting.participants = participants
         
         # 解析議題
-        topics = MeetingParser._extract_topics(file_content)
+        with metrics.stage("parse.topics"):
+            topics = MeetingParser._extract_topics(file_content, stream)
         meeting.topics = topics
         
         # 解析工作事項
-        action_items = MeetingParser._extract_action_items(file_content)
+        with metrics.stage("parse.action_items"):
+            action_items = MeetingParser._extract_action_items(file_content, stream)
         meeting.action_items = action_items
         
+        # 截止日期與完成日期以會議日期推算年份，轉換為 ISO 格式
+        normalize_action_item_dates(meeting)
+        
         return meeting
     
     @staticmethod
-    def _extract_title(content):
+    def parse_stream(lines, time_budget=None):
+        """逐段解析文字內容，建立會議記錄物件
+        
+        lines 可為任意切割的文字片段（例如檔案的逐行內容），
+        不需先讀入整份文字，結果與 parse_text_file 相同。
+        指定 time_budget（秒）時，超過時間上限即停止讀取並回傳部分結果。
+        """
+        parser = StreamingMeetingParser(time_budget)
+        for line in lines:
+            parser.feed(line)
+            if parser.truncated:
+                break
+        return parser.close()
+    
+    @staticmethod
+    def _extract_title(content, stream=None):
         """從內容中提取會議標題"""
-        import re
+        if stream is None:
+            stream = MeetingParser.tokenize(content)
         
-        # 嘗試匹配標題模式
-        title_patterns = [
-            r"(.*?)(會議|評審會議|工程會議|週會).*?紀錄",
-            r"Subject:.*?([^\n]+)"
-        ]
+        # 第一個「…會議…紀錄」的行，其次為 Subject: 行
+        position = stream.next_position(EVENT_TITLE, stream.start)
+        if position < stream.end:
+            return _TITLE_RE.match(stream.content, position).group(0).strip()
         
-        for pattern in title_patterns:
-            match = re.search(pattern, content)
-            if match:
-                return match.group(0).strip()
+        match = stream.find(EVENT_SUBJECT, _SUBJECT_RE, stream.start)
+        if match:
+            return match.group(0).strip()
         
         return ""
     
     @staticmethod
-    def _extract_datetime(content):
+    def _extract_datetime(content, stream=None):
         """從內容中提取會議日期和時間"""
-        import re
-        
-        # 嘗試匹配日期模式
-        date_patterns = [
-            r"會議時間[：:]\s*(\d{4}年\d{1,2}月\d{1,2}日|\d{4}[-/]\d{1,2}[-/]\d{1,2})",
-            r"(\d{4}年\d{1,2}月\d{1,2}日|\d{4}[-/]\d{1,2}[-/]\d{1,2})"
-        ]
+        if stream is None:
+            stream = MeetingParser.tokenize(content)
         
+        # 優先使用「會議時間：」之後的日期，否則取第一個出現的日期
         date_match = None
-        for pattern in date_patterns:
-            match = re.search(pattern, content)
-            if match:
-                date_match = match.group(1).strip()
-                break
-        
-        # 嘗試匹配時間模式
-        time_patterns = [
-            r"(\d{1,2}[:：]\d{2})",
-            r"會議時間[：:]\s*.*?(\d{1,2}[:：]\d{2})"
-        ]
+        label = stream.find(EVENT_MEETING_TIME, _MEETING_TIME_LABEL_RE, stream.start)
+        while label and not date_match:
+            date_match = _MEETING_DATE_RE.match(stream.content, label.start())
+            label = stream.find(EVENT_MEETING_TIME, _MEETING_TIME_LABEL_RE, label.end())
+        if not date_match:
+            date_match = stream.find(EVENT_DATE, _DATE_RE, stream.start)
         
-        time_match = None
-        for pattern in time_patterns:
-            match = re.search(pattern, content)
-            if match:
-                time_match = match.group(1).strip()
-                break
+        # 取第一個出現的時間
+        time_match = stream.find(EVENT_TIME, _TIME_RE, stream.start)
         
-        return date_match, time_match
+        return (
+            date_match.group(1).strip() if date_match else None,
+            time_match.group(1).strip() if time_match else None,
+        )
     
     @staticmethod
-    def _extract_participants(content):
+    def _extract_participants(content, stream=None):
         """從內容中提取參與人員"""
-        import re
+        if stream is None:
+            stream = MeetingParser.tokenize(content)
         
-        # 嘗試匹配參與人員模式
-        participants_patterns = [
-            r"參[與加]人員[：:]\s*(.*?)(?=\n|$)",
-            r"To:.*?([^\n]+)"
-        ]
+        # 優先使用「參與人員：」，否則使用 To: 收件人
+        label = stream.find(EVENT_PARTICIPANTS, _PARTICIPANTS_LABEL_RE, stream.start)
+        if label:
+            match = _PARTICIPANTS_RE.match(stream.content, label.start())
+        else:
+            match = stream.find(EVENT_RECIPIENTS, _RECIPIENTS_RE, stream.start)
         
         participants = []
-        for pattern in participants_patterns:
-            match = re.search(pattern, content)
-            if match:
-                participants_text = match.group(1).strip()
-                # 分割參與人員列表
-                participants = re.split(r'[,，、；;]', participants_text)
-                participants = [p.strip() for p in participants if p.strip()]
-                break
+        if match:
+            participants_text = match.group(1).strip()
+            # 分割參與人員列表
+            participants = _PARTICIPANTS_SPLIT_RE.split(participants_text)
+            participants = [p.strip() for p in participants if p.strip()]
         
         return participants
     
     @staticmethod
-    def _extract_topics(content):
+    def _extract_topics(content, stream=None):
         """從內容中提取議題"""
-        import re
+        if stream is None:
+            stream = MeetingParser.tokenize(content)
+        text = stream.content
         
         topics = []
         
-        # 嘗試匹配議題模式
-        topic_patterns = [
-            r"(\d+)\.\s+(.*?)(?=\n\s*\d+\.\s+|\Z)",
-            r"\*(\d+)\.\s+(.*?)(?=\*\d+\.\s+|\Z)"
-        ]
-        
-        for pattern in topic_patterns:
-            matches = re.finditer(pattern, content, re.DOTALL)
-            for match in matches:
-                topic = Topic()
-                topic.id = match.group(1).strip()
-                
-                # 提取議題標題和描述
-                topic_content = match.group(2).strip()
-                title_end = topic_content.find("\n")
-                if title_end > 0:
-                    topic.title = topic_content[:title_end].strip()
-                    topic.description = topic_content[title_end:].strip()
-                else:
-                    topic.title = topic_content
-                
-                # 提取討論要點
-                discussion_points = MeetingParser._extract_discussion_points(topic_content)
-                topic.discussion_points = discussion_points
-                
-                # 提取決策
-                decisions = MeetingParser._extract_decisions(topic_content)
-                topic.decisions = decisions
-                
-                topics.append(topic)
+        # 編號議題「1. 」，內容延續到下一個以編號開頭的行
+        match = stream.find(EVENT_TOPIC_START, _TOPIC_START_RE, stream.start)
+        while match:
+            head = _TOPIC_HEAD_RE.match(text, match.start())
+            body_end = stream.next_position(EVENT_TOPIC_BREAK, head.end())
+            topic_stream = stream.strip_window(head.end(), body_end)
+            topics.append(MeetingParser._build_topic(head.group(1), topic_stream.text, topic_stream))
+            match = stream.find(EVENT_TOPIC_START, _TOPIC_START_RE, body_end)
+        
+        # 星號編號議題「*1. 」，內容延續到下一個星號編號
+        match = stream.find(EVENT_STAR_TOPIC, _STAR_TOPIC_RE, stream.start)
+        while match:
+            head = _STAR_TOPIC_HEAD_RE.match(text, match.start())
+            match = stream.find(EVENT_STAR_TOPIC, _STAR_TOPIC_RE, head.end())
+            body_end = match.start() if match else stream.end
+            topic_stream = stream.strip_window(head.end(), body_end)
+            topics.append(MeetingParser._build_topic(head.group(1), topic_stream.text, topic_stream))
         
         return topics
     
     @staticmethod
-    def _extract_discussion_points(topic_content):
-        """從議題內容中提取討論要點"""
-        import re
+    def _build_topic(topic_id, topic_content, stream=None):
+        """由去除前後空白的議題內容建立議題物件，內容與先前解析過的議題相同時沿用快取的結果"""
+        topic = Topic()
+        topic.id = topic_id.strip()
+        
+        cache = MeetingParser.section_cache
+        if cache is not None:
+            key = ("topic", topic_content)
+            cached = cache.get(key)
+            if cached is not None:
+                topic.title, topic.description, discussion_points, decisions = cached
+                topic.discussion_points = list(discussion_points)
+                topic.decisions = list(decisions)
+                return topic
+        
+        # 提取議題標題和描述
+        title_end = topic_content.find("\n")
+        if title_end > 0:
+            topic.title = topic_content[:title_end].strip()
+            topic.description = topic_content[title_end:].strip()
+        else:
+            topic.title = topic_content
+        
+        # 提取討論要點
+        topic.discussion_points = MeetingParser._extract_discussion_points(topic_content, stream)
+        
+        # 提取決策
+        topic.decisions = MeetingParser._extract_decisions(topic_content, stream)
         
+        if cache is not None:
+            cache.put(key, topic_content, (
+                topic.title, topic.description, tuple(topic.discussion_points), tuple(topic.decisions),
+            ))
+        return topic
+    
+    @staticmethod
+    def _extract_discussion_points(topic_content, stream=None):
+        """從議題內容中提取討論要點"""
         discussion_points = []
         
-        # 嘗試匹配討論要點模式
-        point_patterns = [
-            r"[-•*]\s*(.*?)(?=\n[-•*]|\Z)",
-            r"(\d+)\)\s+(.*?)(?=\n\d+\)|\Z)"
-        ]
+        # 項目符號「- 」，內容延續到下一個以項目符號開頭的行
+        if stream is None or stream.has(EVENT_BULLET):
+            for head, end in MeetingParser._iter_sections(topic_content, *_BULLET_SECTION):
+                point = topic_content[head.end():end].strip()
+                if point:
+                    discussion_points.append(point)
         
-        for pattern in point_patterns:
-            matches = re.finditer(pattern, topic_content, re.DOTALL)
-            for match in matches:
-                point = match.group(1).strip()
+        # 括號編號「1) 」，記錄其編號
+        if stream is None or stream.has(EVENT_PAREN_ITEM):
+            for head, end in MeetingParser._iter_sections(topic_content, *_PAREN_SECTION):
+                point = head.group(1).strip()
                 if point:
                     discussion_points.append(point)
         
         return discussion_points
     
     @staticmethod
-    def _extract_decisions(topic_content):
+    def _extract_decisions(topic_content, stream=None):
         """從議題內容中提取決策"""
-        import re
-        
         decisions = []
         
-        # 嘗試匹配決策模式
-        decision_patterns = [
-            r"決[策定][：:]\s*(.*?)(?=\n|$)",
-            r"結論[：:]\s*(.*?)(?=\n|$)"
-        ]
+        if stream is not None and not stream.has(EVENT_DECISION):
+            return decisions
         
-        for pattern in decision_patterns:
-            matches = re.finditer(pattern, topic_content, re.DOTALL)
-            for match in matches:
-                decision = match.group(1).strip()
+        # 「決策：」「決定：」「結論：」之後到行尾的文字
+        for head_pattern, break_pattern in _DECISION_SECTIONS:
+            for head, end in MeetingParser._iter_sections(topic_content, head_pattern, break_pattern):
+                decision = topic_content[head.end():end].strip()
                 if decision:
                     decisions.append(decision)
         
         return decisions
     
     @staticmethod
-    def _extract_action_items(content):
+    def _iter_sections(text, head_pattern, break_pattern):
+        """依序產生 (起點比對結果, 內容結尾)
+        
+        內容從起點之後延續到下一個分隔處（或文字結尾），
+        下一個起點從內容結尾開始尋找。
+        """
+        head = head_pattern.search(text)
+        while head:
+            next_break = break_pattern.search(text, head.end())
+            end = next_break.start() if next_break else len(text)
+            yield head, end
+            head = head_pattern.search(text, end)
+    
+    @staticmethod
+    def _extract_action_items(content, stream=None):
         """從內容中提取工作事項"""
-        import re
+        if stream is None:
+            stream = MeetingParser.tokenize(content)
+        text = stream.content
         
         action_items = []
         
-        # 嘗試匹配工作事項區塊
-        action_block_patterns = [
-            r"工作事項[：:](.*?)(?=\n\n|\Z)",
-            r"本次會議待辦事項(.*?)(?=\n\n|\Z)"
-        ]
-        
+        # 工作事項區塊延續到下一個空行
         action_blocks = []
-        for pattern in action_block_patterns:
-            matches = re.finditer(pattern, content, re.DOTALL)
-            for match in matches:
-                action_blocks.append(match.group(1).strip())
+        for label_pattern in _ACTION_BLOCK_LABELS:
+            label = stream.find(EVENT_ACTION_BLOCK, label_pattern, stream.start)
+            while label:
+                block_end = stream.next_position(EVENT_PARAGRAPH_BREAK, label.end())
+                action_blocks.append(stream.strip_window(label.end(), block_end))
+                label = stream.find(EVENT_ACTION_BLOCK, label_pattern, block_end)
         
         # 如果找到工作事項區塊，解析其中的工作事項
-        if action_blocks:
-            for block in action_blocks:
-                # 嘗試匹配工作事項模式
-                item_patterns = [
-                    r"[*•-]\s*(.*?)(?=\n[*•-]|\Z)",
-                    r"(\d+)\.\s+(.*?)(?=\n\d+\.|\Z)"
-                ]
-                
-                for pattern in item_patterns:
-                    matches = re.finditer(pattern, block, re.DOTALL)
-                    for i, match in enumerate(matches):
-                        item = ActionItem()
-                        item.id = f"AI{len(action_items) + 1}"
-                        item.description = match.group(1).strip()
-                        
-                        # 提取負責人
-                        assignee_match = re.search(r"負責人[：:]\s*(.*?)(?=\n|$)", item.description)
-                        if assignee_match:
-                            item.assignee = assignee_match.group(1).strip()
-                        
-                        # 提取截止日期
-                        due_date_match = re.search(r"(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})[前完成]*", item.description)
-                        if due_date_match:
-                            item.due_date = due_date_match.group(1).strip()
-                        
-                        # 提取狀態
-                        if re.search(r"(已完成|完成|已處理)", item.description):
-                            item.status = "completed"
-                        elif re.search(r"(進行中|處理中)", item.description):
-                            item.status = "in_progress"
-                        elif re.search(r"(延遲|延期|待處理)", item.description):
-                            item.status = "delayed"
-                        else:
-                            item.status = "pending"
-                        
-                        action_items.append(item)
+        for block in action_blocks:
+            MeetingParser._extract_block_action_items(block.text, action_items, block)
         
         # 如果沒有找到明確的工作事項區塊，嘗試從整個內容中提取
         if not action_items:
-            # 嘗試匹配可能的工作事項模式
-            potential_patterns = [
-                r"([A-Za-z\u4e00-\u9fa5]+)\s*[:：]\s*(.*?)(?=\n\n|\Z)",
-                r"負責人[：:]\s*([A-Za-z\u4e00-\u9fa5]+).*?(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})[前完成]*"
-            ]
+            # 「名稱：內容」，內容延續到下一個空行
+            position = stream.next_position(EVENT_FIELD_LABEL, stream.start)
+            while position < stream.end:
+                head = _FIELD_LABEL_HEAD_RE.match(text, position)
+                body_end = stream.next_position(EVENT_PARAGRAPH_BREAK, head.end())
+                item = MeetingParser._build_action_item(action_items, text[head.end():body_end].strip())
+                item.assignee = head.group(1).strip()
+                action_items.append(item)
+                position = stream.next_position(EVENT_FIELD_LABEL, body_end)
             
-            for pattern in potential_patterns:
-                matches = re.finditer(pattern, content, re.DOTALL)
-                for i, match in enumerate(matches):
+            # 「負責人：名稱 … 日期」，以其後第一個日期作為描述
+            label = stream.find(EVENT_ASSIGNEE, _ASSIGNEE_LABEL_RE, stream.start)
+            while label:
+                head = _ASSIGNEE_DUE_HEAD_RE.match(text, label.start())
+                if not head:
+                    label = stream.find(EVENT_ASSIGNEE, _ASSIGNEE_LABEL_RE, label.end())
+                    continue
+                due_date = stream.find(EVENT_DUE_DATE, _DUE_DATE_RE, head.end())
+                if not due_date:
+                    break
+                item = MeetingParser._build_action_item(action_items, due_date.group(1).strip())
+                item.assignee = head.group(1).strip()
+                action_items.append(item)
+                label = stream.find(EVENT_ASSIGNEE, _ASSIGNEE_LABEL_RE, due_date.end())
+        
+        return action_items
+    
+    @staticmethod
+    def _extract_block_action_items(block_text, action_items, stream=None):
+        """解析工作事項區塊內的工作事項，依序加入 action_items
+        
+        區塊內容與先前解析過的區塊相同時沿用快取的欄位，只依目前的工作事項數重新編號。
+        """
+        cache = MeetingParser.section_cache
+        if cache is not None:
+            key = ("action_block", block_text)
+            cached = cache.get(key)
+            if cached is not None:
+                for description, assignee, due_date, status in cached:
                     item = ActionItem()
                     item.id = f"AI{len(action_items) + 1}"
-                    
-                    if len(match.groups()) >= 2:
-                        item.assignee = match.group(1).strip()
-                        item.description = match.group(2).strip()
-                    else:
-                        item.description = match.group(0).strip()
-                    
-                    # 提取截止日期
-                    due_date_match = re.search(r"(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2})[前完成]*", item.description)
-                    if due_date_match:
-                        item.due_date = due_date_match.group(1).strip()
-                    
-                    # 提取狀態
-                    if re.search(r"(已完成|完成|已處理)", item.description):
-                        item.status = "completed"
-                    elif re.search(r"(進行中|處理中)", item.description):
-                        item.status = "in_progress"
-                    elif re.search(r"(延遲|延期|待處理)", item.description):
-                        item.status = "delayed"
-                    else:
-                        item.status = "pending"
-                    
+                    item.description = description
+                    item.assignee = assignee
+                    item.due_date = due_date
+                    item.status = status
                     action_items.append(item)
+                return
+            first_item = len(action_items)
         
-        return action_items
+        # 項目符號形式的工作事項，以內容作為描述
+        descriptions = []
+        if stream is None or stream.has(EVENT_BULLET):
+            for head, end in MeetingParser._iter_sections(block_text, *_BULLET_SECTION):
+                descriptions.append(block_text[head.end():end].strip())
+        
+        # 編號形式的工作事項「1. 」，以編號作為描述
+        if stream is None or stream.has(EVENT_TOPIC_START):
+            for head, end in MeetingParser._iter_sections(block_text, *_NUMBERED_SECTION):
+                descriptions.append(head.group(1).strip())
+        
+        for description in descriptions:
+            item = MeetingParser._build_action_item(action_items, description)
+            
+            # 提取負責人
+            assignee_match = _ASSIGNEE_RE.search(item.description)
+            if assignee_match:
+                item.assignee = assignee_match.group(1).strip()
+            
+            action_items.append(item)
+        
+        if cache is not None:
+            cache.put(key, block_text, tuple(
+                (item.description, item.assignee, item.due_date, item.status) for item in action_items[first_item:]
+            ))
+    
+    @staticmethod
+    def _build_action_item(action_items, description):
+        """建立工作事項，並從描述中提取截止日期與狀態"""
+        item = ActionItem()
+        item.id = f"AI{len(action_items) + 1}"
+        item.description = description
+        
+        # 提取截止日期
+        due_date_match = _DUE_DATE_RE.search(description)
+        if due_date_match:
+            item.due_date = due_date_match.group(1).strip()
+        
+        # 提取狀態
+        item.status = "pending"
+        for pattern, status in _STATUS_RULES:
+            if pattern.search(description):
+                item.status = status
+                break
+        
+        return item
+
+
+_DEADLINE_CHECK_LINES = 256  # 逐行解析時每隔多少行檢查一次時間上限
+_STREAM_STAGES = ("parse.tokenize", "parse.header", "parse.topics", "parse.action_items")  # 逐行解析時量測的階段
+_STAGE_SAMPLE_LINES = 16  # 逐行解析時每隔多少行量測一行各階段的耗時，每行都呼叫計時器會讓解析明顯變慢
+
+
+def _leading_space(line):
+    """回傳行首空白字元的長度"""
+    return len(line) - len(line.lstrip())
+
+
+class _NumberedTopicReader:
+    """逐行切出「1. 」編號議題，議題內容延續到下一個以編號開頭的行"""
+    
+    def __init__(self):
+        self.topics = []
+        self._topic_id = None  # 目前議題的編號
+        self._body_start = None  # 議題內容起點，None 表示編號之後仍是空白
+        self._parts = []
+    
+    def feed_line(self, line, start, events):
+        if self._topic_id is not None:
+            if self._body_start is None:
+                # 編號之後的空白可以跨行，內容從下一個非空白字元開始
+                if line.isspace():
+                    return
+                offset = _leading_space(line)
+                self._body_start = start + offset
+                self._parts = [line[offset:]]
+                return
+            breaks = events[EVENT_TOPIC_BREAK]
+            if not breaks:
+                self._parts.append(line)
+                return
+            self._finish_topic(breaks[0])
+        
+        if events[EVENT_TOPIC_START]:
+            match = _TOPIC_START_RE.search(line)
+            head = _TOPIC_HEAD_RE.match(line, match.start())
+            self._topic_id = head.group(1)
+            if head.end() < len(line):
+                self._body_start = start + head.end()
+                self._parts = [line[head.end():]]
+    
+    def close(self):
+        if self._topic_id is not None:
+            self._finish_topic(None)
+        return self.topics
+    
+    def _finish_topic(self, end):
+        """以 [議題內容起點, end) 建立議題，end 為 None 表示延續到文字結尾"""
+        body = "".join(self._parts)
+        if end is not None:
+            body = body[:end - self._body_start]
+        self.topics.append(MeetingParser._build_topic(self._topic_id, body.strip()))
+        self._topic_id = None
+        self._body_start = None
+        self._parts = []
+
+
+class _StarTopicReader:
+    """逐行切出「*1. 」星號編號議題，議題內容延續到下一個星號編號"""
+    
+    def __init__(self):
+        self.topics = []
+        self._topic_id = None  # 目前議題的編號
+        self._head_pending = False  # 編號之後仍是空白，內容尚未開始
+        self._parts = []
+    
+    def feed_line(self, line, start, events):
+        pos = 0
+        if self._head_pending:
+            if line.isspace():
+                return
+            self._head_pending = False
+            pos = _leading_space(line)
+        
+        while True:
+            match = _STAR_TOPIC_RE.search(line, pos) if events[EVENT_STAR_TOPIC] else None
+            if not match:
+                if self._topic_id is not None:
+                    self._parts.append(line[pos:])
+                return
+            if self._topic_id is not None:
+                self._parts.append(line[pos:match.start()])
+                self._finish_topic()
+            
+            head = _STAR_TOPIC_HEAD_RE.match(line, match.start())
+            self._topic_id = head.group(1)
+            if head.end() == len(line):
+                self._head_pending = True
+                return
+            pos = head.end()
+    
+    def close(self):
+        if self._topic_id is not None:
+            self._finish_topic()
+        return self.topics
+    
+    def _finish_topic(self):
+        body = "" if self._head_pending else "".join(self._parts)
+        self.topics.append(MeetingParser._build_topic(self._topic_id, body.strip()))
+        self._topic_id = None
+        self._head_pending = False
+        self._parts = []
+
+
+class _ActionBlockReader:
+    """逐行切出以 label_pattern 開頭的工作事項區塊，區塊延續到下一個空行"""
+    
+    def __init__(self, label_pattern):
+        self.action_items = []
+        self._label_pattern = label_pattern
+        self._block_start = None  # 目前區塊的起點
+        self._parts = []
+    
+    def feed_line(self, line, start, events):
+        if self._block_start is not None:
+            breaks = events[EVENT_PARAGRAPH_BREAK]
+            if breaks:
+                # 空行本身不含標籤，不需再往下尋找
+                self._finish_block(breaks[0])
+            else:
+                self._parts.append(line)
+            return
+        
+        if events[EVENT_ACTION_BLOCK]:
+            label = self._label_pattern.search(line)
+            if label:
+                self._block_start = start + label.end()
+                self._parts = [line[label.end():]]
+    
+    def close(self):
+        if self._block_start is not None:
+            self._finish_block(None)
+        return self.action_items
+    
+    def _finish_block(self, end):
+        block = "".join(self._parts)
+        if end is not None:
+            block = block[:end - self._block_start]
+        MeetingParser._extract_block_action_items(block.strip(), self.action_items)
+        self._block_start = None
+        self._parts = []
+
+
+class _FieldLabelReader:
+    """逐行切出「名稱：內容」形式的工作事項，內容延續到下一個空行"""
+    
+    def __init__(self):
+        self.action_items = []
+        self._search_from = 0  # 下一個欄位標籤的最小位置
+        self._assignee = None  # 目前工作事項的負責人
+        self._body_start = None  # 內容起點，None 表示冒號之後仍是空白
+        self._parts = []
+        self._last_line = (0, "")  # 前一個非空白行，名稱可能位於其行尾
+    
+    def feed_line(self, line, start, events):
+        if self._assignee is not None:
+            if self._body_start is None:
+                # 冒號之後的空白可以跨行，內容從下一個非空白字元開始
+                if not line.isspace():
+                    offset = _leading_space(line)
+                    self._body_start = start + offset
+                    self._parts = [line[offset:]]
+                return
+            breaks = events[EVENT_PARAGRAPH_BREAK]
+            if breaks:
+                self._finish_item(breaks[0])
+                self._search_from = breaks[0]
+            else:
+                self._parts.append(line)
+            return
+        
+        for position in events[EVENT_FIELD_LABEL]:
+            if position < self._search_from:
+                continue
+            if position >= start:
+                text, base, offset = line, start, position - start
+            else:
+                # 名稱在前一個非空白行的行尾，冒號在本行
+                last_start, last_line = self._last_line
+                name = _LETTER_RUN_RE.match(last_line, position - last_start).group(0)
+                text, base, offset = name + line, start - len(name), 0
+            head = _FIELD_LABEL_HEAD_RE.match(text, offset)
+            self._assignee = head.group(1).strip()
+            if head.end() < len(text):
+                self._body_start = base + head.end()
+                self._parts = [text[head.end():]]
+            break
+        
+        if not line.isspace():
+            self._last_line = (start, line)
+    
+    def close(self):
+        if self._assignee is not None:
+            self._finish_item(None)
+        return self.action_items
+    
+    def _finish_item(self, end):
+        body = "".join(self._parts)
+        if end is not None and self._body_start is not None:
+            body = body[:end - self._body_start]
+        item = MeetingParser._build_action_item(self.action_items, body.strip())
+        item.assignee = self._assignee
+        self.action_items.append(item)
+        self._assignee = None
+        self._body_start = None
+        self._parts = []
+
+
+class _AssigneeDueReader:
+    """逐行尋找「負責人：名稱 … 日期」，以名稱之後第一個日期建立工作事項"""
+    
+    def __init__(self):
+        self.action_items = []
+        self._assignee = None  # 等待日期的負責人
+        self._head_pending = False  # 標籤之後仍是空白，名稱尚未出現
+        self._done = False  # 負責人之後再也沒有日期時停止
+    
+    def feed_line(self, line, start, events):
+        pos = 0
+        if self._head_pending:
+            if line.isspace():
+                return
+            self._head_pending = False
+            head = _LETTER_RUN_RE.match(line, _leading_space(line))
+            if head:
+                self._assignee = head.group(0).strip()
+                pos = head.end()
+        
+        while True:
+            if self._assignee is not None:
+                due_date = _DUE_DATE_RE.search(line, pos) if events[EVENT_DUE_DATE] else None
+                if not due_date:
+                    return
+                item = MeetingParser._build_action_item(self.action_items, due_date.group(1).strip())
+                item.assignee = self._assignee
+                self.action_items.append(item)
+                self._assignee = None
+                pos = due_date.end()
+            
+            label = _ASSIGNEE_LABEL_RE.search(line, pos) if events[EVENT_ASSIGNEE] else None
+            if not label:
+                return
+            head = _ASSIGNEE_DUE_HEAD_RE.match(line, label.start())
+            if head:
+                self._assignee = head.group(1).strip()
+                pos = head.end()
+            elif line[label.end():].isspace():
+                self._head_pending = True
+                return
+            else:
+                pos = label.end()
+    
+    def close(self):
+        return self.action_items
+
+
+class StreamingMeetingParser:
+    """增量式會議記錄解析器
+    
+    以 feed() 傳入任意切割的文字片段，close() 取得會議記錄物件，
+    結果與 MeetingParser.parse_text_file 相同。
+    每一行經 TranscriptTokenizer 分類後即交給各個 reader，
+    議題與工作事項在其範圍結束時立即建立，
+    只暫存尚未結束的議題、工作事項區塊或段落，不保留整份文字。
+    
+    每一行的處理時間與行長成正比，整體為線性時間。
+    指定 time_budget（秒）時，超過時間上限後忽略其餘輸入，
+    close() 以已解析的部分建立會議記錄，並在 warnings 中說明。
+    """
+    
+    def __init__(self, time_budget=None):
+        self.time_budget = time_budget
+        self.truncated = False  # 是否因超過時間上限而停止解析
+        self._deadline = time.perf_counter() + time_budget if time_budget else None
+        self._tokenizer = TranscriptTokenizer()
+        self._events = list(self._tokenizer.positions.values())
+        self._partial = []  # 尚未遇到換行的片段
+        self._meeting = None
+        
+        # 標頭資訊，只保留第一個符合的結果
+        self._title = None
+        self._subject = None
+        self._meeting_date = None
+        self._meeting_time_pending = False  # 「會議時間：」之後仍是空白
+        self._first_date = None
+        self._time = None
+        self._participants = None
+        self._participants_pending = False  # 「參與人員：」之後仍是空白
+        self._recipients = None
+        
+        # 議題與工作事項
+        self._topic_readers = (_NumberedTopicReader(), _StarTopicReader())
+        self._block_readers = tuple(_ActionBlockReader(label) for label in _ACTION_BLOCK_LABELS)
+        self._fallback_readers = (_FieldLabelReader(), _AssigneeDueReader())
+        
+        # 啟用效能量測時抽樣累計各階段耗時，close() 時依總行數換算後記錄；停用時不呼叫計時器
+        self._stage_seconds = None
+        if metrics.enabled:
+            self._stage_seconds = [0.0] * len(_STREAM_STAGES)
+            self._fed_lines = 0
+            self._timed_lines = 0
+    
+    def feed(self, text):
+        """傳入一段文字，完整的行會立即解析，超過時間上限後忽略"""
+        if self._meeting is not None:
+            raise ValueError("parser is already closed")
+        if self.truncated:
+            return
+        if "\n" not in text:
+            if text:
+                self._partial.append(text)
+            return
+        
+        lines = text.split("\n")
+        if self._partial:
+            self._partial.append(lines[0])
+            lines[0] = "".join(self._partial)
+            self._partial = []
+        last = lines.pop()
+        if last:
+            self._partial.append(last)
+        deadline = self._deadline
+        timed = self._stage_seconds is not None
+        for count, line in enumerate(lines):
+            # 每隔一段行數檢查一次時間，避免每行都呼叫計時器
+            if deadline is not None and count % _DEADLINE_CHECK_LINES == 0 and time.perf_counter() > deadline:
+                self.truncated = True
+                self._partial = []
+                return
+            if timed:
+                # 每 _STAGE_SAMPLE_LINES 行量測一行
+                self._fed_lines += 1
+                if self._fed_lines % _STAGE_SAMPLE_LINES == 1:
+                    self._feed_line_timed(line + "\n")
+                    continue
+            self._feed_line(line + "\n")
+    
+    def close(self):
+        """結束輸入並回傳會議記錄物件"""
+        if self._meeting is not None:
+            return self._meeting
+        if self._partial:
+            self._feed_line("".join(self._partial))
+            self._partial = []
+        
+        meeting = MeetingRecord()
+        if self._title:
+            meeting.title = self._title
+        elif self._subject:
+            meeting.title = self._subject
+        
+        meeting_date = self._meeting_date or self._first_date
+        if meeting_date:
+            meeting.date = meeting_date
+        if self._time:
+            meeting.time = self._time
+        
+        participants_text = self._participants
+        if participants_text is None:
+            participants_text = "" if self._participants_pending else self._recipients
+        if participants_text:
+            participants = _PARTICIPANTS_SPLIT_RE.split(participants_text)
+            meeting.participants = [p.strip() for p in participants if p.strip()]
+        
+        for reader in self._topic_readers:
+            meeting.topics.extend(reader.close())
+        
+        # 沒有工作事項區塊時才使用「名稱：內容」與「負責人：」形式
+        for reader in self._block_readers:
+            meeting.action_items.extend(reader.close())
+        if not meeting.action_items:
+            for reader in self._fallback_readers:
+                meeting.action_items.extend(reader.close())
+        for index, item in enumerate(meeting.action_items, 1):
+            item.id = f"AI{index}"
+        normalize_action_item_dates(meeting)
+        
+        if self.truncated:
+            meeting.warnings.append(
+                f"解析超過 {self.time_budget:g} 秒的時間上限，只處理了前 {self._tokenizer.offset} 個字元，結果可能不完整"
+            )
+        
+        self._meeting = meeting
+        if self._stage_seconds is not None and self._timed_lines:
+            scale = self._fed_lines / self._timed_lines
+            for stage, seconds in zip(_STREAM_STAGES, self._stage_seconds):
+                metrics.observe(stage, seconds * scale)
+        return meeting
+    
+    def _feed_line(self, line):
+        """解析一行（含結尾的換行字元）"""
+        start = self._tokenizer.offset
+        self._tokenizer.feed_line(line)
+        events = self._tokenizer.positions
+        
+        self._feed_header(line, events)
+        for reader in self._topic_readers:
+            reader.feed_line(line, start, events)
+        for reader in self._block_readers:
+            reader.feed_line(line, start, events)
+        if self._fallback_readers:
+            # 區塊在空行處結束並產生工作事項後，就不再需要後備的解析方式
+            if events[EVENT_PARAGRAPH_BREAK] and any(reader.action_items for reader in self._block_readers):
+                self._fallback_readers = ()
+            for reader in self._fallback_readers:
+                reader.feed_line(line, start, events)
+        
+        for positions in self._events:
+            if positions:
+                positions.clear()
+    
+    def _feed_line_timed(self, line):
+        """與 _feed_line 相同，並累計斷詞、標頭、議題與工作事項各階段的耗時"""
+        self._timed_lines += 1
+        timings = self._stage_seconds
+        clock = time.perf_counter
+        started = clock()
+        start = self._tokenizer.offset
+        self._tokenizer.feed_line(line)
+        events = self._tokenizer.positions
+        
+        tokenized = clock()
+        self._feed_header(line, events)
+        header = clock()
+        for reader in self._topic_readers:
+            reader.feed_line(line, start, events)
+        topics = clock()
+        for reader in self._block_readers:
+            reader.feed_line(line, start, events)
+        if self._fallback_readers:
+            if events[EVENT_PARAGRAPH_BREAK] and any(reader.action_items for reader in self._block_readers):
+                self._fallback_readers = ()
+            for reader in self._fallback_readers:
+                reader.feed_line(line, start, events)
+        finished = clock()
+        timings[0] += tokenized - started
+        timings[1] += header - tokenized
+        timings[2] += topics - header
+        timings[3] += finished - topics
+        
+        for positions in self._events:
+            if positions:
+                positions.clear()
+    
+    def _feed_header(self, line, events):
+        """記錄標題、日期時間與參與人員"""
+        blank = line.isspace()
+        
+        if self._title is None and events[EVENT_TITLE]:
+            self._title = _TITLE_RE.match(line).group(0).strip()
+        if self._subject is None and events[EVENT_SUBJECT]:
+            self._subject = _SUBJECT_RE.search(line).group(0).strip()
+        
+        # 「會議時間：」與日期之間的空白可以跨行
+        if self._meeting_date is None:
+            if self._meeting_time_pending and not blank:
+                self._meeting_time_pending = False
+                match = _MEETING_DATE_RE.match("會議時間：" + line)
+                if match:
+                    self._meeting_date = match.group(1).strip()
+            if self._meeting_date is None and events[EVENT_MEETING_TIME]:
+                label = _MEETING_TIME_LABEL_RE.search(line)
+                while label:
+                    match = _MEETING_DATE_RE.match(line, label.start())
+                    if match:
+                        self._meeting_date = match.group(1).strip()
+                        break
+                    if line[label.end():].isspace():
+                        self._meeting_time_pending = True
+                        break
+                    label = _MEETING_TIME_LABEL_RE.search(line, label.end())
+        if self._first_date is None and events[EVENT_DATE]:
+            self._first_date = _DATE_RE.search(line).group(1).strip()
+        if self._time is None and events[EVENT_TIME]:
+            self._time = _TIME_RE.search(line).group(1).strip()
+        
+        # 「參與人員：」與名單之間的空白可以跨行
+        if self._participants is None:
+            if self._participants_pending:
+                if not blank:
+                    self._participants_pending = False
+                    self._participants = _PARTICIPANTS_RE.match("參與人員：" + line).group(1).strip()
+            elif events[EVENT_PARTICIPANTS]:
+                label = _PARTICIPANTS_LABEL_RE.search(line)
+                if line[label.end():].isspace():
+                    self._participants_pending = True
+                else:
+                    self._participants = _PARTICIPANTS_RE.match(line, label.start()).group(1).strip()
+        if self._recipients is None and events[EVENT_RECIPIENTS]:
+            self._recipients = _RECIPIENTS_RE.search(line).group(1).strip()
@@ -0,0 +1,416 @@
+"""
+會議摘要的欄式彙總
+每次會議一列：日期、標題、系列、參與人數、各狀態的工作事項數與完成率、延遲率；
+另以每次會議的每位負責人一列記錄工作量。各欄以 NumPy 陣列存放在 data_folder/rollup.npz，
+每次儲存會議記錄時更新；讀取時載入為 pandas DataFrame，
+跨所有會議的趨勢與負責人工作量以向量化運算取得，不需讀取任何會議記錄。
+render_chart() 以 matplotlib 繪製完成率趨勢與負責人工作量圖表（PNG）。
+NumPy、pandas 與 matplotlib 在第一次用到時才載入，匯入本模組或只取得 signature() 時不需載入。
+"""
+
+import io
+import os
+import uuid
+import sqlite3
+import warnings
+import threading
+from contextlib import contextmanager
+
+from meeting_data_structure import EfficiencyAnalyzer, date_sort_key
+from action_item_tracker import normalize_assignee
+
+
+ROLLUP_FILENAME = "rollup.npz"  # 彙總檔名，與會議記錄放在同一個目錄
+ROLLUP_LOCK_FILENAME = "rollup.sqlite3"  # 多個行程依序更新彙總檔時使用的寫入鎖與版本號
+ROLLUP_VERSION = 1  # 欄位版本，記錄於彙總檔中，不同時由會議記錄重新建立
+ITEM_STATUSES = ("pending", "in_progress", "completed", "delayed")  # 分別計數的工作事項狀態
+PERIODS = ("W", "M", "Q", "Y")  # 趨勢可用的期間：週、月、季、年
+DEFAULT_PERIOD = "M"
+DEFAULT_ASSIGNEE_LIMIT = 15  # 負責人工作量預設列出的人數
+CHARTS = ("completion", "assignees")  # render_chart 可繪製的圖表
+CHART_FONTS = ("Microsoft JhengHei", "PingFang TC", "Noto Sans CJK TC", "Noto Sans CJK JP", "DejaVu Sans")
+
+# 每次會議一列的欄位與 NumPy 型別名稱，str 欄位存為固定長度的 Unicode 陣列
+MEETING_COLUMNS = (
+    ("filename", str),
+    ("title", str),
+    ("date", str),
+    ("sort_date", str),  # 可辨識的日期為 ISO 格式，見 date_sort_key
+    ("series", str),
+    ("participants", "int32"),
+    ("items_total", "int32"),
+    ("items_pending", "int32"),
+    ("items_in_progress", "int32"),
+    ("items_completed", "int32"),
+    ("items_delayed", "int32"),
+    ("completion_rate", "float64"),
+    ("delay_rate", "float64"),
+)
+# 每次會議的每位負責人一列，負責人依正規化後的名稱合併
+ASSIGNEE_COLUMNS = (
+    ("filename", str),
+    ("assignee", str),
+    ("items_total", "int32"),
+    ("items_completed", "int32"),
+    ("items_delayed", "int32"),
+)
+_TABLES = {"meetings": MEETING_COLUMNS, "assignees": ASSIGNEE_COLUMNS}
+_SUMMED = ["items_total", "items_completed", "items_delayed"]  # 分組時加總的欄位
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS rollup_state (id INTEGER PRIMARY KEY CHECK (id = 0), generation INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO rollup_state (id, generation) VALUES (0, 0)",
+)
+
+
+def _rate(part, total):
+    return (part / total) * 100 if total > 0 else 0.0
+
+
+def _rates(part, total):
+    """逐列計算百分比，total 為 0 的列為 0"""
+    return (part / total.where(total > 0) * 100).fillna(0.0)
+
+
+def _to_columns(rows, columns):
+    """將 tuple 列表轉換為 {欄位名稱: 陣列}"""
+    import numpy as np
+    return {
+        name: np.array([row[i] for row in rows], dtype=kind)
+        for i, (name, kind) in enumerate(columns)
+    }
+
+
+def meeting_rows(filename, meeting, series, stats=None):
+    """回傳一次會議的 (會議列, [負責人列])"""
+    if stats is None:
+        stats = EfficiencyAnalyzer.summarize(meeting)
+    counts = dict.fromkeys(ITEM_STATUSES, 0)
+    for item in meeting.action_items:
+        if item.status in counts:
+            counts[item.status] += 1
+    
+    row = (
+        filename, meeting.title or "", meeting.date or "", date_sort_key(meeting.date), series,
+        len(meeting.participants or []), stats.total_items,
+        counts["pending"], counts["in_progress"], counts["completed"], counts["delayed"],
+        _rate(stats.completed_items, stats.total_items), _rate(stats.delayed_items, stats.total_items),
+    )
+    
+    assignees = {}
+    for assignee, assignee_counts in stats.assignees.items():
+        merged = assignees.setdefault(normalize_assignee(assignee), [0, 0, 0])
+        for i, count in enumerate(assignee_counts):
+            merged[i] += count
+    return row, [(filename, assignee, *merged) for assignee, merged in assignees.items()]
+
+
+class MeetingRollup:
+    """會議摘要的欄式彙總
+    
+    系列取自 TrendAnalytics，因此需在趨勢彙總記錄之後更新。
+    寫入時以 rollup.sqlite3 的寫入鎖依序進行，先載入其他行程寫入的最新內容，
+    再將整個彙總檔寫入暫存檔並以 os.replace 取代；讀取時檔案簽章改變即重新載入，
+    多個行程（例如 gunicorn 的 worker）不會讀到寫了一半的檔案，也不會蓋掉彼此的更新。
+    frames() 回傳的 DataFrame 由所有呼叫端共用，不可修改。
+    """
+    
+    def __init__(self, meeting_store, trend_analytics):
+        self.meeting_store = meeting_store
+        self.trend_analytics = trend_analytics
+        self.path = os.path.join(meeting_store.data_folder, ROLLUP_FILENAME)
+        self.lock_path = os.path.join(meeting_store.data_folder, ROLLUP_LOCK_FILENAME)
+        self._lock = threading.Lock()
+        self._tables = None  # {表格: {欄位名稱: 陣列}}，第一次使用時載入
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._generation = 0
+        self._file_signature = None
+        self._frames = None  # (會議 DataFrame, 負責人 DataFrame)
+        self._overviews = {}  # {(期間, 負責人數): overview()}，與 _frames 同時清除
+        with self._connect() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+    
+    @contextmanager
+    def _connect(self):
+        """開啟資料庫連線，區塊結束時提交並關閉"""
+        conn = sqlite3.connect(self.lock_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    @contextmanager
+    def _locked(self):
+        """開啟連線並立即取得寫入鎖，同時更新的其他行程會等待，區塊結束時提交並釋放"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+    
+    def _ensure_loaded(self):
+        """第一次使用時載入彙總檔，不存在或欄位版本不同時由會議記錄重新建立"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            with self._lock:
+                loaded = self._load()
+            if not loaded:
+                self.rebuild()
+            self._loaded = True
+    
+    def _load(self):
+        """讀取彙總檔，成功時回傳 True；呼叫端需持有 _lock"""
+        import numpy as np
+        try:
+            stat = os.stat(self.path)
+            with np.load(self.path, allow_pickle=False) as data:
+                if int(data["version"]) != ROLLUP_VERSION:
+                    return False
+                tables = {
+                    table: {name: data[f"{table}.{name}"] for name, _ in columns}
+                    for table, columns in _TABLES.items()
+                }
+                generation = int(data["generation"])
+        except (OSError, KeyError, ValueError):
+            return False
+        self._tables = tables
+        self._generation = generation
+        self._file_signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        self._frames = None
+        self._overviews = {}
+        return True
+    
+    def _refresh(self):
+        """其他行程更新彙總檔後重新載入；呼叫端需持有 _lock"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if (stat.st_mtime_ns, stat.st_size, stat.st_ino) != self._file_signature:
+            self._load()
+    
+    def _write(self, tables, generation):
+        """寫入暫存檔後取代彙總檔；呼叫端需持有寫入鎖與 _lock"""
+        import numpy as np
+        arrays = {
+            f"{table}.{name}": values
+            for table, columns in tables.items() for name, values in columns.items()
+        }
+        temp_path = os.path.join(os.path.dirname(self.path), f".{uuid.uuid4().hex}.rollup.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                np.savez(f, version=np.int64(ROLLUP_VERSION), generation=np.int64(generation), **arrays)
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        stat = os.stat(self.path)
+        self._tables = tables
+        self._generation = generation
+        self._file_signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        self._frames = None
+        self._overviews = {}
+    
+    def _update(self, rows, assignee_rows, replace_all=False):
+        """以新的列取代同名檔案的列（replace_all 時取代全部）並寫入彙總檔"""
+        import numpy as np
+        new_tables = {
+            "meetings": _to_columns(rows, MEETING_COLUMNS),
+            "assignees": _to_columns(assignee_rows, ASSIGNEE_COLUMNS),
+        }
+        filenames = new_tables["meetings"]["filename"]
+        with self._locked() as conn:
+            generation = conn.execute("SELECT generation FROM rollup_state").fetchone()[0] + 1
+            with self._lock:
+                if not replace_all:
+                    self._refresh()
+                    for table, columns in self._tables.items():
+                        keep = ~np.isin(columns["filename"], filenames)
+                        new_tables[table] = {
+                            name: np.concatenate((values[keep], new_tables[table][name]))
+                            for name, values in columns.items()
+                        }
+                self._write(new_tables, generation)
+            conn.execute("UPDATE rollup_state SET generation = ?", (generation,))
+    
+    def rebuild(self):
+        """由所有會議記錄重新建立彙總檔"""
+        filenames = [summary.filename for summary in self.meeting_store.iter_meetings()]
+        series = self.trend_analytics.series_by_filename(filenames)
+        rows, assignee_rows = [], []
+        for filename in filenames:
+            meeting = self.meeting_store.load(filename)
+            if meeting is None:
+                continue
+            row, assignees = meeting_rows(filename, meeting, series.get(filename, ""))
+            rows.append(row)
+            assignee_rows.extend(assignees)
+        self._update(rows, assignee_rows, replace_all=True)
+    
+    def record_meeting(self, filename, meeting, stats=None):
+        """新增或更新一次會議的摘要"""
+        self.record_meetings([(filename, meeting, stats)])
+    
+    def record_meetings(self, records):
+        """一次新增或更新多次會議的摘要，records 為 (檔案名稱, 會議記錄, MeetingStats 或 None) 列表"""
+        if not records:
+            return
+        self._ensure_loaded()
+        series = self.trend_analytics.series_by_filename(filename for filename, _, _ in records)
+        rows, assignee_rows = [], []
+        for filename, meeting, stats in records:
+            row, assignees = meeting_rows(filename, meeting, series.get(filename, ""), stats)
+            rows.append(row)
+            assignee_rows.extend(assignees)
+        self._update(rows, assignee_rows)
+    
+    def signature(self):
+        """回傳彙總檔的版本號，任何會議摘要更新後都會不同，用於圖表與頁面的 ETag
+        
+        版本號與彙總檔在同一個寫入鎖之內更新，直接由 rollup.sqlite3 讀取，不需載入彙總檔。
+        """
+        with self._connect() as conn:
+            return str(conn.execute("SELECT generation FROM rollup_state").fetchone()[0])
+    
+    def frames(self):
+        """回傳 (會議 DataFrame, 負責人 DataFrame)
+        
+        會議另有 day 欄（datetime，無法辨識的日期為 NaT）。同一個版本的彙總只建立一次 DataFrame。
+        """
+        import pandas as pd
+        self._ensure_loaded()
+        with self._lock:
+            self._refresh()
+            if self._frames is None:
+                meetings = pd.DataFrame(self._tables["meetings"])
+                meetings["day"] = pd.to_datetime(meetings["sort_date"], format="%Y-%m-%d", errors="coerce")
+                self._frames = (meetings, pd.DataFrame(self._tables["assignees"]))
+            return self._frames
+    
+    def completion_by_period(self, period=DEFAULT_PERIOD):
+        """依期間（PERIODS 之一）彙總會議數、工作事項數、完成率與延遲率，回傳依期間排序的 DataFrame"""
+        if period not in PERIODS:
+            raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+        meetings, _ = self.frames()
+        dated = meetings[meetings["day"].notna()]
+        groups = dated.groupby(dated["day"].dt.to_period(period), sort=True)
+        grouped = groups[_SUMMED].sum()
+        grouped.insert(0, "meetings", groups.size())
+        grouped["completion_rate"] = _rates(grouped["items_completed"], grouped["items_total"])
+        grouped["delay_rate"] = _rates(grouped["items_delayed"], grouped["items_total"])
+        grouped.index = grouped.index.astype(str)
+        return grouped.rename_axis("period").reset_index()
+    
+    def assignee_load(self, limit=DEFAULT_ASSIGNEE_LIMIT):
+        """各負責人在所有會議中的工作事項數、完成數、延遲數與未完成數，依工作事項數由多到少"""
+        _, assignees = self.frames()
+        # 同一次會議的同一負責人只有一列，會議數即列數
+        groups = assignees.groupby("assignee")
+        load = groups[_SUMMED].sum()
+        load.insert(0, "meetings", groups.size())
+        load["items_open"] = load["items_total"] - load["items_completed"]
+        load["completion_rate"] = _rates(load["items_completed"], load["items_total"])
+        load = load.sort_values(["items_total", "items_open"], ascending=False, kind="stable")
+        if limit is not None:
+            load = load.head(limit)
+        return load.reset_index()
+    
+    def series_summary(self):
+        """各系列的會議數、最新日期、工作事項數與完成率，最近有會議的系列在前"""
+        meetings, _ = self.frames()
+        groups = meetings.groupby("series")
+        summary = groups[_SUMMED].sum()
+        summary.insert(0, "latest_date", groups["sort_date"].max())
+        summary.insert(0, "meetings", groups.size())
+        summary["completion_rate"] = _rates(summary["items_completed"], summary["items_total"])
+        summary["delay_rate"] = _rates(summary["items_delayed"], summary["items_total"])
+        return summary.sort_values("latest_date", ascending=False, kind="stable").reset_index()
+    
+    def overview(self, period=DEFAULT_PERIOD, assignee_limit=DEFAULT_ASSIGNEE_LIMIT):
+        """整個封存的摘要：總數、各狀態工作事項數、各期間趨勢、各系列與負責人工作量
+        
+        同一個版本的彙總只計算一次，回傳的 dict 由所有呼叫端共用，不可修改。
+        """
+        meetings, _ = self.frames()
+        key = (period, assignee_limit)
+        with self._lock:
+            cached = self._overviews.get(key) if self._frames is not None and self._frames[0] is meetings else None
+        if cached is not None:
+            return cached
+        periods = self.completion_by_period(period)
+        total = int(meetings["items_total"].sum())
+        dated = meetings["day"].dropna()
+        overview = {
+            "meetings": len(meetings),
+            "series": int(meetings["series"].nunique()),
+            "action_items": total,
+            "status_counts": {status: int(meetings[f"items_{status}"].sum()) for status in ITEM_STATUSES},
+            "completion_rate": _rate(int(meetings["items_completed"].sum()), total),
+            "delay_rate": _rate(int(meetings["items_delayed"].sum()), total),
+            "first_date": dated.min().date().isoformat() if len(dated) else None,
+            "latest_date": dated.max().date().isoformat() if len(dated) else None,
+            "period": period,
+            "periods": periods.to_dict("records"),
+            "series_summary": self.series_summary().to_dict("records"),
+            "assignees": self.assignee_load(assignee_limit).to_dict("records"),
+        }
+        with self._lock:
+            if self._frames is not None and self._frames[0] is meetings:
+                self._overviews[key] = overview
+        return overview
+
+
+def render_chart(rollup, name, period=DEFAULT_PERIOD, assignee_limit=DEFAULT_ASSIGNEE_LIMIT):
+    """繪製圖表並回傳 PNG bytes，name 為 CHARTS 之一
+    
+    - completion：各期間的工作事項完成率與延遲率
+    - assignees：工作事項最多的負責人的已完成、延遲與其他未完成數量
+    matplotlib 只在繪製時載入；不使用 pyplot，多個執行緒可同時繪製。
+    """
+    if name not in CHARTS:
+        raise ValueError(f"chart must be one of {', '.join(CHARTS)}")
+    import matplotlib
+    from matplotlib.figure import Figure
+    
+    # 沒有安裝中文字型時負責人名稱以方框顯示，不逐字發出警告
+    warnings.filterwarnings("ignore", message=r"Glyph \d+ .* missing from font", category=UserWarning)
+    
+    with matplotlib.rc_context({"font.sans-serif": list(CHART_FONTS), "axes.unicode_minus": False}):
+        figure = Figure(figsize=(8, 3.6), dpi=100, layout="constrained")
+        axes = figure.subplots()
+        if name == "completion":
+            data = rollup.completion_by_period(period)
+            if len(data):
+                axes.plot(data["period"], data["completion_rate"], marker="o", label="completion rate")
+                axes.plot(data["period"], data["delay_rate"], marker="o", label="delay rate")
+                axes.set_ylim(0, 100)
+                axes.set_ylabel("%")
+                axes.legend(loc="upper left")
+                axes.tick_params(axis="x", labelrotation=45)
+                # 期間很多時只標示部分刻度
+                step = max(1, len(data) // 12)
+                axes.set_xticks(range(0, len(data), step), data["period"].iloc[::step])
+            axes.set_title("Action item completion by period")
+        else:
+            data = rollup.assignee_load(assignee_limit).iloc[::-1]
+            if len(data):
+                completed = data["items_completed"]
+                delayed = data["items_delayed"]
+                other = data["items_open"] - delayed
+                axes.barh(data["assignee"], completed, label="completed")
+                axes.barh(data["assignee"], delayed, left=completed, label="delayed")
+                axes.barh(data["assignee"], other, left=completed + delayed, label="open")
+                axes.set_xlabel("action items")
+                axes.legend(loc="lower right")
+            axes.set_title("Action items per assignee")
+        if not len(data):
+            axes.text(0.5, 0.5, "No meetings yet", ha="center", va="center", transform=axes.transAxes)
+            axes.set_axis_off()
+        
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format="png")
+    return buffer.getvalue()
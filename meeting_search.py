@@ -0,0 +1,454 @@
+"""
+會議記錄全文檢索
+以 SQLite 保存議題標題、描述、討論要點、決策與工作事項描述的倒排索引，
+中日韓文字切成相鄰兩字（bigram），英文與數字以單字為詞，
+每次儲存會議記錄時只更新該會議的索引，查詢時不需開啟任何會議記錄檔案
+"""
+
+import os
+import re
+import math
+import heapq
+import sqlite3
+import unicodedata
+from array import array
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+
+from lazy_loading import LazyPattern
+
+
+SEARCH_FILENAME = "search.sqlite3"  # 檢索索引檔名，與會議記錄放在同一個目錄
+SEARCH_VERSION = 2  # 索引結構版本，記錄於 PRAGMA user_version
+DEFAULT_LIMIT = 20  # 預設返回的結果數
+MAX_HIGHLIGHTS = 3  # 每筆結果最多的摘錄數
+SNIPPET_CONTEXT = 30  # 摘錄中第一個符合處前後保留的字數
+BLOCK_SIZE = 1024  # 倒排列表以會議 ID 分塊儲存，儲存一次會議只需改寫每個詞的一個區塊
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+# 索引的欄位與權重，議題標題符合時排名較前
+FIELD_WEIGHTS = {
+    "topic_title": 3,
+    "description": 1,
+    "discussion_points": 1,
+    "decisions": 2,
+    "action_items": 2,
+}
+
+# 中日韓文字逐字切分，其他文字與數字以連續的字元為一個詞
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_TOKEN_RUN_RE = LazyPattern(f"[{_CJK}]+|[^\\W_{_CJK}]+")
+_CJK_RE = LazyPattern(f"[{_CJK}]")
+
+SearchField = namedtuple("SearchField", [
+    "field",     # 欄位名稱，FIELD_WEIGHTS 的鍵
+    "topic_id",  # 所屬議題編號，工作事項為其 ID
+    "text",      # 原始文字
+])
+
+_SCHEMA = (
+    # 每次會議一列，terms 為索引過的詞（以換行分隔），改寫同名檔案時用來移除舊的倒排項目
+    """
+    CREATE TABLE IF NOT EXISTS search_documents (
+        doc_id INTEGER PRIMARY KEY,
+        filename TEXT NOT NULL UNIQUE,
+        title TEXT NOT NULL,
+        date TEXT NOT NULL,
+        terms TEXT NOT NULL
+    )
+    """,
+    # 倒排索引：詞與區塊 -> 區塊內的會議與加權詞頻，以 _pack 編碼
+    """
+    CREATE TABLE IF NOT EXISTS search_postings (
+        term TEXT NOT NULL,
+        block INTEGER NOT NULL,
+        postings BLOB NOT NULL,
+        PRIMARY KEY (term, block)
+    ) WITHOUT ROWID
+    """,
+    # 各區塊中每個會議加權後的詞數，用於 BM25 的長度正規化
+    "CREATE TABLE IF NOT EXISTS search_lengths (block INTEGER PRIMARY KEY, lengths BLOB NOT NULL)",
+    # 被索引的原始文字，用於產生摘錄
+    """
+    CREATE TABLE IF NOT EXISTS search_fields (
+        doc_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        field TEXT NOT NULL,
+        topic_id TEXT NOT NULL,
+        text TEXT NOT NULL,
+        PRIMARY KEY (doc_id, seq)
+    ) WITHOUT ROWID
+    """,
+)
+_TABLES = ("search_documents", "search_postings", "search_lengths", "search_fields")
+
+
+def _pack(postings):
+    """將 {會議 ID: 權重} 編碼為依會議 ID 排序、交錯排列的 32 位元整數"""
+    packed = array("I")
+    for doc_id in sorted(postings):
+        packed.append(doc_id)
+        packed.append(postings[doc_id])
+    return packed.tobytes()
+
+
+def _unpack(blob):
+    """解碼 _pack 的結果，回傳 {會議 ID: 權重}"""
+    packed = array("I")
+    packed.frombytes(blob)
+    return dict(zip(packed[0::2], packed[1::2]))
+
+
+def _doc_ids(blob):
+    """只解碼 _pack 結果中的會議 ID"""
+    packed = array("I")
+    packed.frombytes(blob)
+    return packed[0::2]
+
+
+def fold(text):
+    """正規化為檢索用的文字：全形轉半形並忽略大小寫"""
+    return unicodedata.normalize("NFKC", text or "").casefold()
+
+
+def iter_tokens(text):
+    """產生已正規化文字中的 (詞, 起點, 終點)
+    
+    中日韓文字每相鄰兩字為一個詞，只有一個字時以單字為詞；其他文字以連續的字母或數字為一個詞。
+    """
+    for match in _TOKEN_RUN_RE.finditer(text):
+        run = match.group(0)
+        start = match.start()
+        if not _CJK_RE.match(run):
+            yield run, start, match.end()
+        elif len(run) == 1:
+            yield run, start, start + 1
+        else:
+            for i in range(len(run) - 1):
+                yield run[i:i + 2], start + i, start + i + 2
+
+
+def tokenize(text):
+    """回傳文字正規化後的詞列表"""
+    return [token for token, _, _ in iter_tokens(fold(text))]
+
+
+def index_terms(text):
+    """回傳索引用的詞：與 tokenize 相同，再加上每段中日韓文字的最後一個字
+    
+    單一個中日韓文字的查詢以字首比對 bigram，段落的最後一個字不是任何 bigram 的開頭，另外以單字索引，
+    例如「下週開會」索引「下週、週開、開會、會」。
+    """
+    terms = []
+    for match in _TOKEN_RUN_RE.finditer(fold(text)):
+        run = match.group(0)
+        if not _CJK_RE.match(run):
+            terms.append(run)
+            continue
+        terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        terms.append(run[-1])
+    return terms
+
+
+def query_terms(text):
+    """回傳查詢用的詞：中日韓文字取不重疊的 bigram 覆蓋每個字，其他文字與 tokenize 相同
+    
+    例如「客戶要求提前交付」取「客戶、要求、提前、交付」，只有這些詞需要讀取權重並計分。
+    """
+    terms = []
+    for match in _TOKEN_RUN_RE.finditer(fold(text)):
+        run = match.group(0)
+        if len(run) <= 2 or not _CJK_RE.match(run):
+            terms.append(run)
+            continue
+        terms.extend(run[i:i + 2] for i in range(0, len(run) - 1, 2))
+        if len(run) % 2:
+            terms.append(run[-2:])
+    return list(dict.fromkeys(terms))
+
+
+def meeting_fields(meeting):
+    """列出會議記錄中要索引的欄位"""
+    fields = []
+    for topic in meeting.topics:
+        fields.append(SearchField("topic_title", topic.id, topic.title))
+        fields.append(SearchField("description", topic.id, topic.description))
+        fields.extend(SearchField("discussion_points", topic.id, point) for point in topic.discussion_points)
+        fields.extend(SearchField("decisions", topic.id, decision) for decision in topic.decisions)
+    fields.extend(SearchField("action_items", item.id, item.description) for item in meeting.action_items)
+    return [field for field in fields if field.text]
+
+
+def highlight(text, terms):
+    """標示文字中符合的詞，回傳 (摘錄, [(起點, 終點)])；沒有符合時回傳 None
+    
+    相鄰或重疊的 bigram 合併為一段；摘錄從第一個符合處前 SNIPPET_CONTEXT 字開始，
+    位置以摘錄為準。正規化改變了文字長度時，摘錄取自正規化後的文字。
+    """
+    folded = fold(text)
+    # 大部分欄位不含任何詞，先以子字串檢查略過
+    if not any(term in folded for term in terms):
+        return None
+    source = text if len(folded) == len(text) else folded
+    found = [(start, end) for token, start, end in iter_tokens(folded) if token in terms]
+    # 單一個中日韓文字的查詢詞可能出現在 bigram 中間
+    for term in terms:
+        if len(term) == 1 and _CJK_RE.match(term):
+            found.extend((match.start(), match.end()) for match in re.finditer(term, folded))
+    if not found:
+        return None
+    spans = []
+    for start, end in sorted(found):
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+    
+    begin = max(0, spans[0][0] - SNIPPET_CONTEXT)
+    finish = min(len(source), spans[0][1] + SNIPPET_CONTEXT * 2)
+    snippet = ("…" if begin > 0 else "") + source[begin:finish] + ("…" if finish < len(source) else "")
+    offset = (1 if begin > 0 else 0) - begin
+    matches = [(start + offset, min(end, finish) + offset) for start, end in spans if start < finish]
+    return snippet, matches
+
+
+class SearchIndex:
+    """會議記錄的全文檢索索引
+    
+    查詢時每個詞只讀取一次倒排列表，所有詞都出現的會議以 BM25 排序，
+    排名在前的結果再由索引中保存的原始文字產生摘錄。
+    第一次開啟時會由 MeetingStore 中既有的會議記錄一次建立索引。
+    """
+    
+    def __init__(self, meeting_store):
+        self.meeting_store = meeting_store
+        self.index_path = os.path.join(meeting_store.data_folder, SEARCH_FILENAME)
+        self._init_index()
+    
+    @contextmanager
+    def _connect(self):
+        """開啟資料庫連線，區塊結束時提交並關閉"""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _init_index(self):
+        """建立資料結構，新建立的資料庫會匯入既有的會議記錄"""
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for statement in _SCHEMA:
+                conn.execute(statement)
+        
+        if version < SEARCH_VERSION:
+            self.rebuild()
+            with self._connect() as conn:
+                conn.execute(f"PRAGMA user_version = {SEARCH_VERSION}")
+    
+    def rebuild(self, batch_size=200):
+        """由所有會議記錄重新建立索引"""
+        with self._connect() as conn:
+            for table in _TABLES:
+                conn.execute(f"DELETE FROM {table}")
+        
+        batch = []
+        for summary in self.meeting_store.iter_meetings():
+            meeting = self.meeting_store.load(summary.filename)
+            if meeting is not None:
+                batch.append((summary.filename, meeting))
+            if len(batch) >= batch_size:
+                self.record_meetings(batch)
+                batch = []
+        if batch:
+            self.record_meetings(batch)
+    
+    def record_meeting(self, filename, meeting):
+        """新增或更新一次會議的索引"""
+        self.record_meetings([(filename, meeting)])
+    
+    def record_meetings(self, records):
+        """在同一個交易中新增或更新多次會議的索引，records 為 (檔案名稱, 會議記錄) 列表
+        
+        同一批次中對同一個倒排區塊的變更會先合併，每個區塊只讀寫一次。
+        """
+        postings = {}  # (詞, 區塊) -> {會議 ID: 權重，0 表示移除}
+        lengths = {}  # 區塊 -> {區塊內位置: 長度}
+        with self._connect() as conn:
+            for filename, meeting in records:
+                doc_id, old_terms, weights = self._record(conn, filename, meeting)
+                block = doc_id // BLOCK_SIZE
+                for term in old_terms:
+                    postings.setdefault((term, block), {})[doc_id] = 0
+                for term, weight in weights.items():
+                    postings.setdefault((term, block), {})[doc_id] = weight
+                lengths.setdefault(block, {})[doc_id % BLOCK_SIZE] = sum(weights.values())
+            self._write_postings(conn, postings, lengths)
+    
+    def _record(self, conn, filename, meeting):
+        """寫入一次會議的文件與欄位，回傳 (會議 ID, 舊的詞, 新的 {詞: 加權詞頻})"""
+        fields = meeting_fields(meeting)
+        weights = Counter()
+        for field in fields:
+            weight = FIELD_WEIGHTS[field.field]
+            for token in index_terms(field.text):
+                weights[token] += weight
+        terms = "\n".join(weights)
+        
+        row = conn.execute("SELECT doc_id, terms FROM search_documents WHERE filename = ?", (filename,)).fetchone()
+        if row is not None:
+            doc_id, old_terms = row[0], row[1].split("\n") if row[1] else []
+            conn.execute("DELETE FROM search_fields WHERE doc_id = ?", (doc_id,))
+            conn.execute(
+                "UPDATE search_documents SET title = ?, date = ?, terms = ? WHERE doc_id = ?",
+                (meeting.title or "", meeting.date or "", terms, doc_id),
+            )
+        else:
+            old_terms = []
+            doc_id = conn.execute(
+                "INSERT INTO search_documents (filename, title, date, terms) VALUES (?, ?, ?, ?)",
+                (filename, meeting.title or "", meeting.date or "", terms),
+            ).lastrowid
+        
+        conn.executemany(
+            "INSERT INTO search_fields (doc_id, seq, field, topic_id, text) VALUES (?, ?, ?, ?, ?)",
+            [(doc_id, seq, field.field, field.topic_id, field.text) for seq, field in enumerate(fields)],
+        )
+        return doc_id, old_terms, weights
+    
+    @staticmethod
+    def _write_postings(conn, postings, lengths):
+        """將合併後的變更寫入倒排區塊與長度區塊"""
+        for (term, block), changes in postings.items():
+            row = conn.execute(
+                "SELECT postings FROM search_postings WHERE term = ? AND block = ?", (term, block)
+            ).fetchone()
+            merged = _unpack(row[0]) if row is not None else {}
+            merged.update(changes)
+            merged = {doc_id: weight for doc_id, weight in merged.items() if weight}
+            if merged:
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_postings (term, block, postings) VALUES (?, ?, ?)",
+                    (term, block, _pack(merged)),
+                )
+            elif row is not None:
+                conn.execute("DELETE FROM search_postings WHERE term = ? AND block = ?", (term, block))
+        
+        for block, changes in lengths.items():
+            row = conn.execute("SELECT lengths FROM search_lengths WHERE block = ?", (block,)).fetchone()
+            values = array("I", bytes(BLOCK_SIZE * 4))
+            if row is not None:
+                values = array("I")
+                values.frombytes(row[0])
+            for position, length in changes.items():
+                values[position] = length
+            conn.execute(
+                "INSERT OR REPLACE INTO search_lengths (block, lengths) VALUES (?, ?)", (block, values.tobytes())
+            )
+    
+    def search(self, query, limit=DEFAULT_LIMIT, offset=0):
+        """檢索包含查詢中所有詞的會議，依 BM25 分數由高到低排序
+        
+        回傳 {"total": 符合的會議數, "results": [{filename, title, date, score, highlights}]}，
+        highlights 為 {field, topic_id, text, matches} 列表，matches 為 text 中符合處的 [起點, 終點)。
+        """
+        terms = query_terms(query)
+        if not terms:
+            return {"total": 0, "results": []}
+        # 覆蓋之外的 bigram（「戶要」、「求提」等）只用來確認相鄰，不計分
+        all_terms = set(tokenize(query))
+        filter_terms = all_terms.difference(terms)
+        
+        with self._connect() as conn:
+            documents = conn.execute("SELECT COUNT(*) FROM search_documents").fetchone()[0]
+            if not documents:
+                return {"total": 0, "results": []}
+            
+            # 每個詞讀取其所有區塊，再取所有詞都出現的會議
+            postings = []
+            for term in terms:
+                rows = Counter()
+                for (blob,) in self._term_blocks(conn, term):
+                    # 單一個中日韓文字符合多個詞時，同一次會議的權重相加
+                    rows.update(_unpack(blob))
+                if not rows:
+                    return {"total": 0, "results": []}
+                postings.append(rows)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for rows in postings[1:]:
+                candidates.intersection_update(rows)
+            for term in filter_terms:
+                if not candidates:
+                    break
+                doc_ids = set()
+                for (blob,) in self._term_blocks(conn, term):
+                    doc_ids.update(_doc_ids(blob))
+                candidates.intersection_update(doc_ids)
+            if not candidates:
+                return {"total": 0, "results": []}
+            
+            lengths = {}
+            total_length = 0
+            for block, blob in conn.execute("SELECT block, lengths FROM search_lengths"):
+                lengths[block] = array("I")
+                lengths[block].frombytes(blob)
+                total_length += sum(lengths[block])
+            
+            # BM25：以與候選會議對齊的列表累加各詞的分數
+            candidates = sorted(candidates)
+            scale = _BM25_B * documents / (total_length or 1)
+            norms = [
+                _BM25_K1 * (1 - _BM25_B + scale * lengths[doc_id // BLOCK_SIZE][doc_id % BLOCK_SIZE])
+                for doc_id in candidates
+            ]
+            scores = [0.0] * len(candidates)
+            for rows in postings:
+                idf = math.log(1 + (documents - len(rows) + 0.5) / (len(rows) + 0.5)) * (_BM25_K1 + 1)
+                weights = map(rows.__getitem__, candidates)
+                scores = [score + idf * weight / (weight + norm) for score, weight, norm in zip(scores, weights, norms)]
+            
+            # 分數相同時會議 ID 較小者在前
+            ranked = heapq.nlargest(offset + limit, range(len(candidates)), key=scores.__getitem__)[offset:]
+            results = [self._result(conn, candidates[i], scores[i], all_terms) for i in ranked]
+        return {"total": len(candidates), "results": results}
+    
+    @staticmethod
+    def _term_blocks(conn, term):
+        """讀取一個詞的所有倒排區塊；單一個中日韓文字比對以它開頭的 bigram 與它本身（段落的最後一個字）"""
+        if len(term) == 1 and _CJK_RE.match(term):
+            return conn.execute(
+                "SELECT postings FROM search_postings WHERE term >= ? AND term < ?", (term, chr(ord(term) + 1))
+            )
+        return conn.execute("SELECT postings FROM search_postings WHERE term = ?", (term,))
+    
+    @staticmethod
+    def _result(conn, doc_id, score, terms):
+        """組合一筆結果，摘錄取自含有最多個查詢詞的欄位"""
+        filename, title, date = conn.execute(
+            "SELECT filename, title, date FROM search_documents WHERE doc_id = ?", (doc_id,)
+        ).fetchone()
+        # 先以子字串計算每個欄位含有幾個查詢詞，只為前幾個欄位產生摘錄
+        fields = []
+        for seq, field, topic_id, text in conn.execute(
+            "SELECT seq, field, topic_id, text FROM search_fields WHERE doc_id = ?", (doc_id,)
+        ):
+            folded = fold(text)
+            present = sum(1 for term in terms if term in folded)
+            if present:
+                fields.append((-present, seq, field, topic_id, text))
+        highlights = []
+        for _, _, field, topic_id, text in heapq.nsmallest(MAX_HIGHLIGHTS, fields):
+            marked = highlight(text, terms)
+            if marked is not None:
+                snippet, matches = marked
+                highlights.append({"field": field, "topic_id": topic_id, "text": snippet, "matches": matches})
+        return {
+            "filename": filename,
+            "title": title,
+            "date": date,
+            "score": round(score, 4),
+            "highlights": highlights,
+        }
@@ -0,0 +1,631 @@
+"""
+會議記錄儲存層
+完整的會議記錄以檔案保存（格式見 meeting_codecs），另以 SQLite 索引檔名、日期與標題，
+列出會議與查詢最新一次會議時只讀取索引，不需開啟任何會議記錄檔案
+"""
+
+import os
+import re
+import json
+import base64
+import hashlib
+import time
+import uuid
+import sqlite3
+import itertools
+import threading
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+from meeting_data_structure import MeetingRecord, normalize_date, date_sort_key
+from meeting_codecs import DEFAULT_FORMAT, MEETING_EXTENSIONS, get_codec, decode_meeting, read_meeting_fields
+
+
+INDEX_FILENAME = "index.sqlite3"  # 索引檔名，與會議記錄放在同一個目錄
+INDEX_VERSION = 4  # 索引結構版本，記錄於 PRAGMA user_version
+DEFAULT_CACHE_MAX_ENTRIES = 256  # 快取最多保留的會議記錄數
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 快取最多佔用的位元組數（以檔案與回應大小估算）
+
+# 列表頁面需要的會議摘要
+MeetingSummary = namedtuple("MeetingSummary", ["filename", "title", "date", "time", "participants"])
+
+
+def content_hash(payload):
+    """會議記錄檔案內容的雜湊值（SHA-1 十六進位）"""
+    return hashlib.sha1(payload).hexdigest()
+
+
+class LazyMeeting:
+    """會議記錄的延遲載入檢視
+    
+    檔名、標題、日期、時間與參與人員取自索引中的摘要，建立時不開啟會議記錄檔案；
+    第一次存取議題、工作事項等其他屬性時，才經由 MeetingStore.load 讀取完整的會議記錄。
+    會議記錄檔案不存在時，存取這些屬性會拋出 AttributeError。
+    """
+    
+    __slots__ = ("filename", "title", "date", "time", "participants", "_store", "_meeting")
+    
+    def __init__(self, store, summary):
+        self.filename, self.title, self.date, self.time, self.participants = summary
+        self._store = store
+        self._meeting = None
+    
+    @property
+    def loaded(self):
+        """是否已讀取完整的會議記錄"""
+        return self._meeting is not None
+    
+    def __getattr__(self, name):
+        # 只有在 __slots__ 中找不到的屬性才會呼叫；私有屬性不觸發讀取，避免複製或序列化時遞迴
+        if name.startswith("_"):
+            raise AttributeError(name)
+        meeting = self._meeting
+        if meeting is None:
+            meeting = self._store.load(self.filename)
+            if meeting is None:
+                raise AttributeError(f"{name} (meeting record {self.filename} not found)")
+            self._meeting = meeting
+        return getattr(meeting, name)
+
+
+_TABLES = ("meetings", "meeting_participants", "meeting_action_items")
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS meetings (
+        filename TEXT PRIMARY KEY,
+        date TEXT NOT NULL DEFAULT '',
+        iso_date TEXT NOT NULL DEFAULT '',
+        sort_date TEXT NOT NULL DEFAULT '',
+        time TEXT NOT NULL DEFAULT '',
+        title TEXT NOT NULL DEFAULT '',
+        participants TEXT NOT NULL DEFAULT '[]',
+        saved_at REAL NOT NULL,
+        content_hash TEXT NOT NULL DEFAULT ''
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS meetings_by_date ON meetings (sort_date DESC, saved_at DESC, filename DESC)",
+    "CREATE INDEX IF NOT EXISTS meetings_by_iso_date ON meetings (iso_date)",
+    "CREATE INDEX IF NOT EXISTS meetings_by_title ON meetings (title)",
+    # 篩選用：每位參與人員與每個工作事項的負責人、狀態各一列
+    "CREATE TABLE IF NOT EXISTS meeting_participants (filename TEXT NOT NULL, name TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS participants_by_meeting ON meeting_participants (filename, name)",
+    "CREATE TABLE IF NOT EXISTS meeting_action_items (filename TEXT NOT NULL, assignee TEXT NOT NULL, status TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS action_items_by_meeting ON meeting_action_items (filename, status)",
+)
+_ORDER_BY = "m.sort_date DESC, m.saved_at DESC, m.filename DESC"
+
+
+class CachedMeeting:
+    """快取中的一筆會議記錄"""
+    
+    __slots__ = ("signature", "meeting", "body", "size")
+    
+    def __init__(self, signature, meeting, size):
+        self.signature = signature  # 讀取時檔案的 (mtime, size)
+        self.meeting = meeting  # 會議記錄物件，呼叫端不應修改
+        self.body = None  # 序列化後的回應內容，第一次需要時才建立
+        self.size = size  # 估算的佔用位元組數
+
+
+class MeetingCache:
+    """會議記錄的 LRU 快取
+    
+    以檔案名稱為鍵，並記錄讀取時檔案的 (mtime, size)；
+    檔案被改寫後簽章不同，舊的項目視為未命中並移除。
+    超過項目數或位元組數上限時，淘汰最久未使用的項目。
+    """
+    
+    def __init__(self, max_entries=DEFAULT_CACHE_MAX_ENTRIES, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+    
+    def get(self, filename, signature):
+        """回傳簽章相符的快取項目，沒有時回傳 None"""
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(filename)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                self._remove(filename)
+            self.misses += 1
+            return None
+    
+    def put(self, filename, signature, meeting, size):
+        """加入一筆會議記錄並回傳其快取項目，超過上限的項目不會被保留"""
+        entry = CachedMeeting(signature, meeting, size)
+        with self._lock:
+            if filename in self._entries:
+                self._remove(filename)
+            if size <= self.max_bytes and self.max_entries > 0:
+                self._entries[filename] = entry
+                self._bytes += size
+                self._evict()
+        return entry
+    
+    def set_body(self, filename, entry, body):
+        """記錄快取項目序列化後的回應內容"""
+        with self._lock:
+            entry.body = body
+            if self._entries.get(filename) is entry:
+                entry.size += len(body)
+                self._bytes += len(body)
+                self._evict()
+    
+    def invalidate(self, filename):
+        """移除指定檔案的快取項目"""
+        with self._lock:
+            if filename in self._entries:
+                self._remove(filename)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        """回傳快取的使用狀況與命中統計"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+    
+    def _remove(self, filename):
+        entry = self._entries.pop(filename)
+        self._bytes -= entry.size
+    
+    def _evict(self):
+        """淘汰最久未使用的項目，直到符合上限"""
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+
+class MeetingStore:
+    """會議記錄的儲存與索引
+    
+    索引依正規化後的日期由新到舊排序（2024年3月5日 與 2024/3/5 視為同一天），相同日期時較晚儲存者在前。
+    第一次開啟索引時會把目錄中既有的會議記錄檔案一次匯入。
+    讀取過的會議記錄保留在 LRU 快取中，重複讀取時不需再解碼檔案。
+    新的會議記錄以 codec 指定的格式寫入（名稱見 meeting_codecs.CODECS），讀取時依檔案內容判斷格式。
+    
+    寫入時先寫暫存檔，再於索引的寫入鎖（BEGIN IMMEDIATE）之內改名並更新索引：
+    多個執行緒或行程（例如 gunicorn 的 worker）同時儲存時依序取得檔名，不會互相覆寫，
+    讀取端只會看到完整的舊檔或新檔，索引與檔案內容也一致。
+    """
+    
+    def __init__(self, data_folder, cache=None, codec=DEFAULT_FORMAT):
+        self.data_folder = data_folder
+        self.index_path = os.path.join(data_folder, INDEX_FILENAME)
+        self.cache = cache if cache is not None else MeetingCache()
+        self.codec = get_codec(codec) if isinstance(codec, str) else codec
+        self._init_index()
+    
+    @contextmanager
+    def _connect(self):
+        """開啟索引連線，區塊結束時提交並關閉"""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    @contextmanager
+    def _locked(self):
+        """開啟索引連線並立即取得寫入鎖，同時寫入的其他連線會等待，區塊結束時提交並釋放"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+    
+    def _init_index(self):
+        """建立索引結構，新建立或舊版本的索引會由會議記錄重新匯入"""
+        with self._connect() as conn:
+            # WAL 模式下寫入時不會阻擋讀取
+            conn.execute("PRAGMA journal_mode = WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < INDEX_VERSION:
+                for table in _TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+        
+        if version < INDEX_VERSION:
+            self.migrate()
+            with self._connect() as conn:
+                conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    
+    def migrate(self):
+        """將尚未加入索引的會議記錄檔案匯入索引，回傳匯入的檔案數"""
+        with self._connect() as conn:
+            indexed = {row[0] for row in conn.execute("SELECT filename FROM meetings")}
+        
+        count = 0
+        for filename in sorted(os.listdir(self.data_folder)):
+            if not filename.endswith(MEETING_EXTENSIONS) or filename in indexed:
+                continue
+            filepath = os.path.join(self.data_folder, filename)
+            try:
+                with open(filepath, 'rb') as f:
+                    payload = f.read()
+                meeting = MeetingRecord.from_dict(decode_meeting(payload))
+            except Exception as e:
+                print(f"Error loading meeting record {filename}: {e}")
+                continue
+            self._index_meeting(filename, meeting, os.path.getmtime(filepath), content_hash(payload))
+            count += 1
+        
+        return count
+    
+    def _index_meeting(self, filename, meeting, saved_at, digest):
+        """新增或更新一筆索引"""
+        with self._connect() as conn:
+            self._write_index(conn, filename, meeting, saved_at, digest)
+    
+    @staticmethod
+    def _write_index(conn, filename, meeting, saved_at, digest):
+        """在既有的連線中新增或更新一筆索引，digest 為檔案內容的雜湊值"""
+        participants = meeting.participants or []
+        conn.execute(
+            "INSERT OR REPLACE INTO meetings "
+            "(filename, date, iso_date, sort_date, time, title, participants, saved_at, content_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                filename,
+                meeting.date or "",
+                normalize_date(meeting.date),
+                date_sort_key(meeting.date),
+                meeting.time or "",
+                meeting.title or "",
+                json.dumps(participants, ensure_ascii=False),
+                saved_at,
+                digest,
+            ),
+        )
+        conn.execute("DELETE FROM meeting_participants WHERE filename = ?", (filename,))
+        conn.executemany(
+            "INSERT INTO meeting_participants (filename, name) VALUES (?, ?)",
+            [(filename, name) for name in set(participants)],
+        )
+        conn.execute("DELETE FROM meeting_action_items WHERE filename = ?", (filename,))
+        conn.executemany(
+            "INSERT INTO meeting_action_items (filename, assignee, status) VALUES (?, ?, ?)",
+            [(filename, item.assignee or "", item.status or "") for item in meeting.action_items],
+        )
+    
+    @staticmethod
+    def make_filename(meeting, extension=".json"):
+        """使用會議日期和標題作為檔案名稱"""
+        date_str = re.sub(r'[^\w]', '_', meeting.date) if meeting.date else datetime.now().strftime('%Y%m%d')
+        title_str = re.sub(r'[^\w]', '_', meeting.title)[:30] if meeting.title else 'untitled'
+        return f"{date_str}_{title_str}{extension}"
+    
+    def save(self, meeting):
+        """儲存會議記錄到檔案並更新索引，回傳檔案名稱"""
+        return self.save_many([meeting])[0]
+    
+    def save_many(self, meetings):
+        """儲存多筆會議記錄，所有檔案在同一個寫入鎖之內放到定位並更新索引，回傳檔案名稱列表
+        
+        由 MeetingStore 讀取的會議記錄（filename 有值）改寫原檔；新的會議記錄取得尚未使用的檔名，
+        儲存後 meeting.filename 設為該檔名。
+        """
+        staged = []
+        saved = []
+        try:
+            # 編碼與寫入暫存檔不需持有鎖
+            for meeting in meetings:
+                payload = self.codec.encode(meeting.to_dict())
+                staged.append((meeting, self._write_temp(payload), content_hash(payload)))
+            with self._locked() as conn:
+                for meeting, temp_path, digest in staged:
+                    filename = self._place_file(temp_path, meeting)
+                    self._write_index(conn, filename, meeting, time.time(), digest)
+                    saved.append(filename)
+        finally:
+            for _, temp_path, _ in staged:
+                self._remove_temp(temp_path)
+        
+        for meeting, filename in zip(meetings, saved):
+            meeting.filename = filename
+            self.cache.invalidate(filename)
+        return saved
+    
+    def _write_temp(self, payload):
+        """將內容寫入同一目錄中的暫存檔並寫入磁碟，回傳暫存檔路徑；暫存檔名以 . 開頭、以 .tmp 結尾，不會被當成會議記錄"""
+        temp_path = os.path.join(self.data_folder, f".{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_path, 'xb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            self._remove_temp(temp_path)
+            raise
+        return temp_path
+    
+    @staticmethod
+    def _remove_temp(temp_path):
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+    
+    def _place_file(self, temp_path, meeting):
+        """將暫存檔放到最終位置並回傳檔案名稱，呼叫端需持有寫入鎖
+        
+        已儲存過的會議記錄以 os.replace 取代原檔。新的會議記錄依序嘗試 日期_標題、日期_標題_2 …，
+        跳過任何格式已使用的檔名，並以 os.link 建立檔案：目標已存在時 os.link 失敗而不會覆寫。
+        """
+        if meeting.filename:
+            os.replace(temp_path, os.path.join(self.data_folder, meeting.filename))
+            return meeting.filename
+        
+        stem = self.make_filename(meeting, "")
+        for number in itertools.count(1):
+            candidate = stem if number == 1 else f"{stem}_{number}"
+            if any(os.path.exists(os.path.join(self.data_folder, candidate + extension)) for extension in MEETING_EXTENSIONS):
+                continue
+            filename = candidate + self.codec.extension
+            filepath = os.path.join(self.data_folder, filename)
+            try:
+                os.link(temp_path, filepath)
+            except FileExistsError:
+                continue
+            except OSError:
+                # 不支援硬連結的檔案系統：已持有寫入鎖並確認檔名未使用，直接改名
+                os.replace(temp_path, filepath)
+            return filename
+    
+    def convert(self, codec=None):
+        """將索引中的會議記錄改寫為指定格式（預設為目前的格式），回傳改寫的檔案數
+        
+        檔名不變，其他索引與連結不受影響；內容已相同的檔案、轉換期間被改寫的檔案不會改寫。
+        先寫入暫存檔再取代原檔，中途中斷時原檔仍完整。
+        """
+        codec = get_codec(codec) if isinstance(codec, str) else (codec or self.codec)
+        count = 0
+        for summary in self.iter_meetings():
+            filepath = os.path.join(self.data_folder, summary.filename)
+            try:
+                with open(filepath, 'rb') as f:
+                    payload = f.read()
+                converted = codec.encode(decode_meeting(payload))
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"Error converting meeting record {summary.filename}: {e}")
+                continue
+            if converted == payload:
+                continue
+            temp_path = self._write_temp(converted)
+            try:
+                with self._locked() as conn:
+                    # 讀取之後被其他請求改寫的檔案不取代，以免蓋掉較新的內容
+                    row = conn.execute("SELECT content_hash FROM meetings WHERE filename = ?", (summary.filename,)).fetchone()
+                    if row is None or row[0] != content_hash(payload):
+                        continue
+                    os.replace(temp_path, filepath)
+                    conn.execute(
+                        "UPDATE meetings SET content_hash = ? WHERE filename = ?", (content_hash(converted), summary.filename)
+                    )
+            finally:
+                self._remove_temp(temp_path)
+            self.cache.invalidate(summary.filename)
+            count += 1
+        return count
+    
+    def content_hash(self, filename):
+        """回傳索引中記錄的會議記錄檔案內容雜湊值，不在索引中時回傳 None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT content_hash FROM meetings WHERE filename = ?", (filename,)).fetchone()
+        return row[0] if row else None
+    
+    def signature(self):
+        """回傳整個索引的簽章，任何會議記錄新增或改寫後都會不同，用於判斷會議列表是否變更"""
+        with self._connect() as conn:
+            # 每次儲存都以當下時間更新 saved_at，因此新增或改寫都會改變筆數或最大值
+            count, last_saved = conn.execute("SELECT COUNT(*), COALESCE(MAX(saved_at), 0) FROM meetings").fetchone()
+        return f"{count}-{last_saved!r}"
+    
+    def load(self, filename):
+        """讀取完整的會議記錄，檔案不存在時回傳 None
+        
+        回傳的物件可能與其他請求共用，呼叫端不應修改。
+        """
+        entry = self._load_entry(filename)
+        return entry.meeting if entry is not None else None
+    
+    def load_response(self, filename, serialize):
+        """回傳序列化後的會議記錄，檔案不存在時回傳 None
+        
+        serialize 將會議記錄字典轉換為 bytes，結果與會議記錄一起快取。
+        """
+        entry = self._load_entry(filename)
+        if entry is None:
+            return None
+        if entry.body is None:
+            self.cache.set_body(filename, entry, serialize(entry.meeting.to_dict()))
+        return entry.body
+    
+    def _load_entry(self, filename):
+        """從快取或檔案取得會議記錄，檔案改寫過時重新讀取"""
+        filepath = os.path.join(self.data_folder, filename)
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            self.cache.invalidate(filename)
+            return None
+        entry = self.cache.get(filename, (stat.st_mtime_ns, stat.st_size))
+        if entry is not None:
+            return entry
+        
+        # 以開啟後的檔案重新取得簽章：檔案在 stat 之後被取代時，快取的簽章仍與讀到的內容相符
+        try:
+            with open(filepath, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                payload = f.read()
+        except FileNotFoundError:
+            return None
+        meeting = MeetingRecord.from_dict(decode_meeting(payload))
+        meeting.filename = filename  # 添加檔案名稱屬性，用於前端連結
+        return self.cache.put(filename, (stat.st_mtime_ns, stat.st_size), meeting, stat.st_size)
+    
+    def load_fields(self, filename, fields):
+        """只讀取會議記錄的部分欄位（例如 title、efficiency_metrics），回傳字典，檔案不存在時回傳 None
+        
+        已在快取中的會議記錄直接取用；分段的二進位格式只解碼需要的段，其他格式仍需解碼整個檔案。
+        """
+        filepath = os.path.join(self.data_folder, filename)
+        try:
+            stat = os.stat(filepath)
+            entry = self.cache.get(filename, (stat.st_mtime_ns, stat.st_size))
+            if entry is not None:
+                data = entry.meeting.to_dict()
+                return {field: data[field] for field in fields if field in data}
+            with open(filepath, 'rb') as f:
+                return read_meeting_fields(f, fields)
+        except FileNotFoundError:
+            return None
+    
+    def list_meetings(self, limit=None):
+        """依日期由新到舊列出會議摘要"""
+        return self.query_meetings(limit=limit)[0]
+    
+    def iter_views(self, cursor=None, batch_size=200, **filters):
+        """依條件由新到舊逐筆產生會議記錄的延遲載入檢視，條件與 query_meetings 相同"""
+        for summary in self.iter_meetings(cursor=cursor, batch_size=batch_size, **filters):
+            yield LazyMeeting(self, summary)
+    
+    def latest(self):
+        """回傳最新一次會議的摘要，沒有任何會議時回傳 None"""
+        summaries = self.list_meetings(limit=1)
+        return summaries[0] if summaries else None
+    
+    def query_meetings(self, limit=None, cursor=None, **filters):
+        """依條件由新到舊列出會議摘要
+        
+        filters 可為 date_from、date_to、participant、assignee、status、title，
+        說明見 _filter_clause。回傳 (摘要列表, 下一頁的游標)，沒有下一頁時游標為 None。
+        """
+        where, params = self._filter_clause(cursor, **filters)
+        query = f"SELECT m.filename, m.title, m.date, m.time, m.participants, m.saved_at, m.sort_date FROM meetings m{where} ORDER BY {_ORDER_BY}"
+        if limit is not None:
+            # 多取一筆以判斷是否還有下一頁
+            query += " LIMIT ?"
+            params.append(limit + 1)
+        
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1]) if rows else None
+        return [self._summary(row) for row in rows], next_cursor
+    
+    def iter_meetings(self, cursor=None, batch_size=200, **filters):
+        """依條件由新到舊逐筆產生會議摘要，每次只從索引讀取 batch_size 筆"""
+        while True:
+            summaries, cursor = self.query_meetings(limit=batch_size, cursor=cursor, **filters)
+            yield from summaries
+            if cursor is None:
+                return
+    
+    @staticmethod
+    def _filter_clause(cursor=None, date_from=None, date_to=None, participant=None, assignee=None, status=None, title=None):
+        """組合 WHERE 子句，回傳 (子句, 參數列表)
+        
+        date_from/date_to 為包含端點的日期範圍（可使用 2024年3月5日 等格式），
+        participant 為參與人員全名，assignee 為負責人子字串，status 為工作事項狀態，
+        assignee 與 status 需符合同一個工作事項，title 為標題子字串。
+        日期或游標格式錯誤時拋出 ValueError。
+        """
+        conditions = []
+        params = []
+        
+        if cursor:
+            conditions.append("(m.sort_date, m.saved_at, m.filename) < (?, ?, ?)")
+            params.extend(MeetingStore._decode_cursor(cursor))
+        for value, operator in ((date_from, ">="), (date_to, "<=")):
+            if value:
+                iso_date = normalize_date(value)
+                if not iso_date:
+                    raise ValueError(f"invalid date: {value}")
+                conditions.append(f"m.iso_date != '' AND m.iso_date {operator} ?")
+                params.append(iso_date)
+        if participant:
+            conditions.append("EXISTS (SELECT 1 FROM meeting_participants p WHERE p.filename = m.filename AND p.name = ?)")
+            params.append(participant)
+        if assignee or status:
+            item_conditions = ["a.filename = m.filename"]
+            if assignee:
+                item_conditions.append("instr(a.assignee, ?) > 0")
+                params.append(assignee)
+            if status:
+                item_conditions.append("a.status = ?")
+                params.append(status)
+            conditions.append(f"EXISTS (SELECT 1 FROM meeting_action_items a WHERE {' AND '.join(item_conditions)})")
+        if title:
+            conditions.append("instr(m.title, ?) > 0")
+            params.append(title)
+        
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return where, params
+    
+    @staticmethod
+    def _encode_cursor(row):
+        """以最後一筆的排序鍵作為游標"""
+        filename, _, _, _, _, saved_at, date = row
+        payload = json.dumps([date, saved_at, filename], ensure_ascii=False).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+    
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            date, saved_at, filename = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return str(date), float(saved_at), str(filename)
+        except Exception:
+            raise ValueError(f"invalid cursor: {cursor}") from None
+    
+    @staticmethod
+    def _summary(row):
+        filename, title, date, time_, participants = row[:5]
+        return MeetingSummary(filename, title, date, time_, json.loads(participants))
+
+
+if __name__ == '__main__':
+    # 一次性匯入：python meeting_store.py <會議記錄目錄>
+    # 轉換格式：python meeting_store.py <會議記錄目錄> --convert binary
+    import argparse
+    from meeting_codecs import CODECS
+    
+    parser = argparse.ArgumentParser(description="Index meeting records and optionally convert their file format")
+    parser.add_argument("data_folder")
+    parser.add_argument("--convert", choices=sorted(CODECS), help="rewrite every indexed meeting record in this format")
+    args = parser.parse_args()
+    
+    store = MeetingStore(args.data_folder)
+    store.migrate()
+    print(f"{len(store.list_meetings())} meeting records indexed in {store.index_path}")
+    if args.convert:
+        try:
+            count = store.convert(args.convert)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"{count} meeting records converted to {args.convert}")
@@ -0,0 +1,109 @@
+"""
+預先產生的頁面快取
+渲染後的 HTML 以 ETag 為版本存放在磁碟上（data_folder/pages/<鍵>/<ETag>.html），
+伺服器產生的圖表也以相同的方式存放在另一個目錄（例如 data_folder/charts/<鍵>/<ETag>.png），
+並在記憶體中保留最近使用的頁面。ETag 由內容的雜湊值產生，內容改變時 ETag 也不同，
+舊的頁面不會被誤用；多個行程共用同一個目錄時也不需要互相通知。
+"""
+
+import os
+import re
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+PAGES_FOLDER = "pages"  # 頁面快取目錄名稱，放在會議記錄目錄之下
+DEFAULT_MAX_ENTRIES = 64  # 記憶體中最多保留的頁面數
+
+
+def make_etag(*parts):
+    """由多個字串組成 ETag（SHA-1 前 20 個十六進位字元）"""
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()[:20]
+
+
+class PageCache:
+    """以 ETag 為版本的頁面快取
+    
+    get 只回傳 ETag 相符的頁面；put 寫入新版本並移除同一個鍵的舊版本。
+    磁碟上的檔案以暫存檔加 os.replace 寫入，其他行程不會讀到寫了一半的頁面。
+    """
+    
+    def __init__(self, data_folder, max_entries=DEFAULT_MAX_ENTRIES, folder=PAGES_FOLDER, suffix=".html"):
+        self.folder = os.path.join(data_folder, folder)
+        self.suffix = suffix  # 檔案的副檔名
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # 鍵 -> (ETag, 頁面 bytes)
+        self._lock = threading.Lock()
+        os.makedirs(self.folder, exist_ok=True)
+    
+    def _key_folder(self, key):
+        # 鍵作為目錄名稱，非文字字元替換為底線
+        return os.path.join(self.folder, re.sub(r'[^\w.-]', '_', key))
+    
+    def get(self, key, etag):
+        """回傳 ETag 相符的頁面，沒有時回傳 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == etag:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        
+        try:
+            with open(os.path.join(self._key_folder(key), f"{etag}{self.suffix}"), 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._remember(key, etag, body)
+        return body
+    
+    def put(self, key, etag, body):
+        """保存一個版本的頁面，同一個鍵的其他版本會被移除"""
+        folder = self._key_folder(key)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{etag}{self.suffix}")
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(body)
+        os.replace(temp_path, path)
+        for name in os.listdir(folder):
+            if name != f"{etag}{self.suffix}" and name.endswith(self.suffix):
+                try:
+                    os.remove(os.path.join(folder, name))
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._remember(key, etag, body)
+    
+    def invalidate(self, key):
+        """移除一個鍵的所有版本"""
+        with self._lock:
+            self._entries.pop(key, None)
+        shutil.rmtree(self._key_folder(key), ignore_errors=True)
+    
+    def stats(self):
+        """回傳記憶體中的頁面數與命中統計"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+    
+    def _remember(self, key, etag, body):
+        """在記憶體中保留頁面並淘汰最久未使用的項目，呼叫端需持有鎖"""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (etag, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,293 @@
+"""
+效能量測
+以 stage(名稱) 區塊量測上傳、解析、分析與儲存各階段的耗時，累積為直方圖，
+並以計數器記錄解析的位元組數、議題與工作事項數等；render() 輸出 Prometheus 文字格式。
+請求進行中的各階段耗時另外記錄在該執行緒的 trace 中，可作為 Server-Timing 標頭。
+停用時 stage() 回傳共用的空區塊，不呼叫計時器也不取得鎖。
+每個行程各自累積，多個行程（例如 gunicorn 的 worker）時各自輸出自己的數值。
+
+UploadProfiler 以 cProfile 抽樣剖析上傳的處理，只保留最慢的幾次剖析結果。
+"""
+
+import os
+import re
+import time
+import random
+import cProfile
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext, contextmanager
+
+
+# 直方圖的區間上限（秒），解析與儲存的階段多在數毫秒之內
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_METRIC = "meeting_stage_seconds"
+PROFILES_FOLDER = "profiles"  # 剖析結果目錄名稱，放在會議記錄目錄之下
+
+# 各指標的說明，render() 輸出為 HELP
+HELP = {
+    STAGE_METRIC: "Time spent in each upload, parse, analysis and storage stage",
+    "http_request_seconds": "Request handling time by endpoint",
+    "http_responses_total": "Responses by endpoint and status code",
+    "meeting_parsed_bytes_total": "Transcript bytes read by the parser",
+    "meeting_topics_extracted_total": "Topics extracted from uploaded transcripts",
+    "meeting_action_items_extracted_total": "Action items extracted from uploaded transcripts",
+    "meeting_uploads_total": "Processed uploads by result",
+    "meeting_section_cache_hits_total": "Topic and action item sections reused from earlier parses",
+    "meeting_section_cache_misses_total": "Topic and action item sections parsed from scratch",
+    "meeting_section_cache_entries": "Parsed sections kept in memory",
+}
+
+_NULL_STAGE = nullcontext()
+_LABEL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{str(value).translate(_LABEL_ESCAPES)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Stage:
+    """量測一個階段的區塊"""
+    
+    __slots__ = ("metrics", "name", "started")
+    
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class Metrics:
+    """直方圖與計數器
+    
+    直方圖以 (指標名稱, 標籤) 為鍵，保存各區間的次數、總和與次數；
+    標籤為 (名稱, 值) tuple，輸出時依原順序排列。collectors 中的函式在 render() 時呼叫，
+    回傳 (指標名稱, 類型, [(標籤, 數值)]) 列表，用於輸出快取命中等由其他物件維護的數值。
+    """
+    
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.collectors = []
+        self._histograms = {}  # (指標名稱, 標籤) -> [各區間次數..., 總和, 次數]
+        self._counters = {}  # (指標名稱, 標籤) -> 數值
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def stage(self, name):
+        """回傳量測一個階段的區塊，停用時回傳共用的空區塊"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+    
+    def observe(self, stage, seconds):
+        """記錄一個階段的耗時，並加入目前執行緒所有進行中的 trace"""
+        if not self.enabled:
+            return
+        self.histogram(STAGE_METRIC, seconds, (("stage", stage),))
+        for entries in getattr(self._local, "traces", ()):
+            entries.append((stage, seconds))
+    
+    def histogram(self, name, value, labels=()):
+        """在直方圖中記錄一個數值"""
+        if not self.enabled:
+            return
+        key = (name, labels)
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            i = bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+    
+    def count(self, name, amount=1, labels=()):
+        """累加計數器"""
+        if not self.enabled:
+            return
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+    
+    def start_trace(self):
+        """開始記錄目前執行緒各階段的耗時，回傳之後會加入 (階段, 秒數) 的列表"""
+        traces = getattr(self._local, "traces", None)
+        if traces is None:
+            traces = self._local.traces = []
+        entries = []
+        traces.append(entries)
+        return entries
+    
+    def finish_trace(self, entries):
+        """停止記錄 start_trace 回傳的列表"""
+        traces = getattr(self._local, "traces", [])
+        if any(trace is entries for trace in traces):
+            traces[:] = [trace for trace in traces if trace is not entries]
+    
+    @contextmanager
+    def trace(self):
+        """記錄區塊內目前執行緒各階段耗時的列表 [(階段, 秒數)]，可以巢狀使用"""
+        entries = self.start_trace()
+        try:
+            yield entries
+        finally:
+            self.finish_trace(entries)
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+    
+    def render(self):
+        """以 Prometheus 文字格式輸出所有指標"""
+        with self._lock:
+            histograms = {key: list(series) for key, series in self._histograms.items()}
+            counters = dict(self._counters)
+        
+        families = {}  # 指標名稱 -> (類型, [各行])
+        for (name, labels), series in sorted(histograms.items()):
+            lines = families.setdefault(name, ("histogram", []))[1]
+            cumulative = 0
+            for bound, hits in zip(self.buckets, series):
+                cumulative += hits
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {series[-1]}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(series[-2])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {series[-1]}")
+        for (name, labels), value in sorted(counters.items()):
+            families.setdefault(name, ("counter", []))[1].append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for collector in self.collectors:
+            for name, kind, samples in collector():
+                lines = families.setdefault(name, (kind, []))[1]
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        
+        output = []
+        for name, (kind, lines) in families.items():
+            if name in HELP:
+                output.append(f"# HELP {name} {HELP[name]}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(lines)
+        return "\n".join(output) + "\n"
+
+
+def server_timing(entries):
+    """將 trace 轉為 Server-Timing 標頭的值，同名階段的耗時相加，依第一次出現的順序排列"""
+    totals = {}
+    for stage, seconds in entries:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in totals.items())
+
+
+class TimedReader:
+    """包裝以二進位模式開啟的檔案，累計 read() 的耗時與讀取的位元組數"""
+    
+    def __init__(self, f):
+        self._f = f
+        self.seconds = 0.0
+        self.bytes = 0
+    
+    def read(self, size=-1):
+        started = time.perf_counter()
+        data = self._f.read(size)
+        self.seconds += time.perf_counter() - started
+        self.bytes += len(data)
+        return data
+    
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+# 應用程式共用的量測物件，預設停用；src/main.py 依設定啟用
+metrics = Metrics()
+
+
+class UploadProfiler:
+    """抽樣剖析上傳的處理，保留最慢的 keep 次
+    
+    每次上傳以 sample_rate 的機率以 cProfile 剖析；同一時間只剖析一個上傳，
+    其他執行緒的上傳在這段期間不剖析。剖析結果存為 data_folder/profiles/ 下的 .prof 檔，
+    檔名開頭為耗時毫秒數，可用 python -m pstats 或 snakeviz 開啟；重新啟動後沿用既有的檔案。
+    """
+    
+    _NAME_RE = re.compile(r"(\d+(?:\.\d+)?)ms-.*\.prof")
+    
+    def __init__(self, data_folder, keep=0, sample_rate=1.0):
+        self.folder = os.path.join(data_folder, PROFILES_FOLDER)
+        self.keep = keep
+        self.sample_rate = sample_rate
+        self._profiles = []  # [(秒數, 檔名, 資訊)]，由慢到快
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        if keep > 0:
+            os.makedirs(self.folder, exist_ok=True)
+            for name in os.listdir(self.folder):
+                match = self._NAME_RE.fullmatch(name)
+                if match:
+                    seconds = float(match.group(1)) / 1000
+                    self._profiles.append((seconds, name, {"file": name, "seconds": round(seconds, 4)}))
+            self._profiles.sort(key=lambda profile: profile[0], reverse=True)
+            self._trim()
+    
+    def run(self, label, function, *args):
+        """執行 function(*args) 並回傳結果，抽中時同時剖析"""
+        if self.keep <= 0 or random.random() >= self.sample_rate or not self._busy.acquire(blocking=False):
+            return function(*args)
+        try:
+            profile = cProfile.Profile()
+            with metrics.trace() as stages:
+                started = time.perf_counter()
+                try:
+                    return profile.runcall(function, *args)
+                finally:
+                    self._record(label, time.perf_counter() - started, profile, stages)
+        finally:
+            self._busy.release()
+    
+    def _record(self, label, seconds, profile, stages):
+        """耗時在最慢的 keep 次之內時保存剖析結果"""
+        with self._lock:
+            if len(self._profiles) >= self.keep and seconds <= self._profiles[-1][0]:
+                return
+        safe_label = re.sub(r'[^\w.-]', '_', label)[:60]
+        name = f"{seconds * 1000:.1f}ms-{safe_label}-{int(time.time() * 1000)}.prof"
+        profile.dump_stats(os.path.join(self.folder, name))
+        info = {
+            "file": name,
+            "label": label,
+            "seconds": round(seconds, 4),
+            "finished_at": time.time(),
+            "stages": [{"stage": stage, "seconds": round(elapsed, 6)} for stage, elapsed in stages],
+        }
+        with self._lock:
+            self._profiles.append((seconds, name, info))
+            self._profiles.sort(key=lambda profile: profile[0], reverse=True)
+            self._trim()
+    
+    def _trim(self):
+        """刪除最慢的 keep 次以外的剖析結果，呼叫端需持有鎖"""
+        while len(self._profiles) > self.keep:
+            _, name, _ = self._profiles.pop()
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except FileNotFoundError:
+                pass
+    
+    def slowest(self):
+        """回傳保存的剖析結果資訊，由慢到快"""
+        with self._lock:
+            return [dict(info) for _, _, info in self._profiles]
@@ -0,0 +1,435 @@
+"""
+重新分析已儲存的會議記錄
+修改工作事項的狀態或截止日期規則（見 meeting_data_structure.action_item_rules）後，
+以目前的規則重新分類所有會議記錄的工作事項，並依同一系列的前一次會議重新計算效率指標；
+只改寫實際有變更的會議記錄，同時更新工作事項追蹤、趨勢彙總與摘要彙總。
+截止日期與完成日期同樣轉換為 ISO 格式，舊版本儲存的「3/20」等原始文字也會一併更新。
+分類以 pandas 的字串運算一次處理一批會議的所有工作事項，各批次在多個行程中平行執行。
+改寫的進度記錄於 reprocess.sqlite3，中斷後以相同的規則再次執行時略過已完成的會議記錄：
+    python reprocess.py [--data-folder 目錄] [--workers 數量] [--batch-size 數量] [--dry-run] [--report 檔案]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+import warnings
+import functools
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from meeting_data_structure import MeetingRecord, EfficiencyAnalyzer, action_item_rules, normalize_due_date, normalize_completion_date
+from meeting_store import MeetingStore
+from action_item_tracker import ActionItemTracker
+from meeting_analytics import TrendAnalytics
+from meeting_rollup import MeetingRollup
+from transcript_cache import TranscriptCache
+
+
+CHECKPOINT_FILENAME = "reprocess.sqlite3"  # 進度檔名，與會議記錄放在同一個目錄
+CHECKPOINT_VERSION = 2  # 資料結構版本，記錄於 PRAGMA user_version，也加入規則的簽章
+DEFAULT_BATCH_SIZE = 500  # 每個行程一次分類、每次改寫與記錄進度的會議數
+MAX_SERIES_PASSES = 3  # 改寫後會議被歸入其他系列時，重新檢查受影響系列的次數上限
+DIFF_DESCRIPTION_CHARS = 40  # 差異報告中工作事項描述顯示的字數
+
+_SCHEMA = (
+    # 進行中的重新分析所用規則的簽章，規則改變時重新開始
+    """
+    CREATE TABLE IF NOT EXISTS reprocess_state (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        rules TEXT NOT NULL,
+        started_at REAL NOT NULL
+    )
+    """,
+    # 已完成的會議記錄與完成時的檔案雜湊值，檔案之後被改寫時需要重新分析
+    "CREATE TABLE IF NOT EXISTS reprocess_done (filename TEXT PRIMARY KEY, content_hash TEXT NOT NULL)",
+)
+
+ItemChange = namedtuple("ItemChange", [
+    "item_id",      # 工作事項編號，例如 AI3
+    "field",        # 變更的欄位：status、due_date 或 completion_date
+    "old",          # 原本的值
+    "new",          # 以目前規則得到的值
+    "description",  # 工作事項描述
+])
+
+Reclassification = namedtuple("Reclassification", [
+    "filename",            # 會議記錄檔名
+    "content_hash",        # 分類時的檔案雜湊值
+    "changes",             # ItemChange 列表
+    "stats",               # 重新分類後的 MeetingStats
+    "efficiency_metrics",  # 原本儲存的效率指標
+])
+
+
+def rules_signature():
+    """目前分類規則的簽章，規則或本模組的版本改變時不同"""
+    due_date_re, status_rules = action_item_rules()
+    parts = [str(CHECKPOINT_VERSION), due_date_re.pattern]
+    parts.extend(f"{pattern.pattern}\t{status}" for pattern, status in status_rules)
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def classify_descriptions(descriptions):
+    """以目前的規則分類工作事項描述，回傳 (狀態陣列, 截止日期陣列)
+    
+    結果與 MeetingParser._build_action_item 逐一比對相同：截止日期取第一個符合的日期，
+    狀態取第一個符合的規則，都不符合時為 pending。相同的描述只分類一次，
+    後面的規則只比對前面的規則都不符合的描述。
+    """
+    due_date_re, status_rules = action_item_rules()
+    codes, unique = pd.factorize(pd.Series(descriptions, dtype=object))
+    text = pd.Series(unique, dtype=object)
+    due_dates = text.str.extract(due_date_re.pattern, expand=False).fillna("").str.strip().to_numpy(dtype=object)
+    statuses = np.full(len(text), "pending", dtype=object)
+    remaining = np.ones(len(text), dtype=bool)
+    with warnings.catch_warnings():
+        # 狀態規則含有群組，pandas 提醒改用 str.extract；這裡只需要是否符合
+        warnings.filterwarnings("ignore", "This pattern is interpreted as a regular expression", UserWarning)
+        for pattern, status in status_rules:
+            matched = np.zeros(len(text), dtype=bool)
+            matched[remaining] = text[remaining].str.contains(pattern.pattern, regex=True).to_numpy(dtype=bool)
+            statuses[matched] = status
+            remaining &= ~matched
+    return statuses[codes], due_dates[codes]
+
+
+def reclassify(meetings):
+    """重新分類多次會議的所有工作事項並直接修改，回傳各次會議的 ItemChange 列表
+    
+    截止日期與完成日期與解析時相同，以會議日期推算年份並轉換為 ISO 格式（normalize_action_item_dates）。
+    """
+    items = [item for meeting in meetings for item in meeting.action_items]
+    owners = np.repeat(np.arange(len(meetings)), [len(meeting.action_items) for meeting in meetings])
+    statuses, due_dates = classify_descriptions([item.description or "" for item in items])
+    meeting_dates = [meeting.date or "" for meeting in meetings]
+    # 同一個會議日期的相同截止日期只轉換一次
+    normalize = functools.lru_cache(maxsize=None)(normalize_due_date)
+    due_dates = np.array([
+        normalize(due_date, meeting_dates[owner]) or due_date for due_date, owner in zip(due_dates, owners)
+    ], dtype=object)
+    completion_dates = np.array([
+        normalize_completion_date(item.completion_date or "", status, meeting_dates[owner])
+        for item, status, owner in zip(items, statuses, owners)
+    ], dtype=object)
+    
+    fields = (
+        ("status", statuses, np.array([item.status or "" for item in items], dtype=object) != statuses),
+        ("due_date", due_dates, np.array([item.due_date or "" for item in items], dtype=object) != due_dates),
+        ("completion_date", completion_dates,
+         np.array([item.completion_date or "" for item in items], dtype=object) != completion_dates),
+    )
+    changed = np.zeros(len(items), dtype=bool)
+    for _, _, field_changed in fields:
+        changed |= field_changed
+    
+    changes = [[] for _ in meetings]
+    for index in np.flatnonzero(changed):
+        item = items[index]
+        meeting_changes = changes[owners[index]]
+        for field, values, field_changed in fields:
+            if field_changed[index]:
+                meeting_changes.append(ItemChange(item.id, field, getattr(item, field), values[index], item.description))
+                setattr(item, field, values[index])
+    return changes
+
+
+def classify_batch(data_folder, filenames):
+    """讀取並重新分類一批會議記錄，於子行程中執行，回傳 Reclassification 列表（不存在的檔案略過）"""
+    store = MeetingStore(data_folder)
+    loaded = []
+    for filename in filenames:
+        digest = store.content_hash(filename)
+        meeting = store.load(filename)
+        if digest is None or meeting is None:
+            continue
+        # 讀取的會議記錄可能與快取共用，複製後再修改
+        loaded.append((filename, digest, MeetingRecord.from_dict(meeting.to_dict())))
+    
+    changes = reclassify([meeting for _, _, meeting in loaded])
+    return [
+        Reclassification(filename, digest, meeting_changes, EfficiencyAnalyzer.summarize(meeting), meeting.efficiency_metrics)
+        for (filename, digest, meeting), meeting_changes in zip(loaded, changes)
+    ]
+
+
+def metric_changes(old, new):
+    """回傳兩組效率指標中不同的 (名稱, 原本的值, 新的值) 列表；重複議題列表的順序不影響比較"""
+    changes = []
+    for name in sorted(set(old) | set(new)):
+        before, after = old.get(name), new.get(name)
+        if name == "repeated_topics" and isinstance(before, list) and isinstance(after, list):
+            if sorted(before) == sorted(after):
+                continue
+        elif before == after:
+            continue
+        changes.append((name, before, after))
+    return changes
+
+
+class Reprocessor:
+    """以目前的規則重新分析所有已儲存的會議記錄
+    
+    先平行分類所有會議記錄並取得新的統計，再依趨勢彙總中各系列的會議順序重新計算效率指標
+    （與上傳時相同：與同一系列中日期在前的最近一次會議比較，沒有前一次會議時為空）；
+    最後依日期由舊到新分批改寫有變更的會議記錄並更新索引，每批完成後記錄進度。
+    中斷後再次執行時，已完成且之後未被改寫的會議記錄不再分類，其統計取自趨勢彙總；
+    整個重新分析完成後清除進度，下一次執行會再檢查所有會議記錄。
+    """
+    
+    def __init__(self, meeting_store, action_item_tracker, trend_analytics, meeting_rollup=None,
+                 transcript_cache=None, max_workers=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.meeting_store = meeting_store
+        self.action_item_tracker = action_item_tracker
+        self.trend_analytics = trend_analytics
+        self.meeting_rollup = meeting_rollup  # 會議摘要的欄式彙總，None 表示不更新
+        self.transcript_cache = transcript_cache  # 已匯入逐字稿的雜湊值，None 表示不更新
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.checkpoint_path = os.path.join(meeting_store.data_folder, CHECKPOINT_FILENAME)
+        self._init_checkpoint()
+    
+    @contextmanager
+    def _connect(self):
+        """開啟資料庫連線，區塊結束時提交並關閉"""
+        conn = sqlite3.connect(self.checkpoint_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _init_checkpoint(self):
+        """建立資料結構，版本不同時清除既有的進度"""
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != CHECKPOINT_VERSION:
+                conn.execute("DROP TABLE IF EXISTS reprocess_state")
+                conn.execute("DROP TABLE IF EXISTS reprocess_done")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            if version != CHECKPOINT_VERSION:
+                conn.execute(f"PRAGMA user_version = {CHECKPOINT_VERSION}")
+    
+    def _start(self, rules, restart=False):
+        """開始或繼續重新分析，回傳已完成且之後未被改寫的檔名集合"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT rules FROM reprocess_state").fetchone()
+            if restart or row is None or row[0] != rules:
+                conn.execute("DELETE FROM reprocess_done")
+                conn.execute("INSERT OR REPLACE INTO reprocess_state VALUES (0, ?, ?)", (rules, time.time()))
+                return set()
+            done = conn.execute("SELECT filename, content_hash FROM reprocess_done").fetchall()
+        return {filename for filename, digest in done if self.meeting_store.content_hash(filename) == digest}
+    
+    def _checkpoint(self, filenames):
+        """記錄一批已完成的會議記錄"""
+        rows = []
+        for filename in filenames:
+            digest = self.meeting_store.content_hash(filename)
+            if digest is not None:
+                rows.append((filename, digest))
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO reprocess_done VALUES (?, ?)", rows)
+    
+    def _finish(self):
+        """整個重新分析完成，清除進度"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM reprocess_done")
+            conn.execute("DELETE FROM reprocess_state")
+    
+    def classify_all(self, filenames):
+        """分批平行分類會議記錄，依輸入順序回傳 Reclassification 列表"""
+        batches = [filenames[start:start + self.batch_size] for start in range(0, len(filenames), self.batch_size)]
+        workers = min(self.max_workers, len(batches))
+        classify = functools.partial(classify_batch, self.meeting_store.data_folder)
+        # 只有一批或只允許一個行程時，不需建立行程池
+        if workers <= 1:
+            results = [classify(batch) for batch in batches]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(classify, batches))
+        return [result for batch in results for result in batch]
+    
+    def plan(self, results):
+        """以重新分類後的統計計算效率指標，回傳 {檔名: 新的效率指標}
+        
+        前一次會議不在 results 中（已於先前中斷的執行中完成）時，其統計取自趨勢彙總。
+        """
+        stats = {result.filename: result.stats for result in results}
+        predecessors = {}
+        for filenames in self.trend_analytics.series_meetings().values():
+            predecessors.update(zip(filenames[1:], filenames[:-1]))
+        
+        metrics = {}
+        for result in results:
+            previous = predecessors.get(result.filename)
+            previous_stats = None
+            if previous is not None:
+                previous_stats = stats.get(previous) or self.trend_analytics.stats(previous)
+            metrics[result.filename] = EfficiencyAnalyzer.compare(result.stats, previous_stats) if previous_stats else {}
+        return metrics
+    
+    def _rewrite(self, filenames, metrics):
+        """重新讀取、分類並改寫會議記錄，再更新工作事項追蹤、趨勢彙總與摘要彙總"""
+        meetings = []
+        previous_hashes = []
+        for filename in filenames:
+            meeting = self.meeting_store.load(filename)
+            if meeting is None:
+                continue
+            previous_hashes.append(self.meeting_store.content_hash(filename))
+            meeting = MeetingRecord.from_dict(meeting.to_dict())
+            meeting.filename = filename
+            meeting.efficiency_metrics = metrics[filename]
+            meetings.append(meeting)
+        
+        # 分類與改寫之間檔案可能被其他行程改寫，以讀取到的內容重新分類
+        reclassify(meetings)
+        stats = [EfficiencyAnalyzer.summarize(meeting) for meeting in meetings]
+        saved = self.meeting_store.save_many(meetings)
+        self.action_item_tracker.record_meetings(list(zip(saved, meetings)))
+        self.trend_analytics.record_meetings(list(zip(saved, meetings, stats)))
+        if self.meeting_rollup is not None:
+            self.meeting_rollup.record_meetings(list(zip(saved, meetings, stats)))
+        if self.transcript_cache is not None:
+            self.transcript_cache.rehash(list(zip(saved, previous_hashes)))
+        return len(saved)
+    
+    def _pass(self, filenames, dry_run):
+        """分類、比較並（非 dry_run 時）改寫 filenames，回傳 (差異列表, 改寫的會議數)"""
+        results = self.classify_all(filenames)
+        metrics = self.plan(results)
+        diffs = []
+        for result in results:
+            changed_metrics = metric_changes(result.efficiency_metrics, metrics[result.filename])
+            if result.changes or changed_metrics:
+                diffs.append({
+                    "filename": result.filename,
+                    "action_items": [change._asdict() for change in result.changes],
+                    "efficiency_metrics": [
+                        {"name": name, "old": old, "new": new} for name, old, new in changed_metrics
+                    ],
+                })
+        if dry_run:
+            return diffs, 0
+        
+        rewritten = 0
+        changed = {diff["filename"] for diff in diffs}
+        for start in range(0, len(results), self.batch_size):
+            batch = [result.filename for result in results[start:start + self.batch_size]]
+            targets = [filename for filename in batch if filename in changed]
+            if targets:
+                rewritten += self._rewrite(targets, metrics)
+            self._checkpoint(batch)
+        return diffs, rewritten
+    
+    def run(self, dry_run=False, restart=False):
+        """重新分析所有會議記錄，回傳報告；dry_run 時只比較差異，不改寫也不記錄進度
+        
+        報告的 diffs 為有變更的會議記錄，各含工作事項與效率指標的差異。
+        改寫時趨勢彙總會重新判斷會議所屬的系列，系列的會議有增減時，
+        再以新的順序檢查這些系列的所有會議（最多 MAX_SERIES_PASSES 次）；dry_run 不包含這些差異。
+        """
+        started = time.perf_counter()
+        rules = rules_signature()
+        done = set() if dry_run else self._start(rules, restart)
+        filenames = [summary.filename for summary in self.meeting_store.iter_meetings()]
+        filenames.reverse()
+        pending = [filename for filename in filenames if filename not in done]
+        
+        series = self.trend_analytics.series_meetings()
+        diffs, rewritten = self._pass(pending, dry_run)
+        checked = len(pending)
+        if not dry_run:
+            for _ in range(MAX_SERIES_PASSES):
+                previous, series = series, self.trend_analytics.series_meetings()
+                moved = {name for name in set(previous) | set(series) if previous.get(name) != series.get(name)}
+                if not moved:
+                    break
+                affected = {filename for name in moved for filename in series.get(name, [])}
+                targets = [filename for filename in filenames if filename in affected]
+                more_diffs, more_rewritten = self._pass(targets, dry_run)
+                diffs.extend(more_diffs)
+                rewritten += more_rewritten
+                checked += len(targets)
+            self._finish()
+        
+        return {
+            "dry_run": dry_run,
+            "rules": rules,
+            "total": len(filenames),
+            "resumed": len(filenames) - len(pending),
+            "checked": checked,
+            "changed": len({diff["filename"] for diff in diffs}),
+            "action_items_changed": sum(len(diff["action_items"]) for diff in diffs),
+            "rewritten": rewritten,
+            "seconds": time.perf_counter() - started,
+            "diffs": diffs,
+        }
+
+
+def _shorten(text, limit=DIFF_DESCRIPTION_CHARS):
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def format_diff(diff):
+    """將一次會議的差異轉換為文字行"""
+    lines = [f"~ {diff['filename']}"]
+    for change in diff["action_items"]:
+        lines.append(
+            f"    {change['item_id']} {change['field']}: {change['old']!r} -> {change['new']!r}  "
+            f"({_shorten(change['description'])})"
+        )
+    for change in diff["efficiency_metrics"]:
+        lines.append(f"    efficiency_metrics.{change['name']}: {change['old']!r} -> {change['new']!r}")
+    return lines
+
+
+def main(argv=None):
+    """命令列入口：重新分析資料目錄中的所有會議記錄並輸出差異"""
+    parser = argparse.ArgumentParser(description="Re-classify action items and recompute efficiency metrics of stored meetings")
+    parser.add_argument("--data-folder", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'data'),
+                        help="meeting record folder (default: src/data)")
+    parser.add_argument("--workers", type=int, default=None, help="number of classifier processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="meetings per batch and checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint of an interrupted run")
+    parser.add_argument("--report", default=None, help="also write the report as JSON to this file")
+    args = parser.parse_args(argv)
+    
+    if not os.path.isdir(args.data_folder):
+        print(f"Data folder not found: {args.data_folder}")
+        return 1
+    store = MeetingStore(args.data_folder)
+    trend_analytics = TrendAnalytics(store)
+    reprocessor = Reprocessor(
+        store, ActionItemTracker(store), trend_analytics, meeting_rollup=MeetingRollup(store, trend_analytics),
+        transcript_cache=TranscriptCache(store), max_workers=args.workers, batch_size=args.batch_size,
+    )
+    report = reprocessor.run(dry_run=args.dry_run, restart=args.restart)
+    
+    for diff in report["diffs"]:
+        print("\n".join(format_diff(diff)))
+    verb = "would change" if report["dry_run"] else "changed"
+    resumed = f", {report['resumed']} already done" if report["resumed"] else ""
+    print(
+        f"{report['changed']}/{report['checked']} meeting records {verb} "
+        f"({report['action_items_changed']} action item fields{resumed}) in {report['seconds']:.2f}s"
+    )
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
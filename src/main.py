@@ -1,86 +1,341 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from flask import Flask, render_template, request, redirect, url_for, jsonify, stream_with_context, g
 import os
-import json
-import tempfile
 import sys
-import re
-from datetime import datetime
+import time
+import itertools
+import functools
+import uuid
+from datetime import date
 
 # 添加父目錄到 Python 路徑，以便導入會議資料結構模組
 try:
-    from meeting_data_structure import MeetingRecord, Topic, ActionItem, MeetingParser, EfficiencyAnalyzer
+    from meeting_data_structure import MeetingRecord, Topic, ActionItem, MeetingParser, EfficiencyAnalyzer, SectionCache
+    from meeting_store import MeetingStore, MeetingCache, MeetingSummary
+    from action_item_tracker import ActionItemTracker
+    from meeting_analytics import TrendAnalytics, DEFAULT_WINDOWS
+    from meeting_search import SearchIndex, DEFAULT_LIMIT as SEARCH_DEFAULT_LIMIT
+    from topic_index import TopicIndex, DEFAULT_MIN_MEETINGS, DEFAULT_LIMIT as TOPICS_DEFAULT_LIMIT
+    from batch_ingest import BatchIngestor, collect_uploads
+    from upload_jobs import JobQueue, QueueFullError, JOBS_FILENAME, JOB_STATUSES, JOB_DONE, JOB_FAILED, DEFAULT_WORKERS, DEFAULT_MAX_PENDING
+    from transcript_formats import TRANSCRIPT_EXTENSIONS, parse_transcript_stream
+    from meeting_codecs import DEFAULT_FORMAT
+    from page_cache import PageCache, make_etag
+    from perf_metrics import metrics, server_timing, TimedReader, UploadProfiler
+    from transcript_cache import TranscriptCache, file_transcript_key
+    from meeting_rollup import MeetingRollup, render_chart, CHARTS, PERIODS, DEFAULT_PERIOD, DEFAULT_ASSIGNEE_LIMIT
+    from lazy_loading import LazyService
 except ImportError:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from meeting_data_structure import MeetingRecord, Topic, ActionItem, MeetingParser, EfficiencyAnalyzer
+    from meeting_data_structure import MeetingRecord, Topic, ActionItem, MeetingParser, EfficiencyAnalyzer, SectionCache
+    from meeting_store import MeetingStore, MeetingCache, MeetingSummary
+    from action_item_tracker import ActionItemTracker
+    from meeting_analytics import TrendAnalytics, DEFAULT_WINDOWS
+    from meeting_search import SearchIndex, DEFAULT_LIMIT as SEARCH_DEFAULT_LIMIT
+    from topic_index import TopicIndex, DEFAULT_MIN_MEETINGS, DEFAULT_LIMIT as TOPICS_DEFAULT_LIMIT
+    from batch_ingest import BatchIngestor, collect_uploads
+    from upload_jobs import JobQueue, QueueFullError, JOBS_FILENAME, JOB_STATUSES, JOB_DONE, JOB_FAILED, DEFAULT_WORKERS, DEFAULT_MAX_PENDING
+    from transcript_formats import TRANSCRIPT_EXTENSIONS, parse_transcript_stream
+    from meeting_codecs import DEFAULT_FORMAT
+    from page_cache import PageCache, make_etag
+    from perf_metrics import metrics, server_timing, TimedReader, UploadProfiler
+    from transcript_cache import TranscriptCache, file_transcript_key
+    from meeting_rollup import MeetingRollup, render_chart, CHARTS, PERIODS, DEFAULT_PERIOD, DEFAULT_ASSIGNEE_LIMIT
+    from lazy_loading import LazyService
 
 app = Flask(__name__)
 
-# 確保上傳目錄存在
-UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
-
-# 確保資料儲存目錄存在
-DATA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
-if not os.path.exists(DATA_FOLDER):
-    os.makedirs(DATA_FOLDER)
+# 上傳目錄與資料儲存目錄，第一次使用時才建立
+UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+DATA_FOLDER = os.environ.get('DATA_FOLDER') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['DATA_FOLDER'] = DATA_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 限制上傳檔案大小為 16MB
+app.config['MEETING_CACHE_MAX_ENTRIES'] = int(os.environ.get('MEETING_CACHE_MAX_ENTRIES', 256))  # 會議記錄快取項目上限
+app.config['MEETING_CACHE_MAX_BYTES'] = int(os.environ.get('MEETING_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # 會議記錄快取位元組上限
+app.config['UPLOAD_WORKERS'] = int(os.environ.get('UPLOAD_WORKERS', DEFAULT_WORKERS))  # 背景處理上傳的執行緒數，0 表示在請求中直接處理
+app.config['UPLOAD_QUEUE_SIZE'] = int(os.environ.get('UPLOAD_QUEUE_SIZE', DEFAULT_MAX_PENDING))  # 最多同時排隊或處理中的上傳數
+app.config['PARSE_TIME_BUDGET'] = float(os.environ.get('PARSE_TIME_BUDGET', 30))  # 每個上傳檔案的解析時間上限（秒），0 表示不限制
+app.config['BATCH_MAX_WORKERS'] = int(os.environ.get('BATCH_MAX_WORKERS', 0)) or None  # 批次匯入的解析行程數，預設為 CPU 數
+app.config['MEETING_FORMAT'] = os.environ.get('MEETING_FORMAT', DEFAULT_FORMAT)  # 會議記錄檔案格式：json、json-compact、msgpack 或 binary
+app.config['PAGE_CACHE_MAX_ENTRIES'] = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', 64))  # 記憶體中保留的渲染頁面數
+app.config['CHART_CACHE_MAX_ENTRIES'] = int(os.environ.get('CHART_CACHE_MAX_ENTRIES', 16))  # 記憶體中保留的圖表數
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') != '0'  # 是否量測各階段耗時並提供 /metrics
+app.config['SERVER_TIMING'] = os.environ.get('SERVER_TIMING', '0') != '0'  # 是否在回應加上各階段耗時的 Server-Timing 標頭
+app.config['PROFILE_SLOWEST_UPLOADS'] = int(os.environ.get('PROFILE_SLOWEST_UPLOADS', 0))  # 保留最慢幾次上傳的剖析結果，0 表示不剖析
+app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get('PROFILE_SAMPLE_RATE', 1.0))  # 剖析上傳的抽樣比例
+app.config['SECTION_CACHE_MAX_ENTRIES'] = int(os.environ.get('SECTION_CACHE_MAX_ENTRIES', 4096))  # 快取的議題與工作事項區塊解析結果數，0 表示不快取
+
+app.config['LAZY_INIT'] = os.environ.get('LAZY_INIT', '1') != '0'  # 資料儲存與索引在第一次使用時才建立，0 表示匯入時全部建立
+
+# 各階段耗時的量測，停用時量測區塊不呼叫計時器
+metrics.enabled = app.config['METRICS_ENABLED']
+
+# 議題與工作事項區塊的解析結果，重新上傳修改過的逐字稿時未修改的段落不再解析
+if app.config['SECTION_CACHE_MAX_ENTRIES'] > 0:
+    MeetingParser.section_cache = SectionCache(max_entries=app.config['SECTION_CACHE_MAX_ENTRIES'])
+
+def ensure_folder(path):
+    """建立目錄（已存在時不做任何事）並回傳目錄路徑"""
+    os.makedirs(path, exist_ok=True)
+    return path
+
+# 以下的資料儲存、索引與快取都在第一次使用時才開啟，匯入本模組時不存取磁碟；
+# 無伺服器部署冷啟動時只有請求實際用到的服務會建立，例如 /api/search 不需開啟摘要彙總
+
+# 會議記錄儲存與索引，第一次啟動時會匯入既有的會議記錄
+meeting_store = LazyService(lambda: MeetingStore(ensure_folder(DATA_FOLDER), cache=MeetingCache(
+    max_entries=app.config['MEETING_CACHE_MAX_ENTRIES'],
+    max_bytes=app.config['MEETING_CACHE_MAX_BYTES'],
+), codec=app.config['MEETING_FORMAT']), 'meeting_store')
+
+# 跨會議的工作事項追蹤，第一次啟動時會由既有的會議記錄建立
+action_item_tracker = LazyService(lambda: ActionItemTracker(meeting_store.resolve()), 'action_item_tracker')
+
+# 會議趨勢的彙總資料，每次儲存時增量更新
+trend_analytics = LazyService(lambda: TrendAnalytics(meeting_store.resolve()), 'trend_analytics')
+
+# 全文檢索索引，每次儲存時只更新該會議
+search_index = LazyService(lambda: SearchIndex(meeting_store.resolve()), 'search_index')
+
+# 相近議題索引，用於找出連續多次會議重複出現的議題
+topic_index = LazyService(lambda: TopicIndex(meeting_store.resolve(), trend_analytics.resolve()), 'topic_index')
+
+# 每次會議一列的欄式摘要，首頁的總覽與圖表不需讀取會議記錄；pandas 在第一次計算總覽時才載入
+meeting_rollup = LazyService(lambda: MeetingRollup(meeting_store.resolve(), trend_analytics.resolve()), 'meeting_rollup')
+
+# 已儲存逐字稿的內容雜湊值，內容相同的逐字稿再次上傳時直接回傳既有的會議記錄
+transcript_cache = LazyService(lambda: TranscriptCache(meeting_store.resolve()), 'transcript_cache')
 
-# 允許的檔案類型
-ALLOWED_EXTENSIONS = {'txt'}
+# 渲染後的首頁與會議記錄頁面，以內容雜湊值作為 ETag
+page_cache = LazyService(lambda: PageCache(DATA_FOLDER, max_entries=app.config['PAGE_CACHE_MAX_ENTRIES']), 'page_cache')
+
+# 伺服器產生的圖表（PNG），以摘要彙總的版本作為 ETag，有新的會議時才重新繪製
+chart_cache = LazyService(lambda: PageCache(
+    DATA_FOLDER, max_entries=app.config['CHART_CACHE_MAX_ENTRIES'], folder='charts', suffix='.png',
+), 'chart_cache')
+
+# 最慢幾次上傳的剖析結果
+upload_profiler = LazyService(lambda: UploadProfiler(
+    DATA_FOLDER, keep=app.config['PROFILE_SLOWEST_UPLOADS'], sample_rate=app.config['PROFILE_SAMPLE_RATE'],
+), 'upload_profiler')
+
+# 批次匯入，以多個行程平行解析逐字稿
+batch_ingestor = LazyService(lambda: BatchIngestor(
+    meeting_store.resolve(), action_item_tracker.resolve(), trend_analytics.resolve(),
+    max_workers=app.config['BATCH_MAX_WORKERS'], time_budget=app.config['PARSE_TIME_BUDGET'],
+    search_index=search_index.resolve(), topic_index=topic_index.resolve(),
+    transcript_cache=transcript_cache.resolve(), meeting_rollup=meeting_rollup.resolve(),
+), 'batch_ingestor')
+
+@functools.lru_cache(maxsize=None)
+def template_version(name):
+    """模板內容的雜湊值，模板更新後 ETag 隨之改變；第一次回應使用該模板的頁面時才讀取"""
+    return make_etag(app.jinja_env.loader.get_source(app.jinja_env, name)[0])
+
+# 允許的檔案類型：會議紀錄文字檔、WebVTT/SRT 字幕與 Teams 逐字稿
+ALLOWED_EXTENSIONS = {extension.lstrip('.') for extension in TRANSCRIPT_EXTENSIONS}
+
+# /api/meetings 的篩選條件與可投影欄位，摘要欄位不需讀取完整的會議記錄
+MEETING_FILTERS = ('date_from', 'date_to', 'participant', 'assignee', 'status', 'title')
+MEETING_FIELDS = ('filename', 'title', 'date', 'time', 'participants', 'topics', 'action_items', 'efficiency_metrics')
+SUMMARY_FIELDS = frozenset(MeetingSummary._fields)
 
 def allowed_file(filename):
     """檢查檔案類型是否允許上傳"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def save_meeting_record(meeting):
-    """儲存會議記錄到 JSON 檔案"""
-    # 使用會議日期和標題作為檔案名稱
-    date_str = re.sub(r'[^\w]', '_', meeting.date) if meeting.date else datetime.now().strftime('%Y%m%d')
-    title_str = re.sub(r'[^\w]', '_', meeting.title)[:30] if meeting.title else 'untitled'
-    filename = f"{date_str}_{title_str}.json"
+def serialize_json(data):
+    """將資料序列化為與 jsonify 相同格式的 bytes"""
+    return (app.json.dumps(data, separators=(",", ":")) + "\n").encode('utf-8')
+
+def save_meeting_record(meeting, stats=None):
+    """儲存會議記錄並更新索引、工作事項追蹤、趨勢彙總、全文檢索、相近議題索引與摘要彙總"""
+    with metrics.stage("save.store"):
+        filename = meeting_store.save(meeting)
+    with metrics.stage("save.action_items"):
+        action_item_tracker.record_meeting(filename, meeting)
+    with metrics.stage("save.trends"):
+        trend_analytics.record_meeting(filename, meeting, stats)
+    with metrics.stage("save.search"):
+        search_index.record_meeting(filename, meeting)
+    with metrics.stage("save.topics"):
+        topic_index.record_meeting(filename, meeting)
+    with metrics.stage("save.rollup"):
+        meeting_rollup.record_meeting(filename, meeting, stats)
+    page_cache.invalidate(f"meeting-{filename}")
+    return filename
+
+def cached_page(key, etag, template, load_context):
+    """以頁面快取回應，load_context 只在需要渲染時呼叫，回傳 None 時本函式也回傳 None
     
-    filepath = os.path.join(app.config['DATA_FOLDER'], filename)
+    If-None-Match 與 ETag 相符時直接返回 304，不讀取快取也不渲染。
+    """
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        body = page_cache.get(key, etag)
+        if body is None:
+            context = load_context()
+            if context is None:
+                return None
+            with metrics.stage("render"):
+                body = render_template(template, **context).encode('utf-8')
+            page_cache.put(key, etag, body)
+        response = app.response_class(body, mimetype='text/html')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'  # 每次使用前都向伺服器確認
+    return response
+
+def load_previous_meetings():
+    """載入之前的會議記錄檢視，按日期排序，最新的在前
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(meeting.to_dict(), f, ensure_ascii=False, indent=2)
+    摘要欄位取自索引，只有在存取議題或工作事項時才會讀取該次會議的完整記錄。
+    """
+    with metrics.stage("load_previous_meetings"):
+        return list(meeting_store.iter_views())
+
+@app.before_request
+def start_request_timing():
+    """記錄請求開始的時間；啟用 Server-Timing 時同時開始記錄各階段耗時"""
+    if metrics.enabled:
+        g.request_started = time.perf_counter()
+        if app.config['SERVER_TIMING']:
+            g.request_stages = metrics.start_trace()
+
+@app.after_request
+def finish_request_timing(response):
+    """記錄請求的耗時與狀態碼；啟用 Server-Timing 時加上各階段耗時的標頭"""
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.endpoint or 'unknown'
+    metrics.histogram('http_request_seconds', elapsed, (('endpoint', endpoint),))
+    metrics.count('http_responses_total', labels=(('endpoint', endpoint), ('status', str(response.status_code))))
     
-    return filename
+    stages = g.get('request_stages')
+    if stages is not None:
+        response.headers['Server-Timing'] = server_timing(stages + [('total', elapsed)])
+    return response
 
-def load_previous_meetings():
-    """載入之前的會議記錄"""
-    meetings = []
-    
-    if os.path.exists(app.config['DATA_FOLDER']):
-        for filename in os.listdir(app.config['DATA_FOLDER']):
-            if filename.endswith('.json'):
-                filepath = os.path.join(app.config['DATA_FOLDER'], filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        meeting_data = json.load(f)
-                        meeting = MeetingRecord.from_dict(meeting_data)
-                        meeting.filename = filename  # 添加檔案名稱屬性，用於前端連結
-                        meetings.append(meeting)
-                except Exception as e:
-                    print(f"Error loading meeting record {filename}: {e}")
-    
-    # 按日期排序，最新的在前
-    meetings.sort(key=lambda m: m.date if m.date else "", reverse=True)
-    
-    return meetings
+@app.teardown_request
+def finish_request_trace(exc):
+    """結束請求的各階段耗時記錄，請求發生例外時也會執行"""
+    stages = g.pop('request_stages', None)
+    if stages is not None:
+        metrics.finish_trace(stages)
 
 @app.route('/')
 def index():
-    """首頁，顯示上傳表單和之前的會議記錄列表"""
-    previous_meetings = load_previous_meetings()
-    return render_template('index.html', previous_meetings=previous_meetings)
+    """首頁，顯示上傳表單、整體總覽和之前的會議記錄列表，會議列表未變更時使用快取的頁面"""
+    etag = make_etag(meeting_store.signature(), meeting_rollup.signature(), template_version('index.html'))
+    return cached_page('index', etag, 'index.html', lambda: {
+        "previous_meetings": load_previous_meetings(),
+        "overview": load_overview(),
+    })
+
+def load_overview():
+    """由摘要彙總取得整體總覽，不讀取任何會議記錄"""
+    with metrics.stage("load_overview"):
+        return meeting_rollup.overview()
+
+def process_upload(path, name=""):
+    """背景工作：解析已存到磁碟的上傳檔案、進行效率分析並儲存，回傳會議記錄檔名
+    
+    name 為上傳時的檔名，用於判斷格式，字幕與 Teams 逐字稿也以它作為會議標題與日期。
+    啟用剖析時依抽樣比例以 cProfile 剖析，保留最慢的幾次。
+    """
+    try:
+        with metrics.stage("upload"):
+            result = upload_profiler.run(name or os.path.basename(path), analyze_upload, path, name)
+    except Exception:
+        metrics.count("meeting_uploads_total", labels=(("result", "failed"),))
+        raise
+    metrics.count("meeting_uploads_total", labels=(("result", "duplicate" if result.get("duplicate") else "done"),))
+    return result
+
+def find_duplicate_upload(path, name):
+    """回傳 (上傳檔案的 transcript_key, 內容相同的既有會議記錄檔名)，沒有相同的會議記錄時檔名為 None"""
+    with metrics.stage("dedup"):
+        key = file_transcript_key(path, name)
+        existing = transcript_cache.lookup(key)
+    return key, existing
+
+def analyze_upload(path, name):
+    """解析上傳檔案、與前次會議比較並儲存，結束後刪除上傳檔案
+    
+    內容與已儲存的逐字稿相同時不解析，直接回傳既有的會議記錄，結果中 duplicate 為 True。
+    """
+    try:
+        # 排隊期間可能已有相同內容的上傳處理完成
+        key, existing = find_duplicate_upload(path, name or path)
+        if existing is not None:
+            return {"filename": existing, "warnings": [], "duplicate": True}
+        
+        with open(path, 'rb') as f:
+            # 逐段解析會議記錄或字幕，不讀入整份內容；超過時間上限時保留已解析的部分
+            reader = TimedReader(f) if metrics.enabled else f
+            with metrics.stage("parse"):
+                meeting = parse_transcript_stream(reader, name or path, app.config['PARSE_TIME_BUDGET'])
+        if metrics.enabled:
+            metrics.observe("parse.read", reader.seconds)
+            metrics.count("meeting_parsed_bytes_total", reader.bytes)
+            metrics.count("meeting_topics_extracted_total", len(meeting.topics))
+            metrics.count("meeting_action_items_extracted_total", len(meeting.action_items))
+        
+        # 與同一系列的前一次會議比較進行效率分析，前次會議的統計直接取自趨勢彙總，不需重新讀取
+        with metrics.stage("analyze"):
+            stats = EfficiencyAnalyzer.summarize(meeting)
+            previous_stats = trend_analytics.previous_stats(meeting)
+            if previous_stats:
+                meeting.efficiency_metrics = EfficiencyAnalyzer.compare(stats, previous_stats)
+        
+        # 儲存會議記錄；超過時間上限只取得部分結果時不記錄雜湊值，重新上傳時會再解析
+        filename = save_meeting_record(meeting, stats)
+        # 補登較舊的會議時，之後的會議改與它比較
+        for following in batch_ingestor.refresh_successors([filename]):
+            page_cache.invalidate(f"meeting-{following}")
+        if not meeting.warnings:
+            transcript_cache.remember(key, filename)
+        return {"filename": filename, "warnings": meeting.warnings}
+    finally:
+        os.remove(path)
+
+def start_upload_jobs():
+    """建立上傳工作佇列並啟動背景執行緒"""
+    queue = JobQueue(
+        ensure_folder(DATA_FOLDER), process_upload,
+        workers=app.config['UPLOAD_WORKERS'], max_pending=app.config['UPLOAD_QUEUE_SIZE'],
+    )
+    queue.start()
+    return queue
+
+# 上傳工作佇列，解析與分析在背景執行緒中進行，第一次上傳或查詢工作時建立
+upload_jobs = LazyService(start_upload_jobs, 'upload_jobs')
+
+SERVICES = (
+    meeting_store, action_item_tracker, trend_analytics, search_index, topic_index, meeting_rollup,
+    transcript_cache, page_cache, chart_cache, upload_profiler, batch_ingestor, upload_jobs,
+)
+
+if not app.config['LAZY_INIT']:
+    for service in SERVICES:
+        service.resolve()
+elif os.path.exists(os.path.join(DATA_FOLDER, JOBS_FILENAME)):
+    # 佇列中可能有重新啟動前未完成的工作，立即建立佇列繼續處理
+    upload_jobs.resolve()
+
+def job_response(job):
+    """工作狀態的 JSON 內容，完成時附上會議記錄的網址"""
+    data = dict(job, url=url_for('view_job', job_id=job['id']))
+    if job['status'] == JOB_DONE:
+        data['meeting_url'] = url_for('view_meeting', filename=job['result']['filename'])
+    return data
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    """處理檔案上傳"""
+    """處理檔案上傳：存到磁碟後登記背景工作，立即重定向到工作狀態頁面"""
     if 'file' not in request.files:
         return redirect(url_for('index'))
     
@@ -90,68 +345,463 @@ def upload_file():
         return redirect(url_for('index'))
     
     if file and allowed_file(file.filename):
-        # 建立臨時檔案
-        temp_file = tempfile.NamedTemporaryFile(delete=False)
-        file.save(temp_file.name)
-        
-        # 讀取檔案內容
-        with open(temp_file.name, 'r', encoding='utf-8', errors='ignore') as f:
-            file_content = f.read()
+        extension = file.filename.rsplit('.', 1)[1].lower()
+        path = os.path.join(ensure_folder(UPLOAD_FOLDER), f"{uuid.uuid4().hex}.{extension}")
+        with metrics.stage("upload.save"):
+            file.save(path)
         
-        # 解析會議記錄
-        meeting = MeetingParser.parse_text_file(file_content)
+        # 內容與已儲存的逐字稿相同時不建立工作，直接回應既有的會議記錄
+        _, existing = find_duplicate_upload(path, file.filename)
+        if existing is not None:
+            os.remove(path)
+            metrics.count("meeting_uploads_total", labels=(("result", "duplicate"),))
+            if request.accept_mimetypes.best == 'application/json':
+                return jsonify({
+                    "duplicate": True,
+                    "filename": existing,
+                    "meeting_url": url_for('view_meeting', filename=existing),
+                })
+            return redirect(url_for('view_meeting', filename=existing))
         
-        # 載入之前的會議記錄，用於效率分析
-        previous_meetings = load_previous_meetings()
-        if previous_meetings:
-            # 使用最近的一次會議進行效率分析
-            previous_meeting = previous_meetings[0]
-            meeting.previous_meeting = previous_meeting
-            meeting.efficiency_metrics = EfficiencyAnalyzer.analyze(meeting, previous_meeting)
+        try:
+            with metrics.stage("upload.submit"):
+                job_id = upload_jobs.submit(path, name=file.filename)
+        except QueueFullError:
+            os.remove(path)
+            response = jsonify({"error": "Upload queue is full, please retry later"})
+            response.headers['Retry-After'] = '5'
+            return response, 429
         
-        # 儲存會議記錄
-        filename = save_meeting_record(meeting)
-        
-        # 刪除臨時檔案
-        os.unlink(temp_file.name)
-        
-        # 重定向到會議記錄頁面
-        return redirect(url_for('view_meeting', filename=filename))
+        # API 呼叫端取得工作 ID，瀏覽器則重定向到工作狀態頁面
+        if request.accept_mimetypes.best == 'application/json':
+            response = jsonify(job_response(upload_jobs.get(job_id)))
+            response.headers['Location'] = url_for('api_job', job_id=job_id)
+            return response, 202
+        return redirect(url_for('view_job', job_id=job_id))
     
     return redirect(url_for('index'))
 
+@app.route('/jobs/<job_id>')
+def view_job(job_id):
+    """顯示上傳工作的處理狀態，完成後重定向到會議記錄頁面"""
+    job = upload_jobs.get(job_id)
+    
+    if job is None:
+        return redirect(url_for('index'))
+    if job['status'] == JOB_DONE:
+        return redirect(url_for('view_meeting', filename=job['result']['filename']))
+    
+    return render_template('job.html', job=job, failed=job['status'] == JOB_FAILED)
+
+@app.route('/api/jobs/<job_id>')
+def api_job(job_id):
+    """API 端點，返回上傳工作的處理狀態"""
+    job = upload_jobs.get(job_id)
+    
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    return jsonify(job_response(job))
+
+@app.route('/api/jobs')
+def api_jobs():
+    """API 端點，返回上傳工作佇列的狀態統計"""
+    return jsonify(upload_jobs.stats())
+
+@app.route('/api/upload/batch', methods=['POST'])
+def api_batch_upload():
+    """API 端點，批次上傳多個逐字稿或含逐字稿的 zip 檔，返回每個檔案的結果與整體吞吐量"""
+    files = [file for file in request.files.getlist('file') if file.filename]
+    if not files:
+        return jsonify({"error": "No files uploaded"}), 400
+    
+    sources, rejected = collect_uploads(files)
+    return jsonify(batch_ingestor.ingest(sources, rejected))
+
 @app.route('/meeting/<filename>')
 def view_meeting(filename):
-    """顯示會議記錄詳情"""
-    filepath = os.path.join(app.config['DATA_FOLDER'], filename)
+    """顯示會議記錄詳情，會議記錄未改寫時使用快取的頁面"""
+    digest = meeting_store.content_hash(filename)
     
-    if not os.path.exists(filepath):
-        return redirect(url_for('index'))
+    if digest is not None:
+        def load_context():
+            meeting = meeting_store.load(filename)
+            return {"meeting": meeting} if meeting is not None else None
+        
+        etag = make_etag(digest, template_version('meeting.html'))
+        response = cached_page(f"meeting-{filename}", etag, 'meeting.html', load_context)
+        if response is not None:
+            return response
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        meeting_data = json.load(f)
-        meeting = MeetingRecord.from_dict(meeting_data)
+    return redirect(url_for('index'))
+
+def project_meeting(summary, fields):
+    """依欄位投影會議記錄，fields 為 None 時返回完整的會議記錄"""
+    if fields and SUMMARY_FIELDS.issuperset(fields):
+        return {field: getattr(summary, field) for field in fields}
     
-    return render_template('meeting.html', meeting=meeting)
+    meeting = meeting_store.load(summary.filename)
+    if meeting is None:
+        return None
+    data = meeting.to_dict()
+    if not fields:
+        return data
+    data['filename'] = summary.filename
+    return {field: data[field] for field in fields}
 
 @app.route('/api/meetings')
 def api_meetings():
-    """API 端點，返回所有會議記錄"""
-    meetings = load_previous_meetings()
-    return jsonify([meeting.to_dict() for meeting in meetings])
+    """API 端點，依日期由新到舊返回會議記錄
+    
+    查詢參數：
+    - limit、cursor：分頁，下一頁的游標放在 X-Next-Cursor 標頭
+    - date_from、date_to、participant、assignee、status、title：篩選條件
+    - fields：以逗號分隔的欄位，只返回這些欄位
+    - format=ndjson：每行一筆會議記錄
+    會議記錄逐筆序列化後串流返回，伺服器不會一次載入所有會議記錄。
+    """
+    filters = {key: request.args[key] for key in MEETING_FILTERS if request.args.get(key)}
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()] or None
+    if fields and not set(fields).issubset(MEETING_FIELDS):
+        return jsonify({"error": f"Unknown fields: {', '.join(sorted(set(fields) - set(MEETING_FIELDS)))}"}), 400
+    ndjson = request.args.get('format') == 'ndjson'
+    
+    try:
+        limit = int(request.args['limit']) if request.args.get('limit') else None
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be positive")
+        
+        # 先讀取第一頁，讓錯誤的游標或日期在開始串流前就回報
+        summaries, next_cursor = meeting_store.query_meetings(
+            limit=limit or 200, cursor=request.args.get('cursor'), **filters
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if limit is None:
+        if next_cursor:
+            summaries = itertools.chain(summaries, meeting_store.iter_meetings(cursor=next_cursor, **filters))
+        next_cursor = None
+    
+    def generate():
+        if not ndjson:
+            yield '['
+        first = True
+        for summary in summaries:
+            data = project_meeting(summary, fields)
+            if data is None:
+                continue
+            text = app.json.dumps(data, separators=(",", ":"))
+            if ndjson:
+                yield text + '\n'
+            else:
+                yield text if first else ',' + text
+            first = False
+        if not ndjson:
+            yield ']\n'
+    
+    response = app.response_class(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson' if ndjson else 'application/json',
+    )
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        next_url = url_for('api_meetings', **{**request.args.to_dict(), 'cursor': next_cursor})
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+    return response
 
 @app.route('/api/meeting/<filename>')
 def api_meeting(filename):
     """API 端點，返回特定會議記錄"""
-    filepath = os.path.join(app.config['DATA_FOLDER'], filename)
+    body = meeting_store.load_response(filename, serialize_json)
     
-    if not os.path.exists(filepath):
+    if body is None:
         return jsonify({"error": "Meeting not found"}), 404
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        meeting_data = json.load(f)
+    return app.response_class(body, mimetype='application/json')
+
+@app.route('/api/action-items')
+def api_action_items():
+    """API 端點，查詢跨會議追蹤的工作事項
+    
+    查詢參數：
+    - assignee：負責人
+    - status：狀態，可用逗號分隔多個，與 effective_status 比對
+    - open=1：只返回尚未完成的工作事項
+    - min_delayed：最少的延遲次數，例如 3 表示延遲超過兩次
+    - limit、offset：分頁，limit 預設 100
+    - as_of：計算 effective_status 的日期（YYYY-MM-DD），預設為今天
+    每筆工作事項的 due_on 為 ISO 格式的截止日期，effective_status 在尚未完成且已過截止日期時為 delayed。
+    """
+    statuses = [status.strip() for status in request.args.get('status', '').split(',') if status.strip()]
+    try:
+        as_of = requested_date()
+        min_delayed = int(request.args['min_delayed']) if request.args.get('min_delayed') else None
+        limit = int(request.args.get('limit') or 100)
+        offset = int(request.args.get('offset') or 0)
+        if limit < 1 or offset < 0:
+            raise ValueError("limit must be positive and offset must not be negative")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    items = action_item_tracker.query(
+        assignee=request.args.get('assignee'),
+        statuses=statuses,
+        open_only=request.args.get('open') in ('1', 'true'),
+        min_delayed=min_delayed,
+        limit=limit,
+        offset=offset,
+        as_of=as_of,
+    )
+    return jsonify(items)
+
+def requested_date(name='as_of'):
+    """查詢參數中的日期（YYYY-MM-DD），省略時為今天，格式錯誤時拋出 ValueError"""
+    value = request.args.get(name)
+    return date.fromisoformat(value) if value else date.today()
+
+@app.route('/api/action-items/overdue')
+def api_overdue_action_items():
+    """API 端點，返回尚未完成且已過截止日期的工作事項，依截止日期由早到晚排序
+    
+    查詢參數：
+    - as_of：以此日期判斷是否逾期（YYYY-MM-DD），預設為今天
+    - assignee：負責人
+    - limit、offset：分頁，limit 預設 100
+    """
+    try:
+        as_of = requested_date()
+        limit = int(request.args.get('limit') or 100)
+        offset = int(request.args.get('offset') or 0)
+        if limit < 1 or offset < 0:
+            raise ValueError("limit must be positive and offset must not be negative")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    items = action_item_tracker.overdue(as_of=as_of, assignee=request.args.get('assignee'), limit=limit, offset=offset)
+    return jsonify({"as_of": as_of.isoformat(), "items": items})
+
+@app.route('/api/action-items/this-week')
+def api_action_items_this_week():
+    """API 端點，返回本週（週一至週日）到期的工作事項，依負責人分組
+    
+    查詢參數：
+    - as_of：以此日期所在的週計算（YYYY-MM-DD），預設為今天
+    - assignee：只返回此負責人的工作事項
+    - all=1：包含已完成的工作事項
+    """
+    try:
+        as_of = requested_date()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    start, end, assignees = action_item_tracker.due_this_week(
+        as_of=as_of, assignee=request.args.get('assignee'), open_only=request.args.get('all') not in ('1', 'true'),
+    )
+    return jsonify({"week_start": start.isoformat(), "week_end": end.isoformat(), "assignees": assignees})
+
+@app.route('/api/action-items/<fingerprint>')
+def api_action_item(fingerprint):
+    """API 端點，返回單一工作事項及其在各次會議中的紀錄
+    
+    查詢參數：
+    - as_of：計算 effective_status 的日期（YYYY-MM-DD），預設為今天
+    """
+    try:
+        as_of = requested_date()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    item = action_item_tracker.get(fingerprint, as_of=as_of)
     
-    return jsonify(meeting_data)
+    if item is None:
+        return jsonify({"error": "Action item not found"}), 404
+    
+    return jsonify(item)
+
+@app.route('/api/trends')
+def api_trends():
+    """API 端點，返回各會議系列最近幾次會議的趨勢指標
+    
+    查詢參數：
+    - series：系列名稱，省略時返回所有系列
+    - window：滾動視窗大小，可用逗號分隔多個，預設為 4,12,52
+    """
+    try:
+        windows = tuple(int(size) for size in request.args.get('window', '').split(',') if size.strip()) or DEFAULT_WINDOWS
+        if min(windows) < 1:
+            raise ValueError("window must be positive")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(trend_analytics.trends(series=request.args.get('series'), windows=windows))
+
+@app.route('/api/dashboard')
+def api_dashboard():
+    """API 端點，返回所有會議的總覽：各狀態工作事項數、各期間完成率、各系列與負責人工作量
+    
+    查詢參數：
+    - period：趨勢的期間，W、M、Q 或 Y，預設為 M
+    - assignees：列出的負責人數，預設為 15
+    """
+    period = request.args.get('period', DEFAULT_PERIOD)
+    try:
+        assignee_limit = int(request.args.get('assignees', DEFAULT_ASSIGNEE_LIMIT))
+        if period not in PERIODS:
+            raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+        if assignee_limit < 1:
+            raise ValueError("assignees must be positive")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(meeting_rollup.overview(period, assignee_limit))
+
+@app.route('/charts/<name>.png')
+def chart(name):
+    """伺服器產生的圖表，摘要彙總未變更時使用快取的圖片
+    
+    name 為 completion（各期間完成率與延遲率）或 assignees（負責人工作量），
+    查詢參數 period 與 /api/dashboard 相同。
+    """
+    period = request.args.get('period', DEFAULT_PERIOD)
+    if name not in CHARTS or period not in PERIODS:
+        return jsonify({"error": "Chart not found"}), 404
+    
+    etag = make_etag(meeting_rollup.signature(), name, period)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        key = f"chart-{name}-{period}"
+        body = chart_cache.get(key, etag)
+        if body is None:
+            with metrics.stage("render.chart"):
+                body = render_chart(meeting_rollup, name, period)
+            chart_cache.put(key, etag, body)
+        response = app.response_class(body, mimetype='image/png')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/topics/chains')
+def api_topic_chains():
+    """API 端點，返回同一系列中連續多次會議都出現的議題（相近的標題視為同一議題）
+    
+    查詢參數：
+    - series：系列名稱，省略時返回所有系列
+    - min_meetings：至少連續出現的會議數，預設為 3
+    - undecided=1：只返回期間沒有任何決策的議題
+    """
+    try:
+        min_meetings = int(request.args.get('min_meetings') or DEFAULT_MIN_MEETINGS)
+        if min_meetings < 2:
+            raise ValueError("min_meetings must be at least 2")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    chains = topic_index.chains(
+        series=request.args.get('series'), min_meetings=min_meetings,
+        undecided_only=request.args.get('undecided') == '1',
+    )
+    for chain in chains:
+        chain['urls'] = [url_for('view_meeting', filename=filename) for filename in chain['filenames']]
+    return jsonify(chains)
+
+@app.route('/api/topics/similar')
+def api_similar_topics():
+    """API 端點，返回與議題標題相近的歷史議題
+    
+    查詢參數：
+    - q：議題標題
+    - limit：返回的議題數，預設為 10
+    """
+    query = request.args.get('q', '').strip()
+    try:
+        if not query:
+            raise ValueError("q is required")
+        limit = int(request.args.get('limit') or TOPICS_DEFAULT_LIMIT)
+        if limit < 1:
+            raise ValueError("limit must be positive")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    topics = [topic._asdict() for topic in topic_index.similar(query, limit=limit)]
+    for topic in topics:
+        topic['url'] = url_for('view_meeting', filename=topic['filename'])
+    return jsonify(topics)
+
+@app.route('/api/search')
+def api_search():
+    """API 端點，全文檢索會議記錄
+    
+    查詢參數：
+    - q：查詢字串，中文以相鄰兩字比對，所有詞都需出現
+    - limit、offset：分頁，limit 預設 20
+    返回依相關程度排序的會議，每筆附上符合處的摘錄與位置。
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Missing query parameter q"}), 400
+    try:
+        limit = int(request.args.get('limit') or SEARCH_DEFAULT_LIMIT)
+        offset = int(request.args.get('offset') or 0)
+        if limit < 1 or offset < 0:
+            raise ValueError("limit must be positive and offset must not be negative")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    results = search_index.search(query, limit=limit, offset=offset)
+    for result in results['results']:
+        result['url'] = url_for('view_meeting', filename=result['filename'])
+    return jsonify(dict(results, query=query))
+
+def cache_metrics():
+    """會議記錄、頁面與圖表快取的命中統計，供 /metrics 輸出；尚未建立的快取與工作佇列不列出，也不會因此建立"""
+    caches = [(name, cache.stats()) for name, cache in (('page', page_cache), ('chart', chart_cache)) if cache.initialized]
+    if meeting_store.initialized:
+        caches.insert(0, ('meeting', meeting_store.cache.stats()))
+    collected = [
+        ('meeting_cache_hits_total', 'counter', [((('cache', name),), stats['hits']) for name, stats in caches]),
+        ('meeting_cache_misses_total', 'counter', [((('cache', name),), stats['misses']) for name, stats in caches]),
+        ('meeting_cache_entries', 'gauge', [((('cache', name),), stats['entries']) for name, stats in caches]),
+    ]
+    if upload_jobs.initialized:
+        jobs = upload_jobs.stats()
+        collected.append(('upload_jobs', 'gauge', [((('status', status),), jobs[status]) for status in JOB_STATUSES]))
+    return collected + section_cache_metrics()
+
+def section_cache_metrics():
+    """議題與工作事項區塊解析結果快取的命中統計"""
+    if MeetingParser.section_cache is None:
+        return []
+    stats = MeetingParser.section_cache.stats()
+    return [
+        ('meeting_section_cache_hits_total', 'counter', [((), stats['hits'])]),
+        ('meeting_section_cache_misses_total', 'counter', [((), stats['misses'])]),
+        ('meeting_section_cache_entries', 'gauge', [((), stats['entries'])]),
+    ]
+
+metrics.collectors.append(cache_metrics)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus 文字格式的各階段耗時直方圖、計數器與快取命中統計"""
+    if not metrics.enabled:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/profiles')
+def api_profiles():
+    """API 端點，返回保存的最慢幾次上傳的剖析結果"""
+    return jsonify({
+        "enabled": upload_profiler.keep > 0,
+        "sample_rate": upload_profiler.sample_rate,
+        "profiles": upload_profiler.slowest(),
+    })
+
+@app.route('/api/cache-stats')
+def api_cache_stats():
+    """API 端點，返回會議記錄快取的命中統計"""
+    return jsonify(meeting_store.cache.stats())
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=int(os.environ.get('PORT', 8080)))
@@ -0,0 +1,277 @@
+"""
+跨會議的相近議題索引
+每個議題的文字（標題，標題太短時加上描述）切成字元二字組並計算 MinHash 簽章，
+以 LSH 分段存入 SQLite：查詢時只比對與它至少有一段相同的議題，不需走訪所有歷史議題。
+相近的議題歸入同一個議題串，據此找出同一系列中連續多次會議都出現、卻沒有做出決策的議題
+"""
+
+import os
+import random
+import hashlib
+import sqlite3
+from collections import namedtuple
+from contextlib import contextmanager
+
+from meeting_data_structure import TOPIC_SIMILARITY, TOPIC_MIN_SHINGLES, topic_shingles, topic_similarity, date_sort_key
+
+
+TOPICS_FILENAME = "topics.sqlite3"  # 議題索引檔名，與會議記錄放在同一個目錄
+TOPICS_VERSION = 1  # 索引結構版本，記錄於 PRAGMA user_version
+NUM_PERM = 64  # MinHash 簽章長度
+BANDS = 32  # LSH 分段數，每段 NUM_PERM // BANDS 個值；Jaccard 約 0.3 以上（短標題被較長的標題包含）的議題很可能至少有一段相同
+BUCKET_CANDIDATES = 32  # 每段最多取出的候選議題數（最新加入者優先），經常重複的議題不會讓查詢變慢
+DEFAULT_MIN_MEETINGS = 3  # 議題串至少連續出現的會議數
+DEFAULT_LIMIT = 10  # similar 預設返回的議題數
+
+_ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+# 固定種子的雜湊參數，索引重新開啟後簽章不變
+_random = random.Random(20240305)
+_PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+del _random
+
+_TABLES = ("topics", "topic_buckets")
+_SCHEMA = (
+    # 每次會議的每個議題
+    """
+    CREATE TABLE IF NOT EXISTS topics (
+        topic_key INTEGER PRIMARY KEY,
+        filename TEXT NOT NULL,
+        topic_id TEXT NOT NULL,
+        sort_date TEXT NOT NULL,
+        title TEXT NOT NULL,
+        shingles TEXT NOT NULL,
+        decided INTEGER NOT NULL,
+        thread INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS topics_by_meeting ON topics (filename)",
+    "CREATE INDEX IF NOT EXISTS topics_by_thread ON topics (thread)",
+    # LSH 分段：同一段雜湊值相同的議題為候選
+    """
+    CREATE TABLE IF NOT EXISTS topic_buckets (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        topic_key INTEGER NOT NULL,
+        PRIMARY KEY (band, bucket, topic_key)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS buckets_by_topic ON topic_buckets (topic_key)",
+)
+
+# 與查詢相近的歷史議題
+SimilarTopic = namedtuple("SimilarTopic", ["filename", "topic_id", "title", "date", "similarity", "thread"])
+
+
+def topic_text_shingles(title, description=""):
+    """議題用於比對的二字組：標題的二字組太少（例如「其他」）時加上描述"""
+    shingles = topic_shingles(title)
+    if len(shingles) < TOPIC_MIN_SHINGLES:
+        shingles |= topic_shingles(description)
+    return shingles
+
+
+def minhash(shingles):
+    """回傳二字組集合的 MinHash 簽章（NUM_PERM 個整數）"""
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def lsh_buckets(signature):
+    """回傳各段的 (段號, 雜湊值)；整數 tuple 的 hash 在不同行程間相同"""
+    return [(band, hash(tuple(signature[band * _ROWS:(band + 1) * _ROWS]))) for band in range(BANDS)]
+
+
+class TopicIndex:
+    """相近議題的 LSH 索引與議題串
+    
+    新增議題時以 LSH 找出候選並以實際的二字組相似度確認，加入最相近議題所在的議題串，
+    沒有相近議題時自成一串。議題串的連續出現次數依 TrendAnalytics 的系列與日期順序計算。
+    第一次開啟時會由 MeetingStore 中既有的會議記錄依日期順序一次建立索引。
+    """
+    
+    def __init__(self, meeting_store, trend_analytics):
+        self.meeting_store = meeting_store
+        self.trend_analytics = trend_analytics
+        self.index_path = os.path.join(meeting_store.data_folder, TOPICS_FILENAME)
+        self._init_index()
+    
+    @contextmanager
+    def _connect(self):
+        """開啟索引連線，區塊結束時提交並關閉"""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _init_index(self):
+        """建立索引結構，新建立或舊版本的索引會由既有的會議記錄重新建立"""
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < TOPICS_VERSION:
+                for table in _TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+        
+        if version < TOPICS_VERSION:
+            self.rebuild()
+            with self._connect() as conn:
+                conn.execute(f"PRAGMA user_version = {TOPICS_VERSION}")
+    
+    def rebuild(self, batch_size=200):
+        """由所有會議記錄依日期由舊到新重新建立索引，議題串的歸屬與逐次上傳時相同"""
+        with self._connect() as conn:
+            for table in _TABLES:
+                conn.execute(f"DELETE FROM {table}")
+        
+        filenames = [summary.filename for summary in self.meeting_store.iter_meetings()]
+        batch = []
+        for filename in reversed(filenames):
+            meeting = self.meeting_store.load(filename)
+            if meeting is not None:
+                batch.append((filename, meeting))
+            if len(batch) >= batch_size:
+                self.record_meetings(batch)
+                batch = []
+        if batch:
+            self.record_meetings(batch)
+    
+    def record_meeting(self, filename, meeting):
+        """新增或更新一次會議的議題"""
+        self.record_meetings([(filename, meeting)])
+    
+    def record_meetings(self, records):
+        """在同一個交易中新增或更新多次會議的議題，records 為 (檔案名稱, 會議記錄) 列表"""
+        with self._connect() as conn:
+            for filename, meeting in records:
+                self._record(conn, filename, meeting)
+    
+    def _record(self, conn, filename, meeting):
+        """改寫一次會議的議題：移除舊的議題後逐一加入議題串"""
+        old_keys = [row[0] for row in conn.execute("SELECT topic_key FROM topics WHERE filename = ?", (filename,))]
+        conn.executemany("DELETE FROM topic_buckets WHERE topic_key = ?", [(key,) for key in old_keys])
+        conn.execute("DELETE FROM topics WHERE filename = ?", (filename,))
+        
+        sort_date = date_sort_key(meeting.date)
+        for topic in meeting.topics:
+            shingles = topic_text_shingles(topic.title, topic.description)
+            if not shingles:
+                continue
+            buckets = lsh_buckets(minhash(shingles))
+            match = self._best_match(conn, shingles, buckets, exclude=filename)
+            key = conn.execute(
+                "INSERT INTO topics (filename, topic_id, sort_date, title, shingles, decided, thread) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (filename, topic.id or "", sort_date, topic.title or "", "\n".join(sorted(shingles)), int(bool(topic.decisions))),
+            ).lastrowid
+            conn.execute("UPDATE topics SET thread = ? WHERE topic_key = ?", (match[5] if match else key, key))
+            conn.executemany(
+                "INSERT OR IGNORE INTO topic_buckets (band, bucket, topic_key) VALUES (?, ?, ?)",
+                [(band, bucket, key) for band, bucket in buckets],
+            )
+    
+    @staticmethod
+    def _candidates(conn, shingles, buckets, exclude=None):
+        """回傳與 LSH 分段相同且相似度達門檻的議題 [(相似度, 日期, 檔名, 議題 ID, 標題, 議題串)]
+        
+        每段只取最新加入的 BUCKET_CANDIDATES 個議題，同一議題串的舊議題由較新的議題代表。
+        """
+        keys = set()
+        for band, bucket in buckets:
+            keys.update(row[0] for row in conn.execute(
+                "SELECT topic_key FROM topic_buckets WHERE band = ? AND bucket = ? ORDER BY topic_key DESC LIMIT ?",
+                (band, bucket, BUCKET_CANDIDATES),
+            ))
+        if not keys:
+            return []
+        
+        rows = []
+        query = (
+            "SELECT filename, topic_id, sort_date, title, shingles, thread FROM topics "
+            f"WHERE topic_key IN ({', '.join('?' for _ in keys)})"
+        )
+        for filename, topic_id, sort_date, title, stored, thread in conn.execute(query, list(keys)):
+            if filename == exclude:
+                continue
+            similarity = topic_similarity(shingles, set(stored.split("\n")))
+            if similarity >= TOPIC_SIMILARITY:
+                rows.append((similarity, sort_date, filename, topic_id, title, thread))
+        return rows
+    
+    def _best_match(self, conn, shingles, buckets, exclude):
+        """回傳最相近的議題，相似度相同時取日期較新者，沒有時回傳 None"""
+        candidates = self._candidates(conn, shingles, buckets, exclude)
+        return max(candidates) if candidates else None
+    
+    def similar(self, title, description="", limit=DEFAULT_LIMIT):
+        """回傳與議題文字相近的歷史議題，依相似度由高到低"""
+        shingles = topic_text_shingles(title, description)
+        if not shingles:
+            return []
+        with self._connect() as conn:
+            candidates = self._candidates(conn, shingles, lsh_buckets(minhash(shingles)))
+        candidates.sort(reverse=True)
+        return [
+            SimilarTopic(filename, topic_id, title, sort_date, similarity, thread)
+            for similarity, sort_date, filename, topic_id, title, thread in candidates[:limit]
+        ]
+    
+    def chains(self, series=None, min_meetings=DEFAULT_MIN_MEETINGS, undecided_only=False):
+        """回傳同一系列中連續 min_meetings 次以上會議都出現的議題串，依連續次數由多到少
+        
+        每筆結果包含系列、最近的議題標題、連續的會議檔名與日期、期間是否做出決策，
+        以及是否延續到系列最新的一次會議（ongoing）。
+        """
+        chains = []
+        with self._connect() as conn:
+            for name, filenames in self.trend_analytics.series_meetings(series).items():
+                if len(filenames) < min_meetings:
+                    continue
+                chains.extend(self._series_chains(conn, name, filenames, min_meetings))
+        if undecided_only:
+            chains = [chain for chain in chains if not chain["decided"]]
+        chains.sort(key=lambda chain: (chain["meetings"], chain["last_date"]), reverse=True)
+        return chains
+    
+    @staticmethod
+    def _series_chains(conn, series, filenames, min_meetings):
+        """找出一個系列中各議題串連續出現的區段"""
+        positions = {filename: i for i, filename in enumerate(filenames)}
+        occurrences = {}  # 議題串 -> {會議位置: (標題, 日期, 是否有決策)}
+        for start in range(0, len(filenames), 500):
+            chunk = filenames[start:start + 500]
+            query = (
+                "SELECT filename, thread, title, sort_date, decided FROM topics "
+                f"WHERE filename IN ({', '.join('?' for _ in chunk)})"
+            )
+            for filename, thread, title, sort_date, decided in conn.execute(query, chunk):
+                meetings = occurrences.setdefault(thread, {})
+                previous = meetings.get(positions[filename])
+                meetings[positions[filename]] = (title, sort_date, bool(decided) or bool(previous and previous[2]))
+        
+        chains = []
+        for meetings in occurrences.values():
+            if len(meetings) < min_meetings:
+                continue
+            run = []
+            for position in sorted(meetings) + [None]:
+                if run and (position is None or position != run[-1] + 1):
+                    if len(run) >= min_meetings:
+                        last_title, last_date, _ = meetings[run[-1]]
+                        chains.append({
+                            "series": series,
+                            "title": last_title,
+                            "meetings": len(run),
+                            "first_date": meetings[run[0]][1],
+                            "last_date": last_date,
+                            "filenames": [filenames[i] for i in run],
+                            "decided": any(meetings[i][2] for i in run),
+                            "ongoing": run[-1] == len(filenames) - 1,
+                        })
+                    run = []
+                if position is not None:
+                    run.append(position)
+        return chains
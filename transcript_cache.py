@@ -0,0 +1,150 @@
+"""
+重複上傳的逐字稿
+以 SQLite 記錄每份逐字稿正規化內容的雜湊值與它儲存成的會議記錄；
+內容相同的逐字稿再次上傳或匯入時，直接回傳既有的會議記錄，不需解析、分析與儲存。
+正規化只忽略解析時確定會消失的差異：換行字元（CRLF、CR），與上傳時的解碼方式相同。
+BOM 與空白都保留在雜湊值中：BOM 會留在標題中，只有空白的行不算空行，都可能改變解析結果。
+記錄的對應無法由會議記錄重建，資料結構版本更新時清空重新累積。
+"""
+
+import os
+import time
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+
+from transcript_formats import FORMAT_TEXT, detect_format, iter_text_chunks, title_and_date_from_name
+
+
+TRANSCRIPTS_FILENAME = "transcripts.sqlite3"  # 對應表檔名，與會議記錄放在同一個目錄
+TRANSCRIPTS_VERSION = 2  # 資料結構與正規化方式的版本，記錄於 PRAGMA user_version，也加入雜湊值
+
+_SCHEMA = (
+    # content_hash 為記錄時會議記錄檔案的雜湊值，檔案被刪除或改寫後對應即失效
+    """
+    CREATE TABLE IF NOT EXISTS transcripts (
+        transcript_key TEXT PRIMARY KEY,
+        filename TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        saved_at REAL NOT NULL
+    )
+    """,
+)
+
+
+def transcript_key(stream, name=""):
+    """回傳逐字稿正規化內容的雜湊值（SHA-1 十六進位），stream 為二進位檔案物件
+    
+    字幕與 Teams 逐字稿以檔名作為會議標題與日期，雜湊值也包含由檔名取得的標題與日期；
+    自由格式的會議紀錄與檔名無關，以不同檔名上傳相同內容時雜湊值相同。
+    .docx 為壓縮檔，直接以檔案內容計算。
+    """
+    digest = hashlib.sha1(f"{TRANSCRIPTS_VERSION}\n".encode("utf-8"))
+    if os.path.splitext(name)[1].lower() == ".docx":
+        digest.update(b"docx\n" + "\n".join(title_and_date_from_name(name)).encode("utf-8") + b"\n")
+        for chunk in iter(lambda: stream.read(64 * 1024), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+    
+    # 以與 parse_transcript_stream 相同的方式解碼，雜湊值只忽略已轉換的換行字元
+    chunks = iter_text_chunks(stream)
+    first = next(chunks, "")
+    transcript_format = detect_format(name, first)
+    digest.update(f"{transcript_format}\n".encode("utf-8"))
+    if transcript_format != FORMAT_TEXT:
+        digest.update("\n".join(title_and_date_from_name(name)).encode("utf-8") + b"\n")
+    
+    digest.update(first.encode("utf-8"))
+    for chunk in chunks:
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def file_transcript_key(path, name=""):
+    """回傳逐字稿檔案的 transcript_key"""
+    with open(path, 'rb') as f:
+        return transcript_key(f, name or path)
+
+
+class TranscriptCache:
+    """逐字稿雜湊值與會議記錄檔名的對應
+    
+    lookup() 只在會議記錄仍在 MeetingStore 中、且內容與記錄時相同時回傳檔名，
+    會議記錄被刪除或改寫後視為未記錄，重新上傳時會再解析一次。
+    """
+    
+    def __init__(self, meeting_store):
+        self.meeting_store = meeting_store
+        self.index_path = os.path.join(meeting_store.data_folder, TRANSCRIPTS_FILENAME)
+        self.hits = 0
+        self.misses = 0
+        self._init_index()
+    
+    @contextmanager
+    def _connect(self):
+        """開啟資料庫連線，區塊結束時提交並關閉"""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _init_index(self):
+        """建立資料結構，版本不同時清空既有的對應"""
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != TRANSCRIPTS_VERSION:
+                conn.execute("DROP TABLE IF EXISTS transcripts")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            if version != TRANSCRIPTS_VERSION:
+                conn.execute(f"PRAGMA user_version = {TRANSCRIPTS_VERSION}")
+    
+    def lookup(self, key):
+        """回傳內容雜湊值為 key 的逐字稿儲存成的會議記錄檔名，沒有或已失效時回傳 None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT filename, content_hash FROM transcripts WHERE transcript_key = ?", (key,)
+            ).fetchone()
+        if row is not None and self.meeting_store.content_hash(row[0]) == row[1]:
+            self.hits += 1
+            return row[0]
+        self.misses += 1
+        return None
+    
+    def remember(self, key, filename):
+        """記錄逐字稿儲存成的會議記錄"""
+        self.remember_many([(key, filename)])
+    
+    def remember_many(self, records):
+        """在同一個交易中記錄多份逐字稿，records 為 (雜湊值, 會議記錄檔名) 列表"""
+        now = time.time()
+        rows = []
+        for key, filename in records:
+            content_hash = self.meeting_store.content_hash(filename)
+            if content_hash is not None:
+                rows.append((key, filename, content_hash, now))
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?)", rows)
+    
+    def rehash(self, records):
+        """會議記錄以相同的逐字稿重新分析並改寫後，更新對應中的雜湊值
+        
+        records 為 (會議記錄檔名, 改寫前的雜湊值) 列表；改寫前對應已失效的不更新。
+        """
+        rows = []
+        for filename, previous_hash in records:
+            content_hash = self.meeting_store.content_hash(filename)
+            if content_hash is not None:
+                rows.append((content_hash, filename, previous_hash))
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE transcripts SET content_hash = ? WHERE filename = ? AND content_hash = ?", rows
+            )
+    
+    def stats(self):
+        """回傳記錄數與命中統計"""
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+        return {"entries": entries, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,496 @@
+"""
+逐字稿格式讀取
+除了自由格式的會議紀錄文字檔之外，也可直接匯入 Teams 匯出的 WebVTT 字幕、SRT 字幕
+與發言者逐段的逐字稿（文字檔或 .docx）。各格式的 reader 都是產生器，
+逐行讀取並產生 (時間, 發言者, 內容) 字幕段落，不需讀入整份檔案；
+CueMeetingBuilder 再由字幕段落推得參與人員、切分議題並找出工作事項。
+"""
+
+import io
+import os
+import re
+import time
+import codecs
+import zipfile
+import itertools
+from html import unescape
+from collections import namedtuple
+from xml.etree import ElementTree
+
+from meeting_data_structure import MeetingRecord, Topic, MeetingParser, normalize_date, normalize_action_item_dates
+from lazy_loading import LazyPattern
+
+
+Cue = namedtuple("Cue", [
+    "timestamp",  # 開始時間，距離會議開始的秒數
+    "speaker",    # 發言者，字幕沒有標示時為空字串
+    "text",       # 字幕內容
+])
+
+FORMAT_TEXT = "text"    # 自由格式的會議紀錄，交給 MeetingParser 解析
+FORMAT_VTT = "vtt"      # WebVTT 字幕，Teams 的「下載字幕」
+FORMAT_SRT = "srt"      # SRT 字幕
+FORMAT_TEAMS = "teams"  # Teams 發言者逐段的逐字稿
+
+FORMAT_EXTENSIONS = {
+    ".txt": FORMAT_TEXT,
+    ".vtt": FORMAT_VTT,
+    ".srt": FORMAT_SRT,
+    ".docx": FORMAT_TEAMS,
+}
+TRANSCRIPT_EXTENSIONS = tuple(FORMAT_EXTENSIONS)  # 可匯入的逐字稿副檔名
+
+TOPIC_GAP_SECONDS = 120  # 字幕之間停頓超過此秒數時開始新的議題
+TOPIC_WINDOW_SECONDS = 600  # 沒有明確的議題轉換語句時，每個議題最長的秒數
+DISCUSSION_POINT_MAX_CHARS = 500  # 同一位發言者連續發言合併為一個討論要點的字數上限
+_DEADLINE_CHECK_CUES = 256  # 每隔多少段字幕檢查一次時間上限
+_SNIFF_LINES = 12  # 判斷 .txt 格式時檢查的非空白行數
+_MIN_TEAMS_TURNS = 3  # 開頭至少要有幾段發言才視為 Teams 逐字稿
+
+# 時間碼：WebVTT 為 00:01:02.500 或 01:02.500，SRT 為 00:01:02,500，Teams 為 0:0:2.5 或 1:02
+_TIMESTAMP = r"\d{1,2}(?::\d{1,2}){1,2}(?:[.,]\d{1,3})?"
+_TIMING_RE = LazyPattern(r"(" + _TIMESTAMP + r")\s*-->\s*(" + _TIMESTAMP + r")")
+_SRT_TIMING_RE = LazyPattern(r"\d{1,2}:\d{2}:\d{2},\d{1,3}\s*-->")
+_VOICE_RE = LazyPattern(r"<v(?:\.[^\s>]*)?\s+([^>]+)>")
+_TAG_RE = LazyPattern(r"</?[^>]*>")
+_SPEAKER_PREFIX_RE = LazyPattern(r"(?:-\s*)?(?:\[([^\[\]]{1,30})\]\s*[:：]?|([^\[\]:：\d][^:：]{0,30}?)\s*[:：])\s*(.+)")
+
+# Teams 逐字稿：「[0:01:02] 王小明: 內容」單行形式，或「王小明   1:02」標頭之後接著內容
+_TEAMS_INLINE_RE = LazyPattern(r"\[?(" + _TIMESTAMP + r")\]?\s+([^:：\d][^:：]{0,40}?)\s*[:：]\s*(.*)")
+_TEAMS_HEADER_RE = LazyPattern(r"(\S.{0,40}?)\s+(" + _TIMESTAMP + r")")
+
+# 字幕內容的分類：議題轉換、決策與工作事項
+_LETTERS = r"A-Za-z\u4e00-\u9fa5"
+_TOPIC_CUE_RE = LazyPattern(
+    r"第[一二三四五六七八九十\d]+個?議題|議題[一二三四五六七八九十\d]+|下一個議題|下個議題|接下來(?:討論|是|進入)"
+    r"|\b(?:next|first|second|third|final|last) (?:topic|agenda item|item on the agenda)\b|\bagenda item \d+\b",
+    re.IGNORECASE,
+)
+_DECISION_CUE_RE = LazyPattern(
+    r"決[策定][：:]|結論[：:]|我們決定|決議|\b(?:we|we've|we have) (?:decided|agreed)\b|\bthe decision is\b",
+    re.IGNORECASE,
+)
+_ACTION_CUE_RE = LazyPattern(
+    r"負責人[：:]|待辦|工作事項|前完成|跟進|我(?:會|來)(?:負責|處理|確認|準備|更新|整理|提供|追蹤|跟)"
+    r"|請\s*[" + _LETTERS + r"]{1,10}?\s*(?:負責|處理|確認|追蹤|準備|更新)"
+    r"|\baction items?\b|\bfollow[ -]?up\b|\bI(?:'ll| will) (?!be\b)|\bdeadline\b",
+    re.IGNORECASE,
+)
+_CUE_ASSIGNEE_RES = (
+    LazyPattern(r"負責人[：:]\s*([" + _LETTERS + r"]+)"),
+    LazyPattern(r"請\s*([" + _LETTERS + r"]{1,10}?)\s*(?:負責|處理|確認|追蹤|準備|更新)"),
+)
+
+# 檔名中的日期：2024-03-05、2024_3_5、20240305 等
+_NAME_DATE_RE = LazyPattern(r"(\d{4})[-_/.年]?(\d{1,2})[-_/.月]?(\d{1,2})日?(?!\d)")
+
+
+def detect_format(name, first_text=""):
+    """依副檔名判斷逐字稿格式；.txt 再檢查開頭內容是否為字幕或 Teams 逐字稿
+    
+    會議紀錄的標題常以時間結尾（「設計評審會議紀錄 14:00」），只有開頭重複出現發言者與時間的段落
+    （單行形式，或標頭之後接著內容）至少 _MIN_TEAMS_TURNS 次時才視為 Teams 逐字稿。
+    """
+    transcript_format = FORMAT_EXTENSIONS.get(os.path.splitext(name)[1].lower(), FORMAT_TEXT)
+    if transcript_format != FORMAT_TEXT:
+        return transcript_format
+    
+    lines = [line.strip() for line in first_text.lstrip("\ufeff").split("\n")]
+    sample = [line for line in lines if line][:_SNIFF_LINES]
+    if not sample:
+        return FORMAT_TEXT
+    if sample[0].startswith("WEBVTT"):
+        return FORMAT_VTT
+    if any(_TIMING_RE.search(line) for line in sample):
+        return FORMAT_SRT if any(_SRT_TIMING_RE.match(line) for line in sample) else FORMAT_TEAMS
+    return FORMAT_TEAMS if _count_teams_turns(lines) >= _MIN_TEAMS_TURNS else FORMAT_TEXT
+
+
+def _count_teams_turns(lines):
+    """計算開頭 _SNIFF_LINES 個非空白行中 Teams 形式的發言段數，判斷方式與 read_teams_transcript 相同"""
+    turns = 0
+    after_blank = True  # 標頭只出現在檔案開頭或空行之後
+    header = False  # 上一行是標頭，下一行為內容時才算一段發言
+    seen = 0
+    for line in lines:
+        if not line:
+            after_blank = True
+            continue
+        seen += 1
+        if seen > _SNIFF_LINES:
+            break
+        if _TEAMS_INLINE_RE.fullmatch(line):
+            turns += 1
+            header = False
+        elif after_blank and _TEAMS_HEADER_RE.fullmatch(line):
+            header = True
+        else:
+            turns += header
+            header = False
+        after_blank = False
+    return turns
+
+
+def iter_text_chunks(stream, chunk_size=64 * 1024):
+    """逐段讀取二進位檔案串流，以 UTF-8 解碼並統一換行字元"""
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder('utf-8')(errors='ignore'), translate=True)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+def iter_lines(chunks):
+    """將任意切割的文字片段重新組成逐行內容（不含換行字元）"""
+    partial = ""
+    for chunk in chunks:
+        if "\n" not in chunk:
+            partial += chunk
+            continue
+        lines = chunk.split("\n")
+        lines[0] = partial + lines[0]
+        partial = lines.pop()
+        yield from lines
+    if partial:
+        yield partial
+
+
+_WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def iter_docx_lines(stream):
+    """逐段讀取 .docx 的段落文字，段落內的換行各自成行，每個段落之後接一個空行
+    
+    以 iterparse 處理 word/document.xml，處理過的段落立即釋放，不會建立整份文件的樹狀結構。
+    """
+    with zipfile.ZipFile(stream) as archive:
+        with archive.open("word/document.xml") as document:
+            parts = []
+            for _, element in ElementTree.iterparse(document, events=("end",)):
+                tag = element.tag
+                if tag == _WORD_NAMESPACE + "t":
+                    parts.append(element.text or "")
+                elif tag == _WORD_NAMESPACE + "tab":
+                    parts.append("\t")
+                elif tag in (_WORD_NAMESPACE + "br", _WORD_NAMESPACE + "cr"):
+                    parts.append("\n")
+                elif tag == _WORD_NAMESPACE + "p":
+                    yield from "".join(parts).split("\n")
+                    yield ""
+                    parts = []
+                    element.clear()
+
+
+def parse_timestamp(text):
+    """將 01:02:03.500、1:02、00:01:02,500 等時間碼轉換為秒數"""
+    seconds = 0.0
+    for part in text.replace(",", ".").split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_timestamp(seconds):
+    """將秒數轉換為 H:MM:SS"""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _split_speaker(text):
+    """拆出「名稱: 內容」或「[名稱] : 內容」形式的發言者，回傳 (發言者, 內容)"""
+    match = _SPEAKER_PREFIX_RE.fullmatch(text)
+    if match:
+        return (match.group(1) or match.group(2)).strip(), match.group(3).strip()
+    return "", text
+
+
+def _iter_timed_blocks(lines):
+    """產生字幕區塊的 (開始秒數, 內容行列表)，區塊以時間碼行開始、空行結束
+    
+    WebVTT 的檔頭、NOTE/STYLE 區塊與 SRT 的序號行沒有時間碼，會被略過。
+    """
+    timestamp = None
+    payload = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if timestamp is not None and payload:
+                yield timestamp, payload
+            timestamp = None
+            payload = []
+            continue
+        if timestamp is None:
+            match = _TIMING_RE.search(line)
+            if match:
+                timestamp = parse_timestamp(match.group(1))
+            continue
+        payload.append(line)
+    if timestamp is not None and payload:
+        yield timestamp, payload
+
+
+def read_vtt(lines):
+    """讀取 WebVTT 字幕，發言者取自 <v 名稱> 標籤或「名稱: 」前綴"""
+    for timestamp, payload in _iter_timed_blocks(lines):
+        text = " ".join(payload)
+        voice = _VOICE_RE.search(text)
+        text = unescape(_TAG_RE.sub("", text)).strip()
+        if voice:
+            speaker = unescape(voice.group(1)).strip()
+        else:
+            speaker, text = _split_speaker(text)
+        if text:
+            yield Cue(timestamp, speaker, text)
+
+
+def read_srt(lines):
+    """讀取 SRT 字幕，發言者取自「名稱: 」或「[名稱] 」前綴"""
+    for timestamp, payload in _iter_timed_blocks(lines):
+        speaker, text = _split_speaker(_TAG_RE.sub("", " ".join(payload)).strip())
+        if text:
+            yield Cue(timestamp, speaker, text)
+
+
+def read_teams_transcript(lines):
+    """讀取 Teams 發言者逐段的逐字稿
+    
+    支援三種形式：「[0:01:02] 王小明: 內容」單行形式；空行之後的「王小明   1:02」標頭接著內容；
+    舊版 .docx 的「0:0:1.0 --> 0:0:5.0」時間碼之後接著發言者與內容。
+    每段發言延續到下一個標頭或時間碼，其間的空行不會結束發言（.docx 的每個段落之後都有空行），
+    第一個標頭之前的會議資訊會被略過。
+    """
+    pending = None  # 目前發言的 [開始秒數, 發言者, 內容行列表]
+    expect_speaker = False  # 時間碼之後的下一行是發言者
+    after_blank = True  # 標頭只出現在檔案開頭或空行之後
+    for line in lines:
+        line = line.strip()
+        if not line:
+            after_blank = True
+            continue
+        
+        timing = _TIMING_RE.match(line)
+        inline = None if timing else _TEAMS_INLINE_RE.fullmatch(line)
+        header = None
+        if after_blank and not (timing or inline or expect_speaker):
+            header = _TEAMS_HEADER_RE.fullmatch(line)
+        after_blank = False
+        if timing or inline or header:
+            if pending is not None and pending[2]:
+                yield Cue(pending[0], pending[1], " ".join(pending[2]))
+            pending = None
+            expect_speaker = False
+        
+        if timing:
+            pending = [parse_timestamp(timing.group(1)), "", []]
+            expect_speaker = True
+        elif inline:
+            text = inline.group(3).strip()
+            pending = [parse_timestamp(inline.group(1)), inline.group(2).strip(), [text] if text else []]
+        elif header:
+            pending = [parse_timestamp(header.group(2)), header.group(1).strip(), []]
+        elif pending is not None:
+            if expect_speaker:
+                pending[1] = line
+                expect_speaker = False
+            else:
+                pending[2].append(line)
+    if pending is not None and pending[2]:
+        yield Cue(pending[0], pending[1], " ".join(pending[2]))
+
+
+CUE_READERS = {
+    FORMAT_VTT: read_vtt,
+    FORMAT_SRT: read_srt,
+    FORMAT_TEAMS: read_teams_transcript,
+}
+
+
+def title_and_date_from_name(name):
+    """由檔名推得會議標題與日期，例如「ECU週會_2024-03-05.vtt」"""
+    stem = os.path.splitext(os.path.basename(name))[0]
+    meeting_date = ""
+    match = _NAME_DATE_RE.search(stem)
+    if match:
+        meeting_date = normalize_date("-".join(match.groups()))
+        if meeting_date:
+            stem = stem[:match.start()] + " " + stem[match.end():]
+    title = " ".join(stem.replace("_", " ").split()).strip(" -")
+    return title, meeting_date
+
+
+class CueMeetingBuilder:
+    """由字幕段落建立會議記錄
+    
+    以 feed() 逐段傳入 Cue，close() 取得會議記錄物件，只保留目前議題的內容：
+    - 參與人員為依出現順序的發言者；
+    - 出現「下一個議題」、「next topic」等轉換語句、停頓超過 TOPIC_GAP_SECONDS，
+      或整場會議沒有轉換語句而議題超過 TOPIC_WINDOW_SECONDS 時開始新的議題；
+    - 同一位發言者的連續字幕合併為一個討論要點，含「決定」、「結論」的字幕列為決策；
+    - 含「負責人：」、「我會處理」、「I'll」等語句的字幕建立工作事項，
+      負責人取自「負責人：名稱」或「請名稱處理」，否則為發言者，截止日期與狀態的判斷與 MeetingParser 相同。
+    指定 time_budget（秒）時，超過時間上限後忽略其餘字幕，並在 warnings 中說明。
+    """
+    
+    def __init__(self, title="", date="", time_budget=None):
+        self.time_budget = time_budget
+        self.truncated = False  # 是否因超過時間上限而停止
+        self._deadline = time.perf_counter() + time_budget if time_budget else None
+        self._meeting = MeetingRecord()
+        self._meeting.title = title
+        self._meeting.date = date
+        self._speakers = {}  # 依出現順序的發言者
+        self._cue_count = 0
+        self._explicit_topics = False  # 是否出現過議題轉換語句
+        self._last_timestamp = None
+        self._closed = False
+        
+        # 目前的議題
+        self._topic = None
+        self._topic_start = 0.0
+        self._topic_speakers = {}
+        self._point_speaker = None  # 目前討論要點的發言者
+        self._point_parts = []
+        self._point_length = 0
+    
+    def feed(self, cue):
+        """傳入一段字幕，超過時間上限後忽略"""
+        if self._closed:
+            raise ValueError("builder is already closed")
+        if self.truncated:
+            return
+        if self._deadline is not None and self._cue_count % _DEADLINE_CHECK_CUES == 0 \
+                and time.perf_counter() > self._deadline:
+            self.truncated = True
+            return
+        self._cue_count += 1
+        
+        text = cue.text.strip()
+        if not text:
+            return
+        speaker = cue.speaker
+        if speaker and speaker not in self._speakers:
+            self._speakers[speaker] = None
+        
+        if self._starts_topic(cue.timestamp, text):
+            self._finish_topic()
+        if self._topic is None:
+            self._start_topic(cue.timestamp, text)
+        self._last_timestamp = cue.timestamp
+        if speaker:
+            self._topic_speakers[speaker] = None
+        
+        self._add_point(speaker, text)
+        if _DECISION_CUE_RE.search(text):
+            self._topic.decisions.append(f"{speaker}：{text}" if speaker else text)
+        if _ACTION_CUE_RE.search(text):
+            self._add_action_item(speaker, text)
+    
+    def close(self):
+        """結束輸入並回傳會議記錄物件"""
+        if not self._closed:
+            self._closed = True
+            self._finish_topic()
+            self._meeting.participants = list(self._speakers)
+            normalize_action_item_dates(self._meeting)
+            if self.truncated:
+                self._meeting.warnings.append(
+                    f"解析超過 {self.time_budget:g} 秒的時間上限，只處理了前 {self._cue_count} 段字幕，結果可能不完整"
+                )
+        return self._meeting
+    
+    def _starts_topic(self, timestamp, text):
+        """判斷這段字幕是否開始新的議題"""
+        if self._topic is None:
+            return False
+        if _TOPIC_CUE_RE.search(text):
+            self._explicit_topics = True
+            return True
+        if timestamp - self._last_timestamp >= TOPIC_GAP_SECONDS:
+            return True
+        return not self._explicit_topics and timestamp - self._topic_start >= TOPIC_WINDOW_SECONDS
+    
+    def _start_topic(self, timestamp, text):
+        topic = Topic()
+        topic.id = str(len(self._meeting.topics) + 1)
+        # 以議題轉換語句為標題，否則在議題結束時以時間範圍為標題
+        if _TOPIC_CUE_RE.search(text):
+            topic.title = text[:60]
+        self._topic = topic
+        self._topic_start = timestamp
+        self._topic_speakers = {}
+    
+    def _finish_topic(self):
+        topic = self._topic
+        if topic is None:
+            return
+        self._flush_point()
+        time_range = f"{format_timestamp(self._topic_start)}–{format_timestamp(self._last_timestamp)}"
+        if not topic.title:
+            topic.title = f"討論段落 {time_range}"
+        topic.description = time_range
+        if self._topic_speakers:
+            topic.description += f"，發言人員：{'、'.join(self._topic_speakers)}"
+        self._meeting.topics.append(topic)
+        self._topic = None
+    
+    def _add_point(self, speaker, text):
+        """同一位發言者的連續字幕合併為一個討論要點"""
+        if self._point_speaker != speaker or self._point_length >= DISCUSSION_POINT_MAX_CHARS:
+            self._flush_point()
+            self._point_speaker = speaker
+        self._point_parts.append(text)
+        self._point_length += len(text)
+    
+    def _flush_point(self):
+        if self._point_parts:
+            text = " ".join(self._point_parts)
+            self._topic.discussion_points.append(f"{self._point_speaker}：{text}" if self._point_speaker else text)
+        self._point_speaker = None
+        self._point_parts = []
+        self._point_length = 0
+    
+    def _add_action_item(self, speaker, text):
+        action_items = self._meeting.action_items
+        item = MeetingParser._build_action_item(action_items, text)
+        item.assignee = speaker
+        for pattern in _CUE_ASSIGNEE_RES:
+            match = pattern.search(text)
+            if match:
+                item.assignee = match.group(1).strip()
+                break
+        item.related_topic_id = self._topic.id
+        self._topic.related_action_items.append(item.id)
+        action_items.append(item)
+
+
+def build_meeting(cues, title="", date="", time_budget=None):
+    """由字幕段落的 iterable 建立會議記錄，超過時間上限時停止讀取"""
+    builder = CueMeetingBuilder(title, date, time_budget)
+    for cue in cues:
+        builder.feed(cue)
+        if builder.truncated:
+            break
+    return builder.close()
+
+
+def parse_transcript_stream(stream, name="", time_budget=None):
+    """解析上傳的逐字稿，依檔名與開頭內容判斷格式
+    
+    stream 為二進位檔案物件；自由格式的會議紀錄交給 MeetingParser.parse_stream，
+    字幕與 Teams 逐字稿則逐段讀取字幕並以檔名作為標題與日期。
+    """
+    if os.path.splitext(name)[1].lower() == ".docx":
+        transcript_format = FORMAT_TEAMS
+        lines = iter_docx_lines(stream)
+    else:
+        chunks = iter_text_chunks(stream)
+        first = next(chunks, "")
+        chunks = itertools.chain((first,), chunks)
+        transcript_format = detect_format(name, first)
+        if transcript_format == FORMAT_TEXT:
+            return MeetingParser.parse_stream(chunks, time_budget)
+        lines = iter_lines(chunks)
+    
+    title, meeting_date = title_and_date_from_name(name)
+    return build_meeting(CUE_READERS[transcript_format](lines), title, meeting_date, time_budget)
@@ -0,0 +1,256 @@
+"""
+非同步上傳工作佇列
+上傳的檔案先存到磁碟並在 SQLite 中登記一筆工作，由背景執行緒解析與分析，
+請求本身立即返回工作 ID。工作記錄在資料庫中，服務重新啟動後未完成的工作會繼續處理。
+處理中的工作帶有租約（lease_until），處理的行程定期延長；租約過期的工作視為所屬行程已停止，重新排隊。
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+JOBS_FILENAME = "jobs.sqlite3"  # 工作佇列檔名，與會議記錄放在同一個目錄
+JOBS_VERSION = 2  # 資料結構版本，記錄於 PRAGMA user_version
+DEFAULT_WORKERS = 2  # 預設的背景執行緒數
+DEFAULT_MAX_PENDING = 32  # 預設最多同時排隊或處理中的工作數
+POLL_INTERVAL = 1.0  # 背景執行緒檢查新工作的間隔秒數（其他行程登記的工作）
+JOB_RETENTION = 7 * 24 * 3600  # 已結束的工作保留秒數
+LEASE_SECONDS = 60.0  # 處理中工作的租約秒數，超過時未延長即重新排隊；各主機的時鐘誤差須遠小於此值
+HEARTBEAT_INTERVAL = LEASE_SECONDS / 4  # 延長租約並回收過期工作的間隔秒數
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        owner TEXT,
+        lease_until REAL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        result TEXT,
+        error TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at)",
+)
+_JOB_COLUMNS = ("id", "name", "status", "created_at", "started_at", "finished_at", "result", "error")
+
+
+class QueueFullError(Exception):
+    """排隊中與處理中的工作已達上限"""
+
+
+class JobQueue:
+    """以 SQLite 記錄的工作佇列與背景執行緒
+    
+    handler(payload, name) 在背景執行緒中處理一筆工作，回傳可序列化為 JSON 的結果，
+    拋出例外時工作標記為失敗。workers 為 0 時不啟動背景執行緒，submit 直接在呼叫端處理工作。
+    多個行程可共用同一個佇列，工作以單一 UPDATE 搶佔，不會被重複處理。
+    搶佔時取得 LEASE_SECONDS 的租約，處理期間由心跳執行緒定期延長；心跳執行緒同時將租約過期
+    （所屬行程已停止，不論在哪一台主機）的工作重新排隊，不只在建立佇列時檢查。
+    """
+    
+    def __init__(self, data_folder, handler, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        self.db_path = os.path.join(data_folder, JOBS_FILENAME)
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.owner = uuid.uuid4().hex  # 每個佇列物件各自的隨機識別，重新啟動或在其他容器中不會重複
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._heartbeat = None
+        self._heartbeat_lock = threading.Lock()
+        self._init_db()
+    
+    @contextmanager
+    def _connect(self):
+        """開啟自動提交的資料庫連線，區塊結束時關閉"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    def _init_db(self):
+        """建立資料結構，回收已結束行程遺留的工作並清除過期的工作記錄"""
+        with self._connect() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            # 佇列中的工作無法由會議記錄重建，舊版本的資料庫以新增欄位升級；沒有租約的處理中工作視為已過期
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "lease_until" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL")
+            conn.execute(f"PRAGMA user_version = {JOBS_VERSION}")
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (JOB_DONE, JOB_FAILED, time.time() - JOB_RETENTION),
+            )
+        self.requeue_orphans()
+    
+    def requeue_orphans(self):
+        """將租約已過期（所屬行程已停止）的處理中工作重新排隊，回傳重新排隊的工作數"""
+        with self._connect() as conn:
+            requeued = conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, started_at = NULL, lease_until = NULL "
+                "WHERE status = ? AND (lease_until IS NULL OR lease_until < ?)",
+                (JOB_QUEUED, JOB_RUNNING, time.time()),
+            ).rowcount
+        if requeued:
+            with self._wakeup:
+                self._wakeup.notify(requeued)
+        return requeued
+    
+    def renew_leases(self):
+        """延長此佇列處理中工作的租約，回傳延長的工作數"""
+        with self._connect() as conn:
+            return conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE owner = ? AND status = ?",
+                (time.time() + LEASE_SECONDS, self.owner, JOB_RUNNING),
+            ).rowcount
+    
+    def _start_heartbeat(self):
+        """啟動定期延長租約與回收過期工作的背景執行緒，重複呼叫不會多開"""
+        with self._heartbeat_lock:
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, name="upload-job-heartbeat", daemon=True)
+                self._heartbeat.start()
+    
+    def _beat(self):
+        """背景執行緒：每 HEARTBEAT_INTERVAL 秒延長租約，並回收其他行程遺留的工作"""
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            try:
+                self.renew_leases()
+                self.requeue_orphans()
+            except sqlite3.Error as e:
+                print(f"Error renewing upload job leases: {e}")
+    
+    def start(self):
+        """啟動背景執行緒，重複呼叫不會多開"""
+        if self._threads or self.workers <= 0:
+            return
+        self._start_heartbeat()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"upload-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def submit(self, payload, name=""):
+        """登記一筆工作並回傳工作 ID，佇列已滿時拋出 QueueFullError"""
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE 讓計數與新增在多個行程之間保持一致
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                pending = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (JOB_QUEUED, JOB_RUNNING)
+                ).fetchone()[0]
+                if pending >= self.max_pending:
+                    raise QueueFullError(f"{pending} jobs pending")
+                conn.execute(
+                    "INSERT INTO jobs (id, name, payload, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, name, payload, JOB_QUEUED, time.time()),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        
+        if self.workers <= 0:
+            claimed = self._claim(job_id)
+            if claimed is not None:
+                self._run(*claimed)
+        else:
+            self.start()
+            with self._wakeup:
+                self._wakeup.notify()
+        return job_id
+    
+    def get(self, job_id):
+        """回傳工作狀態，不存在時回傳 None"""
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = dict(zip(_JOB_COLUMNS, row))
+            if job["status"] == JOB_QUEUED:
+                # 排在前面的工作數
+                job["position"] = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?", (JOB_QUEUED, job["created_at"])
+                ).fetchone()[0]
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+    
+    def stats(self):
+        """回傳各狀態的工作數與佇列設定"""
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            **{status: counts.get(status, 0) for status in JOB_STATUSES},
+        }
+    
+    def _claim(self, job_id=None):
+        """搶佔一筆排隊中的工作（可指定 ID），回傳 (工作 ID, payload, 名稱)，沒有工作時回傳 None"""
+        if job_id is None:
+            target = "(SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1)"
+            params = (JOB_QUEUED,)
+        else:
+            target = "?"
+            params = (job_id,)
+        with self._connect() as conn:
+            now = time.time()
+            rows = conn.execute(
+                f"UPDATE jobs SET status = ?, owner = ?, started_at = ?, lease_until = ? WHERE id = {target} "
+                "AND status = ? RETURNING id, payload, name",
+                (JOB_RUNNING, self.owner, now, now + LEASE_SECONDS, *params, JOB_QUEUED),
+            ).fetchall()
+        return rows[0] if rows else None
+    
+    def _run(self, job_id, payload, name):
+        """執行一筆已搶佔的工作並記錄結果"""
+        self._start_heartbeat()
+        try:
+            result = self.handler(payload, name)
+        except Exception as e:
+            status, result, error = JOB_FAILED, None, f"{type(e).__name__}: {e}"
+        else:
+            status, error = JOB_DONE, None
+        with self._connect() as conn:
+            # 租約過期後工作可能已由其他行程重新處理，以先完成的結果為準
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ?, lease_until = NULL "
+                "WHERE id = ? AND status = ?",
+                (status, time.time(), json.dumps(result, ensure_ascii=False) if result is not None else None, error,
+                 job_id, JOB_RUNNING),
+            )
+    
+    def _worker(self):
+        """背景執行緒：持續處理排隊中的工作，沒有工作時等待通知或定期檢查"""
+        while True:
+            try:
+                claimed = self._claim()
+            except sqlite3.Error as e:
+                print(f"Error claiming upload job: {e}")
+                claimed = None
+            if claimed is None:
+                with self._wakeup:
+                    self._wakeup.wait(POLL_INTERVAL)
+                continue
+            self._run(*claimed)
+